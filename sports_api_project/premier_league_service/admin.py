@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Club, LeagueTable, Player, Fixture, PlayerStat
+from .models import Club, LeagueTable, Player, Fixture, PlayerStat, ScrapeCheckpoint, StandingsSnapshot, LeagueTableSplit, ResponseBlob
 
 @admin.register(Club)
 class ClubAdmin(admin.ModelAdmin):
@@ -16,6 +16,13 @@ class LeagueTableAdmin(admin.ModelAdmin):
     ordering = ('season', 'position')
     # --- END CHANGE ---
 
+@admin.register(LeagueTableSplit)
+class LeagueTableSplitAdmin(admin.ModelAdmin):
+    list_display = ('season', 'view', 'club', 'position', 'played', 'won', 'drawn', 'lost', 'points')
+    search_fields = ('club__club_name', 'season')
+    list_filter = ('season', 'view')
+    ordering = ('season', 'view', 'position')
+
 @admin.register(Player)
 class PlayerAdmin(admin.ModelAdmin):
     list_display = ('first_name', 'last_name', 'club', 'position', 'nationality')
@@ -24,12 +31,30 @@ class PlayerAdmin(admin.ModelAdmin):
 
 @admin.register(Fixture)
 class FixtureAdmin(admin.ModelAdmin):
-    list_display = ('kickoff_time', 'home_club', 'away_club', 'status', 'home_score', 'away_score')
+    list_display = ('kickoff_time', 'season', 'matchweek', 'home_club', 'away_club', 'status', 'home_score', 'away_score')
     search_fields = ('home_club__club_name', 'away_club__club_name', 'venue')
-    list_filter = ('status', 'venue', 'home_club', 'away_club')
+    list_filter = ('season', 'status', 'venue', 'home_club', 'away_club')
 
 @admin.register(PlayerStat)
 class PlayerStatAdmin(admin.ModelAdmin):
     list_display = ('player', 'season', 'goals', 'assists', 'minutes_played', 'clean_sheets')
     search_fields = ('player__first_name', 'player__last_name', 'season')
-    list_filter = ('season', 'player__club')
\ No newline at end of file
+    list_filter = ('season', 'player__club')
+
+@admin.register(ScrapeCheckpoint)
+class ScrapeCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('stage', 'completed_at')
+    search_fields = ('stage',)
+    ordering = ('completed_at',)
+
+@admin.register(StandingsSnapshot)
+class StandingsSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('season', 'axis', 'built_at')
+    list_filter = ('axis',)
+    exclude = ('keys', 'club_ids', 'tables')
+
+@admin.register(ResponseBlob)
+class ResponseBlobAdmin(admin.ModelAdmin):
+    list_display = ('key', 'etag', 'built_at')
+    search_fields = ('key',)
+    exclude = ('json', 'gzip', 'brotli')
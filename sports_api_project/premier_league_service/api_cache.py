@@ -0,0 +1,238 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DataVersion
+
+
+class LRUCache:
+    """A thread-safe, size-bounded least-recently-used cache."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+    def set(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# The per-process tier. Entries built from old data versions are never
+# looked up again and simply age out.
+local_cache = LRUCache(settings.API_CACHE_MAX_ENTRIES)
+
+
+def shared_cache():
+    """The optional shared tier (settings.API_CACHE_ALIAS), or None."""
+    alias = getattr(settings, 'API_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+# How many bumps this process has made; run_scraper compares it before and
+# after a job to decide whether the cache needs warming.
+bump_count = 0
+
+
+def bump_data_version(*scopes):
+    """Invalidates every cached response built from any of `scopes`."""
+    global bump_count
+    if not scopes:
+        return
+    bump_count += 1
+    DataVersion.objects.bulk_create([DataVersion(scope=scope) for scope in scopes], ignore_conflicts=True)
+    # update() skips auto_now, so updated_at (the Last-Modified time) is set here
+    DataVersion.objects.filter(scope__in=scopes).update(version=F('version') + 1, updated_at=timezone.now())
+
+
+def data_versions(scopes):
+    """Returns the current version of each scope, in order (0 if never bumped)."""
+    return data_state(scopes)[0]
+
+
+def data_state(scopes):
+    """
+    Returns (versions, last_modified) for `scopes` with one query:
+    each scope's version in order, and the latest time any was bumped
+    (None if none ever was).
+    """
+    return _fold_state(scopes, _state_query(scopes))
+
+
+async def adata_state(scopes):
+    """data_state() for async views, using the async ORM."""
+    return _fold_state(scopes, [row async for row in _state_query(scopes)])
+
+
+def _state_query(scopes):
+    return DataVersion.objects.filter(scope__in=scopes).values_list('scope', 'version', 'updated_at')
+
+
+def _fold_state(scopes, rows):
+    rows = {scope: (version, updated_at) for scope, version, updated_at in rows}
+    versions = tuple(rows[scope][0] if scope in rows else 0 for scope in scopes)
+    last_modified = max((updated_at for _, updated_at in rows.values()), default=None)
+    return versions, last_modified
+
+
+def cache_key(namespace, params, versions):
+    query = '&'.join(f"{name}={value}" for name, value in sorted(params.items()) if value is not None)
+    return f"api:{namespace}:{query}:v{'.'.join(map(str, versions))}"
+
+
+def get_or_build(namespace, params, scopes, build, versions=None):
+    """
+    Returns the cached response data for `namespace` + `params`, or calls
+    build() and caches the result in both tiers.
+
+    The key includes the current version of every scope the data depends
+    on, so bump_data_version() invalidates it. Costs one small query
+    (the versions) per call, unless `versions` were already loaded.
+    """
+    if versions is None:
+        versions = data_versions(scopes)
+    key = cache_key(namespace, params, versions)
+
+    data = cached(key)
+    if data is None:
+        data = build()
+        store(key, data)
+    return data
+
+
+def cached(key):
+    """Returns the data cached under `key` in either tier, or None."""
+    data = local_cache.get(key)
+    if data is None:
+        shared = shared_cache()
+        if shared is not None:
+            data = shared.get(key)
+            if data is not None:
+                local_cache.set(key, data)
+    return data
+
+
+def store(key, data):
+    local_cache.set(key, data)
+    shared = shared_cache()
+    if shared is not None:
+        shared.set(key, data, timeout=settings.API_CACHE_TIMEOUT)
+
+
+async def aget_or_build(namespace, params, versions, build):
+    """
+    get_or_build() for async views, given the already loaded `versions`.
+    A hit in the per-process tier is answered on the event loop; the
+    shared tier's async methods and build() (sync ORM code) run in a
+    worker thread.
+    """
+    key = cache_key(namespace, params, versions)
+
+    data = local_cache.get(key)
+    if data is not None:
+        return data
+
+    shared = shared_cache()
+    if shared is not None:
+        data = await shared.aget(key)
+        if data is not None:
+            local_cache.set(key, data)
+            return data
+
+    data = await sync_to_async(build)()
+    local_cache.set(key, data)
+    if shared is not None:
+        await shared.aset(key, data, timeout=settings.API_CACHE_TIMEOUT)
+    return data
+
+
+def load_states(payloads):
+    """
+    Loads the data versions of many payloads with one query, instead of
+    one per payload.
+    """
+    rows = list(_state_query({scope for payload in payloads for scope in payload.scopes}))
+    for payload in payloads:
+        payload._state = _fold_state(payload.scopes, [row for row in rows if row[0] in payload.scopes])
+
+
+class CachedPayload:
+    """
+    One cacheable API response: what it depends on, and how to build it.
+
+    The data versions are loaded once (lazily), so a view can compare the
+    ETag / Last-Modified against the request's conditional headers before
+    anything is built or even looked up in the cache.
+    """
+
+    def __init__(self, namespace, params, scopes, build):
+        self.namespace = namespace
+        self.params = params
+        self.scopes = scopes
+        self.build = build
+        self._state = None
+
+    @property
+    def state(self):
+        if self._state is None:
+            self._state = data_state(self.scopes)
+        return self._state
+
+    @property
+    def etag(self):
+        """A strong ETag: changes whenever the params or any scope's version do."""
+        return f'"{hashlib.sha256(self.key.encode()).hexdigest()[:32]}"'
+
+    @property
+    def last_modified(self):
+        return self.state[1]
+
+    @property
+    def key(self):
+        return cache_key(self.namespace, self.params, self.state[0])
+
+    def get(self):
+        return get_or_build(self.namespace, self.params, self.scopes, self.build, versions=self.state[0])
+
+    def cached(self):
+        """The cached data, or None: never builds."""
+        return cached(self.key)
+
+    def store(self, data):
+        """Caches data built some other way (e.g. with other payloads' in one query)."""
+        store(self.key, data)
+
+    async def aload_state(self):
+        """Loads the data versions with the async ORM, so .etag etc. don't block."""
+        if self._state is None:
+            self._state = await adata_state(self.scopes)
+
+    async def aget(self):
+        await self.aload_state()
+        return await aget_or_build(self.namespace, self.params, self.state[0], self.build)
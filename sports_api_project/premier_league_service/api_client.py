@@ -0,0 +1,310 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .json_decoding import DECODE_ERRORS, get_loads, stream_page, streaming_available
+from .response_cache import cache_key, content_hash
+
+# --- Constants ---
+API_BASE_URL = "https://footballapi.pulselive.com/football"
+HEADERS = {'Origin': 'https://www.premierleague.com'}
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE = 10.0  # Requests per second across all workers
+DEFAULT_TIMEOUT = 30
+DEFAULT_PREFETCH_PAGES = 4
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    Each request takes one token, blocking until one is available.
+    This replaces the fixed time.sleep() calls between requests.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then takes it."""
+        if self.rate <= 0:
+            return  # Rate limiting disabled
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class UnchangedResponse(dict):
+    """
+    Decoded JSON that is identical to what the previous scrape saw.
+
+    Returned (instead of a plain dict) when a response came back 304, matched
+    the cached content hash, or was served from an immutable cache entry.
+    Callers can skip re-processing it.
+    """
+
+
+class ApiClient:
+    """
+    Fetches JSON from the pulselive API over a pooled keep-alive session.
+
+    A single requests.Session is shared by all worker threads so TCP/TLS
+    connections are reused. fetch_many() runs up to `concurrency` requests
+    at once, and every request passes through the shared TokenBucket.
+
+    If a ResponseCache is given, requests are sent as conditional GETs and
+    entries for which `is_immutable(endpoint, params)` is true are never
+    requested again once cached. New responses are only held in memory
+    until the caller has stored their data and calls commit_cache(); a
+    response whose data never made it to the database is fetched (and
+    processed) again next time.
+
+    With `report_unchanged=False` cached bodies are still used (no 304 or
+    immutable entry is downloaded again) but are returned as plain data,
+    so the caller processes them as if they were new.
+
+    With a `recorder` ResponseStore every decoded response is also recorded;
+    with a `replay` ResponseStore responses are served from it and the
+    network is never touched.
+
+    If `metrics` (a ScrapeMetrics) is given, every request's outcome,
+    latency, response size and JSON decode time are recorded.
+
+    Bodies are decoded with the `json_backend` (see json_decoding). Pages
+    from endpoints in `stream_endpoints` are returned as StreamedPage, whose
+    'content' array is parsed item by item as the caller iterates it.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                 timeout=DEFAULT_TIMEOUT, log_error=None, cache=None, is_immutable=None,
+                 recorder=None, replay=None, metrics=None, json_backend='auto',
+                 stream_endpoints=(), report_unchanged=True):
+        self.concurrency = max(1, int(concurrency))
+        self.timeout = timeout
+        self.rate_limiter = TokenBucket(rate)
+        self.log_error = log_error or (lambda message: None)
+        self.cache = cache
+        self.is_immutable = is_immutable or (lambda endpoint, params: False)
+        self.report_unchanged = report_unchanged
+        self.recorder = recorder
+        self.replay = replay
+        self.metrics = metrics
+        self.loads = get_loads(json_backend)
+        self.stream_endpoints = set(stream_endpoints) if streaming_available() else set()
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        # Size the connection pool to the worker count so no thread
+        # ever has to open a throwaway connection.
+        adapter = HTTPAdapter(
+            pool_connections=self.concurrency,
+            pool_maxsize=self.concurrency,
+            max_retries=Retry(total=3, backoff_factor=0.5,
+                              status_forcelist=(429, 500, 502, 503, 504),
+                              allowed_methods=('GET',)),
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                           thread_name_prefix='api-fetch')
+
+        # Fetched responses not yet written to the cache, by cache key
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+
+    def fetch(self, endpoint, params=None):
+        """
+        Fetches a single endpoint. Returns the decoded JSON or None on error.
+        Responses known to be unchanged are returned as UnchangedResponse.
+        """
+        params = params or {}
+        url = f"{API_BASE_URL}/{endpoint}"
+
+        if self.replay is not None:
+            body, unchanged = self.replay.load(endpoint, params), False
+            if body is None:
+                self.log_error(f"No recorded response for {url} with params {params}")
+                self._record_request(endpoint, 'missing')
+                return None
+            self._record_request(endpoint, 'replayed', response_bytes=len(body))
+        else:
+            result = self._fetch_body(url, endpoint, params)
+            if result is None:
+                return None
+            body, unchanged = result
+            unchanged = unchanged and self.report_unchanged
+
+        decode_start = time.perf_counter()
+        try:
+            if endpoint in self.stream_endpoints and not unchanged:
+                data = stream_page(body, on_item_decoded=self._decode_timer(endpoint))
+            else:
+                data = self.loads(body)
+        except DECODE_ERRORS as e:
+            self.log_error(f"Error decoding JSON from {url}: {e}")
+            return None
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_decode(endpoint, time.perf_counter() - decode_start)
+
+        if self.recorder is not None:
+            self.recorder.record(endpoint, params, body)
+        return UnchangedResponse(data) if unchanged else data
+
+    def _fetch_body(self, url, endpoint, params):
+        """
+        Returns (body, unchanged) for a request, going through the response
+        cache when one is configured, or None on error.
+        """
+        entry = self.cache.get(endpoint, params) if self.cache is not None else None
+        if entry is not None and entry.immutable:
+            # Closed seasons never change, so don't even ask.
+            self._record_request(endpoint, 'cached')
+            return entry.body, True
+
+        self.rate_limiter.acquire()
+        request_start = time.perf_counter()
+        try:
+            response = self.session.get(
+                url, params=params, timeout=self.timeout,
+                headers=entry.conditional_headers() if entry is not None else None
+            )
+            latency = time.perf_counter() - request_start
+            if response.status_code == 304 and entry is not None:
+                self._record_request(endpoint, 'not_modified', latency)
+                return entry.body, True
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            self.log_error(f"Error fetching {url} with params {params}: {e}")
+            self._record_request(endpoint, 'error', time.perf_counter() - request_start)
+            return None
+
+        body = response.content
+        self._record_request(endpoint, 'ok', latency, response_bytes=len(body))
+        if not body:
+            # Log an empty response but don't crash
+            self.log_error(f"Empty response from {url} with params {params}")
+            return None
+
+        unchanged = False
+        if self.cache is not None:
+            unchanged = entry is not None and entry.content_hash == content_hash(body)
+            with self.pending_lock:
+                self.pending[cache_key(endpoint, params)] = (endpoint, params, body, {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'immutable': self.is_immutable(endpoint, params),
+                })
+        return body, unchanged
+
+    def commit_cache(self, calls):
+        """
+        Writes the fetched responses for (endpoint, params) `calls` to the
+        cache. Call only once their data is committed to the database:
+        from then on they count as unchanged (or, for immutable entries,
+        aren't requested at all).
+        """
+        if self.cache is None:
+            return
+        with self.pending_lock:
+            entries = [self.pending.pop(cache_key(endpoint, params), None) for endpoint, params in calls]
+        for entry in entries:
+            if entry is not None:
+                endpoint, params, body, validators = entry
+                self.cache.put(endpoint, params, body, **validators)
+
+    def _decode_timer(self, endpoint):
+        if self.metrics is None:
+            return None
+        return lambda seconds: self.metrics.record_decode(endpoint, seconds)
+
+    def _record_request(self, endpoint, outcome, latency=None, response_bytes=0):
+        if self.metrics is not None:
+            self.metrics.record_request(endpoint, outcome, latency, response_bytes)
+
+    def fetch_many(self, calls):
+        """
+        Fetches many (endpoint, params) pairs concurrently.
+        Returns the decoded results in the same order as `calls`.
+        """
+        futures = [self.executor.submit(self.fetch, endpoint, params)
+                   for endpoint, params in calls]
+        return [future.result() for future in futures]
+
+    def fetch_iter(self, calls, window=None):
+        """
+        Lazily fetches (endpoint, params) pairs, yielding (call, result) in order.
+
+        At most `window` requests (default: 2x concurrency) are in flight or
+        buffered at any time, so arbitrarily long call lists run in bounded
+        memory while the caller processes earlier results.
+        """
+        window = window or self.concurrency * 2
+        in_flight = deque()
+        for call in calls:
+            in_flight.append((call, self.submit(*call)))
+            if len(in_flight) >= window:
+                done_call, future = in_flight.popleft()
+                yield done_call, future.result()
+        while in_flight:
+            done_call, future = in_flight.popleft()
+            yield done_call, future.result()
+
+    def iter_pages(self, endpoint, params, prefetch=DEFAULT_PREFETCH_PAGES, skip_pages=()):
+        """
+        Streams a paginated endpoint, yielding (page_number, data) in order.
+
+        The first page is fetched to learn `pageInfo.numPages`; after that the
+        worker pool prefetches up to `prefetch` pages ahead while the caller
+        is still processing (e.g. upserting) the current one. Stops early at
+        the first page that fails or has no content. Pages in `skip_pages`
+        are neither fetched (apart from page 0) nor yielded.
+        """
+        first_page = self.fetch(endpoint, {**params, 'page': 0})
+        if not first_page or 'content' not in first_page:
+            return
+        if 0 not in skip_pages:
+            yield 0, first_page
+
+        total_pages = first_page.get('pageInfo', {}).get('numPages', 1)
+        calls = (
+            (endpoint, {**params, 'page': page}) for page in range(1, total_pages)
+            if page not in skip_pages
+        )
+        for (_, page_params), data in self.fetch_iter(calls, window=max(1, prefetch)):
+            if not data or 'content' not in data:
+                return
+            yield page_params['page'], data
+
+    def submit(self, endpoint, params=None):
+        """Schedules a fetch on the worker pool and returns its Future."""
+        return self.executor.submit(self.fetch, endpoint, params)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,93 @@
+"""
+Async versions of the read endpoints, for serving under ASGI (e.g.
+`uvicorn sports_api_project.asgi:application`).
+
+They take the same query params and return the same JSON as the DRF
+views. The data versions (for the ETag / 304) and the stored response
+blob are read with the async ORM, which still runs each query in a
+worker thread (Django's database layer is sync), so every request makes
+at least one thread hop; a cache miss also runs the sync build there.
+What the event loop saves is a thread per connection: a client that is
+slow to send its request or read the response holds no thread while it
+waits, so a single worker can keep thousands of slow clients connected
+at once.
+
+JSON only - the browsable API stays on the sync views.
+"""
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .renderers import ORJSONRenderer
+from .response_blobs import aload_blob, encoded_etag, negotiate_encodings, request_etag
+from .views import fixtures_request, leaderboard_request, league_table_request, player_stats_request
+
+
+def json_response(data, status=200):
+    return HttpResponse(ORJSONRenderer().render(data), content_type='application/json', status=status)
+
+
+async def serve(request, make_payload):
+    """The async counterpart of views.conditional_response(), plus the views' error handling."""
+    try:
+        payload = make_payload(request.GET)
+    except ValueError as e:
+        return json_response({"error": str(e)}, status=400)
+
+    try:
+        await payload.aload_state()
+        # HTTP dates have whole-second precision
+        last_modified = int(payload.last_modified.timestamp()) if payload.last_modified else None
+        not_modified = get_conditional_response(
+            request, etag=request_etag(request, payload.etag), last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+
+        blob = await aload_blob(payload, negotiate_encodings(request))
+        encoding = None
+        if blob is not None:
+            body, encoding = blob
+            response = HttpResponse(body, content_type='application/json')
+            if encoding:
+                response['Content-Encoding'] = encoding
+        else:
+            response = json_response(await payload.aget())
+
+    except Http404 as e:
+        return json_response({"error": str(e)}, status=404)
+    except Exception as e:
+        return json_response({"error": f"An unexpected error occurred: {str(e)}"}, status=500)
+
+    response['ETag'] = encoded_etag(payload.etag, encoding)
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Clients may keep the body but must revalidate it before reuse
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+@require_safe
+async def league_table(request):
+    """LeagueTableView, async. Same query params."""
+    return await serve(request, league_table_request)
+
+
+@require_safe
+async def player_stats(request):
+    """PlayerStatsView, async. Same query params."""
+    return await serve(request, player_stats_request)
+
+
+@require_safe
+async def leaderboard(request):
+    """LeaderboardView, async. Same query params."""
+    return await serve(request, leaderboard_request)
+
+
+@require_safe
+async def fixtures(request):
+    """FixturesView, async. Same query params."""
+    return await serve(request, fixtures_request)
@@ -0,0 +1,99 @@
+"""
+Bulk exports of the raw tables as NDJSON or CSV, for analytics jobs.
+
+Rows are read with a chunked (server-side on PostgreSQL) cursor and
+written out a chunk at a time, so an export's memory use doesn't grow
+with the number of seasons stored. Used by the export view and by
+`manage.py export_data`.
+"""
+import csv
+import datetime
+
+from .models import Club, Fixture, LeagueTable, Player, PlayerStat
+from .renderers import ORJSONRenderer
+
+# Format -> (content type, file extension)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+}
+
+# The exportable datasets. Each is every row of its model, in primary key order.
+EXPORT_MODELS = {
+    'clubs': Club,
+    'fixtures': Fixture,
+    'tables': LeagueTable,
+    'players': Player,
+    'player-stats': PlayerStat,
+}
+
+# Rows read from the database (and written out) per chunk
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_columns(dataset):
+    """The dataset's column names: every model field, with foreign keys as ids (e.g. 'club_id')."""
+    return [field.attname for field in EXPORT_MODELS[dataset]._meta.concrete_fields]
+
+
+def export_queryset(dataset, season=None):
+    """
+    The rows to export, as tuples in export_columns() order. Raises
+    ValueError if `season` is given for a dataset that has no seasons.
+    """
+    model = EXPORT_MODELS[dataset]
+    queryset = model.objects.order_by('pk')
+    if season:
+        if not any(field.name == 'season' for field in model._meta.concrete_fields):
+            raise ValueError(f"'{dataset}' can't be filtered by season.")
+        queryset = queryset.filter(season=season)
+    return queryset.values_list(*export_columns(dataset))
+
+
+class _Echo:
+    """A file-like object whose write() returns the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _plain(row):
+    # Datetimes are written the same way in both formats, e.g. 2024-08-10T15:00:00+00:00
+    return [value.isoformat() if isinstance(value, datetime.datetime) else value for value in row]
+
+
+def export_chunks(dataset, export_format, season=None):
+    """
+    Returns an iterator over the export as strings, EXPORT_CHUNK_SIZE rows
+    at a time (CSV starts with a header line). Raises ValueError for a bad
+    season filter straight away, rather than part way through a response.
+    """
+    columns = export_columns(dataset)
+    rows = export_queryset(dataset, season).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    if export_format == 'csv':
+        writer = csv.writer(_Echo())
+        header = writer.writerow(columns)
+
+        def format_row(row):
+            return writer.writerow(_plain(row))
+    else:
+        renderer = ORJSONRenderer()
+        header = None
+
+        def format_row(row):
+            return renderer.render(dict(zip(columns, _plain(row)))).decode() + '\n'
+
+    def generate():
+        if header:
+            yield header
+        chunk = []
+        for row in rows:
+            chunk.append(format_row(row))
+            if len(chunk) == EXPORT_CHUNK_SIZE:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+
+    return generate()
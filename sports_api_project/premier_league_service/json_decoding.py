@@ -0,0 +1,134 @@
+import io
+import json
+import time
+
+# Both backends are optional; we fall back to the standard library.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:
+    ijson = None
+
+JSON_BACKENDS = ('auto', 'stdlib', 'orjson')
+
+# Exceptions any backend may raise for malformed JSON
+DECODE_ERRORS = (ValueError, ijson.JSONError) if ijson is not None else (ValueError,)
+
+
+def get_loads(backend='auto'):
+    """
+    Returns a `loads(bytes)` function for the named backend.
+    'auto' picks orjson when it is installed.
+    """
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{backend}'. Use one of: {', '.join(JSON_BACKENDS)}.")
+    if backend == 'orjson' and orjson is None:
+        raise ValueError("The 'orjson' JSON backend is not installed (pip install orjson).")
+    if backend in ('auto', 'orjson') and orjson is not None:
+        return orjson.loads
+    return json.loads
+
+
+def streaming_available():
+    return ijson is not None
+
+
+class StreamedPage(dict):
+    """
+    A page whose large array (e.g. 'content') is parsed item by item.
+
+    The top-level keys before the array are decoded up front and the array
+    key holds a one-shot iterator, so only one item is materialised at a
+    time instead of the whole page's object tree. When the array is the
+    last key (as in the API's pages) the body is tokenised just once; keys
+    after it are decoded by a second pass over the body, the first time
+    one is looked up.
+    """
+
+    def __init__(self, fields, body=None, array_key=None):
+        super().__init__(fields)
+        self._body = body # Set while keys after the array are still undecoded
+        self._array_key = array_key
+
+    def _load_trailing(self, key):
+        if self._body is None or dict.__contains__(self, key):
+            return
+        body, self._body = self._body, None
+        for name, value in ijson.kvitems(io.BytesIO(body), '', use_float=True):
+            if name != self._array_key and not dict.__contains__(self, name):
+                dict.__setitem__(self, name, value)
+
+    def __getitem__(self, key):
+        self._load_trailing(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self._load_trailing(key)
+        return super().__contains__(key)
+
+    def get(self, key, default=None):
+        self._load_trailing(key)
+        return super().get(key, default)
+
+
+def _leading_fields(body, array_key):
+    """
+    Decodes the top-level keys of a JSON object up to `array_key`'s array,
+    stopping there. Returns (fields, True if the array was found).
+    """
+    fields = {}
+    events = ijson.parse(io.BytesIO(body), use_float=True)
+    for prefix, event, value in events:
+        if prefix != '' or event != 'map_key':
+            continue
+        key = value
+        _, event, value = next(events)
+        if key == array_key and event == 'start_array':
+            return fields, True
+        builder = ObjectBuilder()
+        depth = 0
+        while True:
+            builder.event(event, value)
+            depth += (event in ('start_map', 'start_array')) - (event in ('end_map', 'end_array'))
+            if depth == 0:
+                break
+            _, event, value = next(events)
+        fields[key] = builder.value
+    return fields, False
+
+
+def stream_page(body, array_key='content', on_item_decoded=None):
+    """
+    Parses `body` into a StreamedPage whose `array_key` is a lazy iterator.
+
+    Only the keys before the array are decoded straight away, so malformed
+    JSON further on raises one of DECODE_ERRORS from the iterator (or from
+    looking up a later key) rather than from here.
+    `on_item_decoded(seconds)` is called with the time spent decoding each item.
+    """
+    fields, found = _leading_fields(body, array_key)
+    if not found:
+        return StreamedPage(fields)
+    fields[array_key] = _iter_items(body, array_key, on_item_decoded)
+    return StreamedPage(fields, body, array_key)
+
+
+def _iter_items(body, array_key, on_item_decoded):
+    items = ijson.items(io.BytesIO(body), f'{array_key}.item', use_float=True)
+    if on_item_decoded is None:
+        yield from items
+        return
+
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(items)
+        except StopIteration:
+            return
+        on_item_decoded(time.perf_counter() - start)
+        yield item
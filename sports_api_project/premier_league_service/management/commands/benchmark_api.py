@@ -0,0 +1,94 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from premier_league_service import serializers, services
+from premier_league_service.models import LeagueTable, PlayerStat
+from premier_league_service.renderers import ORJSONRenderer
+
+
+def legacy_league_table(season):
+    """The original read path: model instances, dicts, then the DRF serializer."""
+    formatted_table = []
+    for entry in LeagueTable.objects.filter(season=season).select_related('club').order_by('position'):
+        formatted_table.append({
+            'position': entry.position,
+            'team': entry.club.club_name,
+            'played': entry.played,
+            'wins': entry.won,
+            'draws': entry.drawn,
+            'losses': entry.lost,
+            'goals_for': entry.goals_for,
+            'goals_against': entry.goals_against,
+            'points': entry.points,
+            'goal_difference': entry.goal_difference,
+            'form': entry.form
+        })
+    return serializers.LeagueTableEntrySerializer(formatted_table, many=True).data
+
+
+def legacy_player_stats(season, stat):
+    formatted_stats = []
+    player_stats = PlayerStat.objects.filter(season=season, **{f'{stat}__gt': 0}) \
+        .select_related('player', 'player__club').order_by(f'-{stat}', 'player_id')[:20]
+    for stat_line in player_stats:
+        formatted_stats.append({
+            'name': f"{stat_line.player.first_name or ''} {stat_line.player.last_name or ''}".strip(),
+            'club': stat_line.player.club.club_name if stat_line.player.club else 'Unknown',
+            'nationality': stat_line.player.nationality,
+            'stat': getattr(stat_line, stat)
+        })
+    return serializers.PlayerStatSerializer(formatted_stats, many=True).data
+
+
+def fast_league_table(season):
+    return serializers.fast_serialize(serializers.LeagueTableEntrySerializer, services.get_league_table_data(season))
+
+
+def fast_player_stats(season, stat):
+    return serializers.fast_serialize(serializers.PlayerStatSerializer, services.get_player_stats_data(season, stat))
+
+
+class Command(BaseCommand):
+    help = ('Compares the per-request CPU time of the original read path (model instances, DRF serializers, '
+            'JSONRenderer) with the fast path (values_list rows, fast_serialize, orjson).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', default='2024-2025', help='Season to query (default: 2024-2025).')
+        parser.add_argument('--requests', type=int, default=200, help='Requests to time per path (default: 200).')
+
+    def handle(self, *args, **options):
+        season = options['season']
+        requests = options['requests']
+        legacy_renderer, fast_renderer = JSONRenderer(), ORJSONRenderer()
+
+        cases = [
+            ('table', lambda: legacy_league_table(season), lambda: fast_league_table(season)),
+            ('player-stats', lambda: legacy_player_stats(season, 'goals'), lambda: fast_player_stats(season, 'goals')),
+        ]
+
+        self.stdout.write(f"Timing {requests} requests per path for {season} (CPU time per request):")
+        for name, legacy, fast in cases:
+            try:
+                legacy_body = legacy_renderer.render(legacy())
+                fast_body = fast_renderer.render(fast())
+            except Exception as e:
+                raise CommandError(f"Could not build '{name}' for {season}: {e}")
+            # The fast path must not change the output contract
+            if legacy_body != fast_body:
+                raise CommandError(f"'{name}' output differs between the two paths.")
+
+            legacy_time = self.time_path(requests, lambda: legacy_renderer.render(legacy()))
+            fast_time = self.time_path(requests, lambda: fast_renderer.render(fast()))
+            self.stdout.write(
+                f"  {name:<14} legacy {legacy_time * 1e6:9.1f} us   fast {fast_time * 1e6:9.1f} us   "
+                f"({legacy_time / fast_time:.1f}x, identical {len(fast_body)}-byte bodies)"
+            )
+
+    def time_path(self, requests, func):
+        func() # Warm up
+        start = time.process_time()
+        for _ in range(requests):
+            func()
+        return (time.process_time() - start) / requests
@@ -1,106 +1,248 @@
+import datetime
+import re
 import sys
+import time
 from collections import defaultdict
-from django.core.management.base import BaseCommand
-from django.db import transaction
-from django.db.models import F, Q
-from premier_league_service.models import Club, LeagueTable, Fixture
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F, Q, Max
+from premier_league_service.models import (
+    Club, LeagueTable, Fixture, LeagueTableContribution, LeagueTableSplit, LeagueTableSync, StandingsSnapshot
+)
+from premier_league_service.api_cache import bump_data_version
+from premier_league_service.metrics import ScrapeMetrics
+from premier_league_service.snapshots import build_snapshots, completed_fixtures
+from premier_league_service.standings import (
+    TABLE_FIELDS, apply_result, load_fixture_arrays, new_table, numpy_available, rank_table,
+    season_forms, season_table_from_db, season_tables_numpy, split_tables
+)
 # We import the season map from the scraper to know which seasons to process
 from premier_league_service.management.commands.run_scraper import SEASON_ID_MAP
 
+# 'sql' aggregates and ranks inside the database; 'python' is the original
+# loop; 'numpy' loads every season once and vectorises (form included).
+# The other engines, and incremental runs, fill in form afterwards (see write_forms).
+ENGINES = ('sql', 'python', 'numpy')
+BENCHMARK_ROUNDS = 3
+
+# Incremental runs re-read fixtures this far behind the high-water mark.
+# updated_at is stamped before a write commits, so a fixture written by a
+# concurrent run (e.g. --live during a nightly scrape) can become visible
+# with a timestamp older than a mark taken meanwhile. Fixtures re-read
+# with the result already in the ledger are skipped.
+SYNC_OVERLAP = datetime.timedelta(minutes=10)
+
+
+SEASON_LABEL_RE = re.compile(r'^\d{4}-\d{4}$')
+
+
+def counted_result(fixture):
+    """What a fixture contributes to its season's table: None unless it is completed."""
+    if fixture.status != 'COMPLETED':
+        return None
+    return (fixture.home_club_id, fixture.away_club_id, fixture.home_score or 0, fixture.away_score or 0)
+
+
+def season_fixtures_queryset(season):
+    """
+    Returns every fixture (any status) belonging to a "YYYY-YYYY" season.
+    Filtered on Fixture.season, so it uses the (season, status) index.
+    """
+    if not SEASON_LABEL_RE.match(season):
+        raise ValueError(f"Invalid season format: {season}")
+    return Fixture.objects.filter(season=season)
+
+
 class Command(BaseCommand):
     help = 'Calculates league table standings based on completed fixtures stored in the database.'
+    # run_scraper passes its own ScrapeMetrics so both commands share one report
+    stealth_options = ('metrics',)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season', action='append', dest='seasons', metavar='YYYY-YYYY',
+            help='Only recalculate this season (repeatable). Defaults to every season.'
+        )
+        parser.add_argument(
+            '--engine', choices=ENGINES, default='sql',
+            help="How full recalculations are computed: 'sql' (in the database, default), 'python' "
+                 "or 'numpy' (all seasons in one vectorised pass)."
+        )
+        parser.add_argument(
+            '--benchmark', action='store_true',
+            help='Time each engine computing the tables (nothing is written) and exit.'
+        )
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Only apply fixtures changed since the last calculation to the league table instead of '
+                 'rescanning every season. Only LeagueTable is updated incrementally: the point-in-time '
+                 'snapshots, home/away/last-6 tables and form of a changed season are still rebuilt from '
+                 'all of its completed fixtures.'
+        )
+        parser.add_argument(
+            '--metrics-json', metavar='PATH',
+            help='Write the JSON metrics report to PATH instead of stdout.'
+        )
+        parser.add_argument(
+            '--metrics-prom', metavar='PATH',
+            help='Also write the metrics in Prometheus text exposition format to PATH.'
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options):
+        engine = options.get('engine', 'sql')
+        if (engine == 'numpy' or options.get('benchmark')) and not numpy_available():
+            raise CommandError("The 'numpy' engine needs NumPy (pip install numpy).")
+        if options.get('benchmark'):
+            self.benchmark(options.get('seasons'))
+            return
+
+        shared_metrics = options.get('metrics')
+        metrics = shared_metrics or ScrapeMetrics()
         self.stdout.write("Starting league table calculation from results...")
 
+        with metrics.stage('calculate_tables'):
+            self.calculate_all(
+                metrics, options.get('seasons'), options.get('incremental', False), engine
+            )
+
+        self.stdout.write(self.style.SUCCESS("\n--- League table calculation complete! ---"))
+
+        if shared_metrics is None:
+            # Standalone run: report our own metrics
+            metrics.write_reports(options.get('metrics_json'), options.get('metrics_prom'), stdout=self.stdout)
+
+    def calculate_all(self, metrics, seasons=None, incremental=False, engine='sql'):
+        """Recalculates the table for the given seasons (default: every season in SEASON_ID_MAP)."""
         # Get all season labels from the scraper's map
-        seasons = SEASON_ID_MAP.keys()
-        
+        seasons = seasons or SEASON_ID_MAP.keys()
+        numpy_seasons = []
+        changed_seasons = []
+
         for season in seasons:
             self.stdout.write(f"\n--- Calculating table for {season} ---")
-            
-            # 1. Get all completed fixtures for this season.
-            # We filter by kickoff time to approximate the season's matches.
+
             try:
-                start_year = int(season.split('-')[0])
-                end_year = int(season.split('-')[1])
-            except (ValueError, IndexError):
+                all_fixtures = season_fixtures_queryset(season)
+            except ValueError:
                 self.stderr.write(self.style.ERROR(f"Invalid season format: {season}. Skipping."))
                 continue
 
-            season_fixtures = Fixture.objects.filter(
-                status='COMPLETED',
-                kickoff_time__year__gte=start_year,
-                kickoff_time__year__lte=end_year
-            ).select_related('home_club', 'away_club')
+            if incremental:
+                sync = LeagueTableSync.objects.filter(season=season).first()
+                if sync is not None:
+                    if self.apply_fixture_changes(season, all_fixtures, sync, metrics):
+                        changed_seasons.append(season)
+                    continue
+                self.stdout.write(f"No incremental state for {season} yet. Doing a full calculation.")
 
-            if not season_fixtures.exists():
-                self.stdout.write(self.style.WARNING(f"No completed fixtures found for {season}. Skipping."))
+            if engine == 'numpy':
+                numpy_seasons.append(season) # Calculated together below
+            elif engine == 'sql':
+                if self.calculate_season_sql(season, all_fixtures, metrics):
+                    changed_seasons.append(season)
+            elif self.calculate_season(season, all_fixtures, metrics):
+                changed_seasons.append(season)
+
+        # The numpy engine writes form along with the table
+        with_form = []
+        if numpy_seasons:
+            with_form = self.calculate_seasons_numpy(numpy_seasons, metrics)
+            changed_seasons.extend(with_form)
+
+        rebuilt = self.rebuild_derived_tables(seasons, changed_seasons, metrics, with_form)
+
+        # Cached API responses for these seasons are now stale
+        bump_data_version(*sorted({f'tables:{season}' for season in changed_seasons + rebuilt}))
+
+    def rebuild_derived_tables(self, seasons, changed_seasons, metrics, with_form=()):
+        """
+        Rebuilds the point-in-time snapshots, split tables and form of
+        changed seasons (and of any season missing snapshots, split tables
+        or form). These are not incremental: a changed season's completed
+        fixtures are all read again, once, and shared by all three. Form is
+        left alone for seasons in `with_form`, whose table was just written
+        with it. Returns the seasons rebuilt.
+        """
+        seasons = [season for season in seasons if SEASON_LABEL_RE.match(season)]
+        rebuilt = []
+        with_snapshots = set(
+            StandingsSnapshot.objects.filter(season__in=seasons).values_list('season', flat=True)
+        )
+        with_splits = set(
+            LeagueTableSplit.objects.filter(season__in=seasons).values_list('season', flat=True)
+        )
+        up_to_date = with_snapshots & with_splits
+        # Tables calculated before form was (e.g. by the 'sql' engine) have it blank
+        up_to_date -= set(
+            LeagueTable.objects.filter(season__in=seasons, played__gt=0)
+            .filter(Q(form='') | Q(form=None)).values_list('season', flat=True)
+        )
+        for season in seasons:
+            if season not in changed_seasons and season in up_to_date:
                 continue
+            fixtures = completed_fixtures(season)
+            if not fixtures and season not in with_snapshots | with_splits:
+                continue # Not started yet: nothing to build and nothing stale to clear
+            with metrics.db_write('standings_snapshots', 2):
+                matchdays = build_snapshots(season, fixtures)
+            if matchdays:
+                self.stdout.write(f"Rebuilt point-in-time standings for {season} ({matchdays} matchdays).")
+            self.write_split_tables(season, fixtures, metrics)
+            if season not in with_form:
+                self.write_forms(season, fixtures, metrics)
+            rebuilt.append(season)
+        return rebuilt
 
-            # 2. Initialize a stats dictionary for each club
-            # Get all clubs that participated in this season's fixtures
-            club_ids = set(season_fixtures.values_list('home_club_id', flat=True)) | \
-                       set(season_fixtures.values_list('away_club_id', flat=True))
-            
-            # Use defaultdict to automatically create a new stat dict for each club
-            table_stats = defaultdict(lambda: defaultdict(int))
-
-            # 3. Iterate over each match and update stats
-            for fixture in season_fixtures:
-                home_id = fixture.home_club_id
-                away_id = fixture.away_club_id
-                
-                # Ensure scores are not None
-                home_goals = fixture.home_score or 0
-                away_goals = fixture.away_score or 0
-
-                # Update common stats for both teams
-                table_stats[home_id]['played'] += 1
-                table_stats[away_id]['played'] += 1
-                table_stats[home_id]['goals_for'] += home_goals
-                table_stats[away_id]['goals_for'] += away_goals
-                table_stats[home_id]['goals_against'] += away_goals
-                table_stats[away_id]['goals_against'] += home_goals
-
-                # Determine Win/Draw/Loss and assign points
-                if home_goals > away_goals:
-                    # Home win
-                    table_stats[home_id]['won'] += 1
-                    table_stats[home_id]['points'] += 3
-                    table_stats[away_id]['lost'] += 1
-                elif home_goals < away_goals:
-                    # Away win
-                    table_stats[away_id]['won'] += 1
-                    table_stats[away_id]['points'] += 3
-                    table_stats[home_id]['lost'] += 1
-                else:
-                    # Draw
-                    table_stats[home_id]['drawn'] += 1
-                    table_stats[home_id]['points'] += 1
-                    table_stats[away_id]['drawn'] += 1
-                    table_stats[away_id]['points'] += 1
-
-            # 4. Calculate GD and create a sorted list for position
-            calculated_table = []
-            for club_id, stats in table_stats.items():
-                stats['goal_difference'] = stats['goals_for'] - stats['goals_against']
-                stats['club_id'] = club_id # Add club_id for sorting
-                calculated_table.append(stats)
-            
-            # 5. Sort the table to determine position
-            # Sort by points (desc), then GD (desc), then GF (desc)
-            calculated_table.sort(
-                key=lambda x: (x['points'], x['goal_difference'], x['goals_for']),
-                reverse=True
+    def write_split_tables(self, season, fixtures, metrics):
+        """Replaces a season's home, away and last-6 tables, all computed in one pass."""
+        split_objects = [
+            LeagueTableSplit(
+                club_id=club_id,
+                season=season,
+                view=view,
+                position=position,
+                form=form,
+                **{field: stats[field] for field in TABLE_FIELDS}
             )
+            for view, rows in split_tables(fixtures).items()
+            for position, club_id, stats, form in rows
+        ]
+        with transaction.atomic(), metrics.db_write('split_tables', len(split_objects)):
+            LeagueTableSplit.objects.filter(season=season).delete()
+            LeagueTableSplit.objects.bulk_create(split_objects)
+        if split_objects:
+            self.stdout.write(f"Wrote {len(split_objects)} home/away/last-6 table entries for {season}.")
+
+    def write_forms(self, season, fixtures, metrics):
+        """Sets each club's form in a season's league table from its completed fixtures."""
+        forms = season_forms(fixtures)
+        rows = list(LeagueTable.objects.filter(season=season))
+        for row in rows:
+            row.form = forms.get(row.club_id, '')
+        with metrics.db_write('calculate_tables', len(rows)):
+            LeagueTable.objects.bulk_update(rows, ['form'])
+
+    def calculate_season(self, season, all_fixtures, metrics):
+        """Recalculates one season's table from scratch."""
+        # 1. Get all completed fixtures for this season.
+        # Note the high-water mark first: anything changed after it
+        # is picked up by the next incremental run.
+        synced_through = all_fixtures.aggregate(latest=Max('updated_at'))['latest']
+        season_fixtures = list(all_fixtures.filter(status='COMPLETED'))
 
-            # 6. Upsert the calculated data into the LeagueTable model
-            update_count = 0
+        if not season_fixtures:
+            self.stdout.write(self.style.WARNING(f"No completed fixtures found for {season}. Skipping."))
+            return False
+
+        calculated_table = self.build_table_python(season_fixtures)
+
+        # 6. Upsert the calculated data into the LeagueTable model
+        # Each season commits in its own short transaction.
+        update_count = 0
+        with transaction.atomic(), metrics.db_write('calculate_tables', len(calculated_table)):
             for i, stats in enumerate(calculated_table):
                 position = i + 1
-                
+            
                 # This will overwrite the data from the scraper with our
                 # more accurate, calculated data.
                 _, created = LeagueTable.objects.update_or_create(
@@ -116,13 +258,307 @@ class Command(BaseCommand):
                         'goals_against': stats['goals_against'],
                         'points': stats['points'],
                         'goal_difference': stats['goal_difference'],
-                        'form': '' # We don't calculate form, so we leave it blank
+                        # form is set by write_forms() afterwards
                     }
                 )
                 if not created:
                     update_count += 1
 
-            self.stdout.write(f"Processed {len(season_fixtures)} fixtures for {len(calculated_table)} clubs.")
-            self.stdout.write(f"Updated {update_count} and created {len(calculated_table) - update_count} league table entries for {season}.")
+            # Remember exactly what was counted, for later incremental runs
+            self.reset_sync_state(season, season_fixtures, synced_through)
+
+        self.stdout.write(f"Processed {len(season_fixtures)} fixtures for {len(calculated_table)} clubs.")
+        self.stdout.write(f"Updated {update_count} and created {len(calculated_table) - update_count} league table entries for {season}.")
+        return True
+
+    def build_table_python(self, season_fixtures):
+        """Builds a season's table from its completed fixtures with plain dicts, in position order."""
+        # 2. Initialize a stats dictionary for each club
+        # Use defaultdict to automatically create a new stat dict for each club
+        table_stats = defaultdict(lambda: defaultdict(int))
+
+        # 3. Iterate over each match and update stats
+        for fixture in season_fixtures:
+            home_id = fixture.home_club_id
+            away_id = fixture.away_club_id
+            
+            # Ensure scores are not None
+            home_goals = fixture.home_score or 0
+            away_goals = fixture.away_score or 0
+
+            # Update common stats for both teams
+            table_stats[home_id]['played'] += 1
+            table_stats[away_id]['played'] += 1
+            table_stats[home_id]['goals_for'] += home_goals
+            table_stats[away_id]['goals_for'] += away_goals
+            table_stats[home_id]['goals_against'] += away_goals
+            table_stats[away_id]['goals_against'] += home_goals
+
+            # Determine Win/Draw/Loss and assign points
+            if home_goals > away_goals:
+                # Home win
+                table_stats[home_id]['won'] += 1
+                table_stats[home_id]['points'] += 3
+                table_stats[away_id]['lost'] += 1
+            elif home_goals < away_goals:
+                # Away win
+                table_stats[away_id]['won'] += 1
+                table_stats[away_id]['points'] += 3
+                table_stats[home_id]['lost'] += 1
+            else:
+                # Draw
+                table_stats[home_id]['drawn'] += 1
+                table_stats[home_id]['points'] += 1
+                table_stats[away_id]['drawn'] += 1
+                table_stats[away_id]['points'] += 1
+
+        # 4. Calculate GD and create a sorted list for position
+        calculated_table = []
+        for club_id, stats in table_stats.items():
+            stats['goal_difference'] = stats['goals_for'] - stats['goals_against']
+            stats['club_id'] = club_id # Add club_id for sorting
+            calculated_table.append(stats)
+        
+        # 5. Sort the table to determine position
+        # Sort by points (desc), then GD (desc), then GF (desc)
+        calculated_table.sort(
+            key=lambda x: (x['points'], x['goal_difference'], x['goals_for']),
+            reverse=True
+        )
+
+        return calculated_table
+
+    def calculate_season_sql(self, season, all_fixtures, metrics):
+        """
+        Recalculates one season's table from scratch inside the database:
+        one aggregate/rank query, one bulk upsert, and the ledger is rebuilt
+        with INSERT ... SELECT. No fixture rows are loaded into Python.
+        """
+        synced_through = all_fixtures.aggregate(latest=Max('updated_at'))['latest']
+        calculated_table = season_table_from_db(season)
+
+        if not calculated_table:
+            self.stdout.write(self.style.WARNING(f"No completed fixtures found for {season}. Skipping."))
+            return False
+
+        table_objects = [
+            LeagueTable(
+                club_id=row['club_id'],
+                season=season,
+                position=row['position'],
+                **{field: row[field] for field in TABLE_FIELDS}
+            )
+            for row in calculated_table
+        ]
+
+        with transaction.atomic(), metrics.db_write('calculate_tables', len(table_objects)):
+            # This will overwrite the data from the scraper with our
+            # more accurate, calculated data (form is set by write_forms() afterwards)
+            LeagueTable.objects.bulk_create(
+                table_objects,
+                update_conflicts=True,
+                unique_fields=['club', 'season'],
+                update_fields=['position', *TABLE_FIELDS]
+            )
+            counted = self.reset_sync_state_in_db(season, synced_through)
+
+        self.stdout.write(f"Processed {counted} fixtures for {len(table_objects)} clubs.")
+        self.stdout.write(f"Upserted {len(table_objects)} league table entries for {season}.")
+        return True
+
+    def calculate_seasons_numpy(self, seasons, metrics):
+        """
+        Recalculates many seasons from scratch in one pass: every completed
+        fixture is loaded once as integer arrays and all the tables (with
+        form) are computed together, then written season by season.
+        """
+        synced_through = dict(
+            Fixture.objects.filter(season__in=seasons).values('season')
+            .annotate(latest=Max('updated_at')).values_list('season', 'latest')
+        )
+        fixtures = load_fixture_arrays(seasons)
+        tables = season_tables_numpy(fixtures)
+        written = []
+        self.stdout.write(f"Calculated {len(tables)} seasons from {len(fixtures)} fixtures in one pass.")
+
+        for season in seasons:
+            calculated_table = tables.get(season)
+            if not calculated_table:
+                self.stdout.write(self.style.WARNING(f"No completed fixtures found for {season}. Skipping."))
+                continue
+
+            table_objects = [
+                LeagueTable(
+                    club_id=row['club_id'],
+                    season=season,
+                    position=row['position'],
+                    form=row['form'],
+                    **{field: row[field] for field in TABLE_FIELDS}
+                )
+                for row in calculated_table
+            ]
+            with transaction.atomic(), metrics.db_write('calculate_tables', len(table_objects)):
+                LeagueTable.objects.bulk_create(
+                    table_objects,
+                    update_conflicts=True,
+                    unique_fields=['club', 'season'],
+                    update_fields=['position', 'form', *TABLE_FIELDS]
+                )
+                self.reset_sync_state_in_db(season, synced_through.get(season))
+            self.stdout.write(f"Upserted {len(table_objects)} league table entries for {season}.")
+            written.append(season)
+
+        return written
+
+    def benchmark(self, seasons=None):
+        """Times each engine computing (not writing) the tables; reports the best of BENCHMARK_ROUNDS."""
+        seasons = seasons or list(SEASON_ID_MAP.keys())
+        for season in seasons:
+            season_fixtures_queryset(season) # Validates the labels up front
+
+        def run_python():
+            for season in seasons:
+                self.build_table_python(list(season_fixtures_queryset(season).filter(status='COMPLETED')))
+
+        def run_sql():
+            for season in seasons:
+                season_table_from_db(season)
+
+        def run_numpy():
+            season_tables_numpy(load_fixture_arrays(seasons))
+
+        fixtures = load_fixture_arrays(seasons)
+
+        def run_numpy_compute():
+            season_tables_numpy(fixtures)
+
+        self.stdout.write(
+            f"Benchmarking {len(seasons)} seasons ({len(fixtures)} completed fixtures), "
+            f"best of {BENCHMARK_ROUNDS} runs:"
+        )
+        for name, func in [
+            ('python (dict loop)', run_python),
+            ('sql', run_sql),
+            ('numpy (load + compute)', run_numpy),
+            ('numpy (compute only)', run_numpy_compute),
+        ]:
+            timings = []
+            for _ in range(BENCHMARK_ROUNDS):
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+            self.stdout.write(f"  {name:<24} {min(timings) * 1000:10.2f} ms")
+
+    def reset_sync_state_in_db(self, season, synced_through):
+        """
+        Same as reset_sync_state(), but copies the counted fixtures into the
+        ledger with one INSERT ... SELECT. Returns the number of fixtures counted.
+        """
+        quote = connection.ops.quote_name
+        LeagueTableContribution.objects.filter(season=season).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {quote(LeagueTableContribution._meta.db_table)}"
+                " (season, fixture_id, home_club_id, away_club_id, home_score, away_score)"
+                " SELECT %s, fixture_id, home_club_id, away_club_id, COALESCE(home_score, 0), COALESCE(away_score, 0)"
+                f" FROM {quote(Fixture._meta.db_table)}"
+                " WHERE season = %s AND status = %s",
+                [season, season, 'COMPLETED']
+            )
+            counted = cursor.rowcount
+        LeagueTableSync.objects.update_or_create(season=season, defaults={'synced_through': synced_through})
+        return counted
+
+    def reset_sync_state(self, season, counted_fixtures, synced_through):
+        """Rebuilds the season's contribution ledger and high-water mark after a full calculation."""
+        LeagueTableContribution.objects.filter(season=season).delete()
+        LeagueTableContribution.objects.bulk_create([
+            LeagueTableContribution(
+                season=season,
+                fixture_id=fixture.fixture_id,
+                home_club_id=fixture.home_club_id,
+                away_club_id=fixture.away_club_id,
+                home_score=fixture.home_score or 0,
+                away_score=fixture.away_score or 0,
+            )
+            for fixture in counted_fixtures
+        ])
+        LeagueTableSync.objects.update_or_create(season=season, defaults={'synced_through': synced_through})
+
+    def apply_fixture_changes(self, season, all_fixtures, sync, metrics):
+        """
+        Incrementally updates one season's table: only fixtures changed since
+        the last calculation (less SYNC_OVERLAP) are read. Each changed one's
+        previous contribution (from the ledger) is subtracted and its current
+        result added, then the season's ~20 rows are re-ranked.
+        """
+        recent = list(all_fixtures.filter(updated_at__gt=sync.synced_through - SYNC_OVERLAP))
+        ledger = {
+            entry.fixture_id: entry for entry in
+            LeagueTableContribution.objects.filter(season=season, fixture_id__in=[f.fixture_id for f in recent])
+        }
+        changed = [
+            fixture for fixture in recent
+            if counted_result(fixture) != self.ledger_result(ledger.get(fixture.fixture_id))
+        ]
+        # The mark only moves forward, even when a late write had an older timestamp
+        synced_through = max([sync.synced_through, *(fixture.updated_at for fixture in recent)])
+        if not changed:
+            if synced_through != sync.synced_through:
+                sync.synced_through = synced_through
+                sync.save(update_fields=['synced_through'])
+            self.stdout.write(f"No fixture changes for {season}. Table is up to date.")
+            return False
+
+        rows = {row.club_id: row for row in LeagueTable.objects.filter(season=season)}
+        table = new_table()
+        for club_id, row in rows.items():
+            table[club_id] = {field: getattr(row, field) for field in TABLE_FIELDS}
+
+        new_entries = []
+        removed_ids = []
+        for fixture in changed:
+            old = ledger.get(fixture.fixture_id)
+            if old is not None:
+                apply_result(table, old.home_club_id, old.away_club_id, old.home_score, old.away_score, sign=-1)
+                removed_ids.append(old.pk)
+            result = counted_result(fixture)
+            if result is not None:
+                home_id, away_id, home_goals, away_goals = result
+                apply_result(table, home_id, away_id, home_goals, away_goals)
+                new_entries.append(LeagueTableContribution(
+                    season=season, fixture_id=fixture.fixture_id,
+                    home_club_id=home_id, away_club_id=away_id,
+                    home_score=home_goals, away_score=away_goals,
+                ))
+
+        # Re-rank the whole season (it's only ~20 rows), breaking ties like a full calculation
+        to_update, to_create = [], []
+        for position, club_id, stats in rank_table(table):
+            row = rows.get(club_id)
+            if row is None:
+                row = LeagueTable(club_id=club_id, season=season)
+                to_create.append(row)
+            else:
+                to_update.append(row)
+            row.position = position
+            for field in TABLE_FIELDS:
+                setattr(row, field, stats[field])
+
+        with transaction.atomic(), metrics.db_write('calculate_tables', len(to_update) + len(to_create)):
+            LeagueTable.objects.bulk_update(to_update, ['position', *TABLE_FIELDS])
+            LeagueTable.objects.bulk_create(to_create)
+            LeagueTableContribution.objects.filter(pk__in=removed_ids).delete()
+            LeagueTableContribution.objects.bulk_create(new_entries)
+            sync.synced_through = synced_through
+            sync.save(update_fields=['synced_through'])
+
+        self.stdout.write(f"Applied {len(changed)} changed fixtures to {season} incrementally.")
+        return True
 
-        self.stdout.write(self.style.SUCCESS("\n--- League table calculation complete! ---"))
\ No newline at end of file
+    @staticmethod
+    def ledger_result(entry):
+        """A ledger entry in counted_result()'s form (None if the fixture isn't counted)."""
+        if entry is None:
+            return None
+        return (entry.home_club_id, entry.away_club_id, entry.home_score, entry.away_score)
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from premier_league_service.exports import EXPORT_FORMATS, EXPORT_MODELS, export_chunks
+
+
+class Command(BaseCommand):
+    help = ('Writes every row of a dataset as NDJSON or CSV, streamed a chunk at a time so memory use stays '
+            'flat however much history is stored.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(EXPORT_MODELS), help='What to export.')
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='ndjson',
+                            help='Output format (default: ndjson).')
+        parser.add_argument('--season', help='Only export this season (not for clubs or players).')
+        parser.add_argument('--output', default='-', help='File to write to (default: stdout).')
+
+    def handle(self, *args, **options):
+        try:
+            chunks = export_chunks(options['dataset'], options['format'], options['season'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['output'] == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        # newline='' so the csv module's \r\n line endings are kept as they are
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Exported {options['dataset']} to {options['output']}."))
@@ -0,0 +1,182 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def parse_target(value):
+    name, sep, url = value.partition('=')
+    parts = urlsplit(url)
+    if not sep or not name or parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise CommandError(f"Invalid --target '{value}'. Use NAME=http://host:port/path?query.")
+    return name, parts
+
+
+def percentile(latencies, pct):
+    if not latencies:
+        return 0.0
+    return latencies[min(len(latencies) - 1, int(len(latencies) * pct / 100))]
+
+
+class Connection:
+    """A minimal keep-alive HTTP/1.1 client connection (stdlib only)."""
+
+    def __init__(self, url):
+        self.url = url
+        self.reader = self.writer = None
+
+    async def open(self):
+        port = self.url.port or (443 if self.url.scheme == 'https' else 80)
+        self.reader, self.writer = await asyncio.open_connection(
+            self.url.hostname, port, ssl=self.url.scheme == 'https'
+        )
+
+    def request_head(self):
+        path = self.url.path or '/'
+        if self.url.query:
+            path += '?' + self.url.query
+        return (f"GET {path} HTTP/1.1\r\nHost: {self.url.netloc}\r\n"
+                f"Accept: application/json\r\nAccept-Encoding: gzip, br\r\n")
+
+    async def get(self):
+        """Sends one request and reads the whole response. Returns the status code."""
+        if self.writer is None:
+            await self.open()
+        self.writer.write((self.request_head() + '\r\n').encode())
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Server closed the connection')
+        status = int(status_line.split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while size := int((await self.reader.readline()).split(b';')[0], 16):
+                await self.reader.readexactly(size + 2)
+            await self.reader.readline()
+        elif 'content-length' in headers:
+            await self.reader.readexactly(int(headers['content-length']))
+        else:
+            await self.reader.read() # Body ends when the connection does
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class Command(BaseCommand):
+    help = ('Load-tests the read API over HTTP and reports throughput and latency percentiles, e.g. to compare '
+            'the sync views under a WSGI server with the async views under an ASGI server:\n'
+            '  gunicorn sports_api_project.wsgi -w 1 --threads 16 -b :8000\n'
+            '  uvicorn sports_api_project.asgi:application --workers 1 --port 8001\n'
+            '  manage.py load_test_api --slow-clients 1000 \\\n'
+            '    --target wsgi=http://127.0.0.1:8000/api/premier-league/table/?season=2024-2025 \\\n'
+            '    --target asgi=http://127.0.0.1:8001/api/premier-league/async/table/?season=2024-2025')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', dest='targets', required=True, metavar='NAME=URL',
+            help='A URL to load-test, with a name for the report (repeatable; tested one after another).'
+        )
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per target (default: 2000).')
+        parser.add_argument('--concurrency', type=int, default=50,
+                            help='Connections sending requests at once (default: 50).')
+        parser.add_argument(
+            '--slow-clients', type=int, default=0,
+            help='Extra connections that send half a request and then sit idle for the whole run, '
+                 'like clients on slow networks (default: 0).'
+        )
+        parser.add_argument('--timeout', type=float, default=10.0,
+                            help='Seconds before a request counts as failed (default: 10).')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1 or options['timeout'] <= 0:
+            raise CommandError('--requests, --concurrency and --timeout must be positive.')
+        if options['slow_clients'] < 0:
+            raise CommandError('--slow-clients must be at least 0.')
+        targets = [parse_target(value) for value in options['targets']]
+
+        self.stdout.write(
+            f"{options['requests']} requests per target, {options['concurrency']} concurrent, "
+            f"{options['slow_clients']} slow clients:"
+        )
+        for name, url in targets:
+            latencies, errors, elapsed, held = asyncio.run(self.run_target(
+                url, options['requests'], options['concurrency'], options['slow_clients'], options['timeout']
+            ))
+            self.stdout.write(
+                f"  {name:<8} {len(latencies) / elapsed:8.1f} req/s   "
+                f"p50 {percentile(latencies, 50) * 1000:7.1f} ms   p99 {percentile(latencies, 99) * 1000:7.1f} ms   "
+                f"{errors} errors   {held}/{options['slow_clients']} slow clients held"
+            )
+            if errors and not latencies:
+                self.stdout.write(self.style.WARNING(f"  Every request to '{name}' failed: is the server running, and does it have a worker free?"))
+
+    async def run_target(self, url, requests, concurrency, slow_clients, timeout):
+        """Returns (sorted latencies of the successful requests, errors, elapsed seconds, slow clients held)."""
+        slow = [Connection(url) for _ in range(slow_clients)]
+        opened = await asyncio.gather(*(self.open_slow(connection) for connection in slow))
+
+        remaining = iter(range(requests))
+        latencies = []
+        errors = 0
+
+        async def worker():
+            nonlocal errors
+            connection = Connection(url)
+            for _ in remaining:
+                start = time.perf_counter()
+                try:
+                    status = await asyncio.wait_for(connection.get(), timeout)
+                except (OSError, ValueError, IndexError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    connection.close()
+                    errors += 1
+                    continue
+                if status < 400:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+            connection.close()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+        elapsed = time.perf_counter() - start
+
+        held = sum(await asyncio.gather(*(
+            self.still_waiting(connection) for connection, ok in zip(slow, opened) if ok
+        )))
+        for connection in slow:
+            connection.close()
+        latencies.sort()
+        return latencies, errors, elapsed, held
+
+    async def still_waiting(self, connection):
+        """A slow client was held for the whole run if the server hasn't answered or hung up on it."""
+        try:
+            await asyncio.wait_for(connection.reader.read(1), timeout=0.01)
+            return False
+        except asyncio.TimeoutError:
+            return True
+        except OSError:
+            return False
+
+    async def open_slow(self, connection):
+        try:
+            await connection.open()
+            connection.writer.write(connection.request_head().encode()) # No blank line: never finished
+            await connection.writer.drain()
+            return True
+        except OSError:
+            connection.close()
+            return False
@@ -1,17 +1,30 @@
-import requests
 import sys
-import time
 import datetime
-from django.core.management.base import BaseCommand
+import signal
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 # --- NEW ---
 from django.core import management # Import the management module
+from django.db import close_old_connections
 # --- END NEW ---
-from premier_league_service.models import Club, LeagueTable, Player, Fixture, PlayerStat
-
-# --- Constants ---
-API_BASE_URL = "https://footballapi.pulselive.com/football"
-HEADERS = {'Origin': 'https://www.premierleague.com'}
+from premier_league_service.models import (
+    Club, LeagueTable, LeagueTableSync, Player, Fixture, PlayerStat, ScrapeCheckpoint
+)
+from premier_league_service.api_client import (
+    API_BASE_URL, HEADERS, DEFAULT_CONCURRENCY, DEFAULT_RATE, DEFAULT_PREFETCH_PAGES,
+    ApiClient, UnchangedResponse
+)
+from premier_league_service import api_cache
+from premier_league_service.api_cache import bump_data_version
+from premier_league_service.json_decoding import JSON_BACKENDS, get_loads, streaming_available
+from premier_league_service.metrics import ScrapeMetrics
+from premier_league_service.recording import ResponseStore
+from premier_league_service.response_cache import ResponseCache
+from premier_league_service.scheduler import Scheduler
 
 # This map is crucial for fetching historical data
 # We map our clean "YYYY-YYYY" season label to the API's internal ID
@@ -26,9 +39,25 @@ SEASON_ID_MAP = {
     '2024-2025': 1064, # API ID for the current season
     '2025-2026': 1184, # API ID for the next season
 }
+# Reverse lookup from the API's season ID to our label
+SEASON_LABEL_BY_ID = {season_id: season_label for season_label, season_id in SEASON_ID_MAP.items()}
 # This tells the league table scraper to use a fallback endpoint
 CURRENT_SEASON_LABEL = '2024-2025'
 
+# Maps the API's fixture status codes to our Fixture.status values
+FIXTURE_STATUS_MAP = {
+    'U': 'SCHEDULED', # Upcoming
+    'L': 'LIVE',
+    'C': 'COMPLETED',
+}
+
+# Seasons before the current one are finished and their data will never
+# change upstream, so cached responses for them are marked immutable.
+CLOSED_SEASON_IDS = {
+    season_id for season_label, season_id in SEASON_ID_MAP.items()
+    if season_label < CURRENT_SEASON_LABEL
+}
+
 PARAMS_CLUBS = {'page': 0, 'pageSize': 100}
 PARAMS_FIXTURES = {'comps': 1, 'page': 0, 'pageSize': 100, 'sort': 'asc', 'statuses': 'U,L'} # Increased page size for fixtures
 
@@ -39,94 +68,291 @@ PARAMS_FIXTURES = {'comps': 1, 'page': 0, 'pageSize': 100, 'sort': 'asc', 'statu
 # We will call it with just comps=1, which should return all players.
 PARAMS_PLAYERS = {'page': 0, 'pageSize': 100, 'comps': 1}
 
+# Maps our PlayerStat fields to the API's stat names
+PLAYER_STAT_FIELDS = {
+    'goals': 'goals',
+    'assists': 'goal_assist',
+    'clean_sheets': 'clean_sheet',
+    'minutes_played': 'mins_played',
+    'passes': 'pass_acc',
+    'yellow_cards': 'yellow_card',
+    'red_cards': 'red_card',
+}
+STATS_BATCH_SIZE = 500
+
+# Default refresh cadences (seconds) for --daemon mode. Closed seasons
+# are refreshed once at start-up (and are usually served from the cache).
+DAEMON_INTERVALS = {
+    'live': 30,
+    'fixtures': 60 * 60,
+    'tables': 300,
+    'results': 900,
+    'players': 24 * 60 * 60,
+}
+
+# Live mode polls fixtures that are in play, or that kicked off within
+# LIVE_LOOKBACK (matches the API hasn't flagged as live yet) or kick off
+# within --live-window minutes.
+LIVE_LOOKBACK = datetime.timedelta(hours=3)
+# Fixtures flagged LIVE stop being polled this long after kickoff. Matches
+# the API never reports as finished (e.g. postponed or abandoned, whose
+# statuses aren't in FIXTURE_STATUS_MAP) would otherwise be polled forever.
+LIVE_CUTOFF = datetime.timedelta(hours=6)
+DEFAULT_LIVE_WINDOW_MINUTES = 30
+
+# Month a new season's fixtures start (see season_for_kickoff)
+SEASON_START_MONTH = 8
+
+# Paged endpoints whose 'content' arrays can be stream-parsed (--stream-json)
+STREAMED_ENDPOINTS = ('fixtures', 'players')
+
+
+def results_params(season_id):
+    """Builds the params for fetching a season's completed results."""
+    # A season has 380 matches. pageSize=400 should get all in one page.
+    return {
+        'comps': 1,
+        'compSeasons': season_id,
+        'page': 0,
+        'pageSize': 400, # Get all 380 matches in one go
+        'sort': 'desc',
+        'statuses': 'C' # 'C' for Completed
+    }
+
+
+def season_for_api_fixture(fix):
+    """Returns our season label for an API fixture, or None if unknown."""
+    try:
+        season_id = int(fix['gameweek']['compSeason']['id'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return SEASON_LABEL_BY_ID.get(season_id)
+
+
+def matchweek_for_api_fixture(fix):
+    """Returns the API fixture's gameweek (round) number, or None."""
+    try:
+        return int(fix['gameweek']['gameweek'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def season_for_kickoff(kickoff_dt):
+    """
+    Returns the season label a kickoff time falls in, or None.
+    Seasons run August to May, so August onwards is the next season.
+    """
+    if kickoff_dt is None:
+        return None
+    year = kickoff_dt.year if kickoff_dt.month >= SEASON_START_MONTH else kickoff_dt.year - 1
+    return f"{year}-{year + 1}"
+
+
+def is_closed_season_request(endpoint, params):
+    """True if a request targets a closed season (see CLOSED_SEASON_IDS)."""
+    return (params or {}).get('compSeasons') in CLOSED_SEASON_IDS
+
 
 class Command(BaseCommand):
     help = 'Scrapes Premier League data and populates the database.'
 
-    def fetch_api_data(self, endpoint, params={}):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+            help=f'Maximum number of API requests in flight at once (default: {DEFAULT_CONCURRENCY}).'
+        )
+        parser.add_argument(
+            '--rate', type=float, default=DEFAULT_RATE,
+            help=f'Maximum API requests per second, 0 to disable (default: {DEFAULT_RATE}).'
+        )
+        parser.add_argument(
+            '--all-player-stats', action='store_true',
+            help='Fetch stats for every player across every season instead of the 5-player example.'
+        )
+        parser.add_argument(
+            '--stats-batch-size', type=int, default=STATS_BATCH_SIZE,
+            help=f'Number of player stat rows per bulk upsert (default: {STATS_BATCH_SIZE}).'
+        )
+        parser.add_argument(
+            '--cache-dir', default=settings.SCRAPER_CACHE_DIR,
+            help='Directory for the persistent API response cache.'
+        )
+        parser.add_argument(
+            '--no-cache', action='store_true',
+            help='Disable the response cache and re-download everything.'
+        )
+        parser.add_argument(
+            '--prefetch-pages', type=int, default=DEFAULT_PREFETCH_PAGES,
+            help=f'Pages to fetch ahead while the current page is being written (default: {DEFAULT_PREFETCH_PAGES}).'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Resume an interrupted scrape, skipping stages and pages that already completed.'
+        )
+        parser.add_argument(
+            '--metrics-json', metavar='PATH',
+            help='Write the JSON metrics report to PATH instead of stdout.'
+        )
+        parser.add_argument(
+            '--metrics-prom', metavar='PATH',
+            help='Also write the metrics in Prometheus text exposition format to PATH.'
+        )
+        parser.add_argument(
+            '--json-backend', choices=JSON_BACKENDS, default='auto',
+            help="JSON decoder for API responses; 'auto' uses orjson when installed (default: auto)."
+        )
+        parser.add_argument(
+            '--stream-json', action='store_true',
+            help='Stream-parse fixture, result and player pages item by item (requires ijson). Uses less '
+                 'memory on large pages but decodes several times slower than orjson, and malformed JSON is '
+                 'only found part way through a page, which stops the run (continue it with --resume).'
+        )
+        parser.add_argument(
+            '--live', action='store_true',
+            help='Only poll in-play and about-to-start fixtures, updating scores in place.'
+        )
+        parser.add_argument(
+            '--live-interval', type=int, default=DAEMON_INTERVALS['live'],
+            help=f"Seconds between live polls in --live and --daemon modes (default: {DAEMON_INTERVALS['live']})."
+        )
+        parser.add_argument(
+            '--live-window', type=int, default=DEFAULT_LIVE_WINDOW_MINUTES,
+            help=f'Also poll fixtures kicking off within this many minutes (default: {DEFAULT_LIVE_WINDOW_MINUTES}).'
+        )
+        parser.add_argument(
+            '--daemon', action='store_true',
+            help='Stay resident and refresh each dataset on its own cadence (see the --*-interval options).'
+        )
+        parser.add_argument(
+            '--fixtures-interval', type=int, default=DAEMON_INTERVALS['fixtures'],
+            help=f"Daemon: seconds between fixture refreshes (default: {DAEMON_INTERVALS['fixtures']})."
+        )
+        parser.add_argument(
+            '--table-interval', type=int, default=DAEMON_INTERVALS['tables'],
+            help=f"Daemon: seconds between current-season table refreshes (default: {DAEMON_INTERVALS['tables']})."
+        )
+        parser.add_argument(
+            '--results-interval', type=int, default=DAEMON_INTERVALS['results'],
+            help=f"Daemon: seconds between current-season result refreshes (default: {DAEMON_INTERVALS['results']})."
+        )
+        parser.add_argument(
+            '--players-interval', type=int, default=DAEMON_INTERVALS['players'],
+            help=f"Daemon: seconds between club, player and player-stat refreshes (default: {DAEMON_INTERVALS['players']})."
+        )
+        replay_group = parser.add_mutually_exclusive_group()
+        replay_group.add_argument(
+            '--record', metavar='DIR',
+            help='Record every API response into DIR (compressed, content-addressed).'
+        )
+        replay_group.add_argument(
+            '--replay', metavar='DIR',
+            help='Serve API responses from a --record directory instead of the live API.'
+        )
+
+    def fetch_api_data(self, endpoint, params=None):
         """Helper function to fetch data from the API."""
-        try:
-            url = f"{API_BASE_URL}/{endpoint}"
-            response = requests.get(url, headers=HEADERS, params=params)
-            response.raise_for_status()
-            
-            if not response.content:
-                # Log an empty response but don't crash
-                self.stderr.write(f"Empty response from {url} with params {params}")
-                return None
-            return response.json()
-        
-        except requests.exceptions.RequestException as e:
-            self.stderr.write(f"Error fetching {e.request.url}: {e}")
-            return None
-        except requests.exceptions.JSONDecodeError as e:
-            self.stderr.write(f"Error decoding JSON from {e.request.url}: {e}")
-            return None
+        return self.client.fetch(endpoint, params)
+
+    def is_cached_immutable(self, endpoint, params):
+        """True if this request is already cached for a closed season and can be skipped."""
+        if self.client.recorder is not None or self.resume:
+            # A recording must hold every response, and a resumed stage must
+            # be re-processed, so the request still goes through the client
+            # (which serves it from the cache without a download)
+            return False
+        return self.client.cache is not None and self.client.cache.is_immutable(endpoint, params)
 
-    @transaction.atomic
     def handle(self, *args, **options):
+        try:
+            get_loads(options['json_backend'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options['stream_json'] and not streaming_available():
+            raise CommandError("--stream-json requires the 'ijson' package (pip install ijson).")
+
+        self.resume = options['resume']
+        replay = ResponseStore(options['replay']) if options['replay'] else None
+        if replay is not None:
+            self.stdout.write(self.style.WARNING(f"Replaying recorded API responses from {options['replay']}"))
+        # Replays must exercise the full parse-and-upsert path, so the
+        # response cache (which would skip unchanged data) is bypassed.
+        use_cache = not options['no_cache'] and replay is None
+        self.metrics = ScrapeMetrics()
+        self.client = ApiClient(
+            concurrency=options['concurrency'],
+            rate=0 if replay is not None else options['rate'],
+            log_error=self.stderr.write,
+            cache=ResponseCache(options['cache_dir']) if use_cache else None,
+            is_immutable=is_closed_season_request,
+            recorder=ResponseStore(options['record']) if options['record'] else None,
+            replay=replay,
+            metrics=self.metrics,
+            json_backend=options['json_backend'],
+            stream_endpoints=STREAMED_ENDPOINTS if options['stream_json'] else (),
+            # Stages left without a checkpoint may not have stored what an
+            # earlier run fetched, so --resume re-processes "unchanged" data
+            report_unchanged=not options['resume'],
+        )
+        self.prefetch_pages = options['prefetch_pages']
+        self.checkpoints_enabled = True
+        self.live_window = datetime.timedelta(minutes=options['live_window'])
+        self.all_player_stats = options['all_player_stats']
+        self.stats_batch_size = options['stats_batch_size']
+        try:
+            if options['daemon']:
+                self.run_daemon(options)
+            elif options['live']:
+                self.run_live(options['live_interval'])
+            else:
+                self.run_scrape()
+        finally:
+            self.client.close()
+            self.stdout.write("\n--- Scrape metrics ---")
+            self.metrics.write_reports(options['metrics_json'], options['metrics_prom'], stdout=self.stdout)
+
+    def run_scrape(self):
+        """
+        Runs every scrape stage in order. Each stage (and each page or
+        batch within a stage) commits in its own short transaction and
+        records a ScrapeCheckpoint, so a failed run can be resumed.
+        """
+        if self.resume:
+            self.completed_stages = set(ScrapeCheckpoint.objects.values_list('stage', flat=True))
+            self.stdout.write(f"Resuming scrape: {len(self.completed_stages)} stages already completed.")
+        else:
+            ScrapeCheckpoint.objects.all().delete()
+            self.completed_stages = set()
+
         self.stdout.write("Starting Premier League data scrape...")
 
         # 1. Fetch and process Clubs
         self.stdout.write("\n--- Fetching Clubs ---")
-        club_data = self.fetch_api_data("clubs", params=PARAMS_CLUBS)
-        if club_data:
-            self.process_clubs(club_data)
+        with self.metrics.stage('clubs'):
+            self.scrape_clubs()
 
         # 2. Fetch Historical League Tables
         self.stdout.write("\n--- Fetching Historical League Tables ---")
-        for season_label in SEASON_ID_MAP.keys():
-            self.process_league_table(season_label)
-            time.sleep(0.1) # Be nice to the API
+        with self.metrics.stage('league_tables'):
+            self.scrape_league_tables(list(SEASON_ID_MAP.keys()))
 
         # 3. Fetch and process Fixtures
         self.stdout.write("\n--- Fetching Fixtures ---")
-        fixture_data = self.fetch_api_data("fixtures", params=PARAMS_FIXTURES)
-        if fixture_data:
-            self.process_fixtures(fixture_data)
+        with self.metrics.stage('fixtures'):
+            self.scrape_fixtures()
 
         # 4. Fetch ALL historical results by season
         self.stdout.write("\n--- Fetching Historical Results ---")
-        
-        for season_label, season_id in SEASON_ID_MAP.items():
-            self.stdout.write(f"Fetching results for {season_label} (API ID: {season_id})...")
-            
-            # A season has 380 matches. pageSize=400 should get all in one page.
-            result_params = {
-                'comps': 1,
-                'compSeasons': season_id,
-                'page': 0,
-                'pageSize': 400, # Get all 380 matches in one go
-                'sort': 'desc',
-                'statuses': 'C' # 'C' for Completed
-            }
-            
-            result_data = self.fetch_api_data("fixtures", params=result_params)
-            if result_data:
-                # We can reuse the same process_results function
-                self.process_results(result_data, season_label) 
-            
-            time.sleep(0.1) # Be nice to the API
+        with self.metrics.stage('results'):
+            self.scrape_results(list(SEASON_ID_MAP.keys()))
 
         # 5. Fetch and process Players
         self.stdout.write("\n--- Fetching Players ---")
-        all_player_ids = self.process_players()
-        
+        with self.metrics.stage('players'):
+            player_count = self.process_players()
+
         # 6. Fetch Player Stats
-        self.stdout.write("\n--- Fetching Player Stats (Example: First 5) ---")
-        if all_player_ids:
-            # Test with a known *good* season ID ('2023-2024')
-            TEST_SEASON_LABEL = '2023-2024'
-            self.stdout.write(self.style.WARNING(f"Fetching stats for season: {TEST_SEASON_LABEL}"))
-            
-            player_ids_to_fetch = [pid for pid in all_player_ids[:5] if pid]
-            for i, player_id in enumerate(player_ids_to_fetch):
-                player_id_int = int(player_id)
-                self.stdout.write(f"Fetching stats for player {i+1}/{len(player_ids_to_fetch)} (ID: {player_id_int})...")
-                self.process_player_stats(player_id_int, TEST_SEASON_LABEL) 
-                time.sleep(0.2)
-        else:
-            self.stdout.write(self.style.WARNING("No players were fetched, skipping stats example."))
+        with self.metrics.stage('player_stats'):
+            self.scrape_player_stats(player_count, list(SEASON_ID_MAP.keys()))
 
         self.stdout.write(self.style.SUCCESS("\n--- Scraping complete! ---"))
 
@@ -134,12 +360,313 @@ class Command(BaseCommand):
         self.stdout.write(self.style.WARNING("\n--- Calling table calculation module ---"))
         try:
             # This programmatically runs the 'calculate_tables' command
-            management.call_command('calculate_tables')
+            management.call_command('calculate_tables', incremental=True, metrics=self.metrics)
             self.stdout.write(self.style.SUCCESS("--- Table calculation finished. ---"))
         except Exception as e:
             self.stderr.write(self.style.ERROR(f"Error during table calculation: {e}"))
+            return # Keep the checkpoints so --resume can retry the calculation
         # --- END NEW ---
 
+        self.warm_api_cache()
+
+        # The run finished, so the next run starts from scratch.
+        ScrapeCheckpoint.objects.all().delete()
+
+    def warm_api_cache(self):
+        """Re-fills the API response cache after data changed."""
+        try:
+            management.call_command('warm_api_cache')
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Error warming the API cache: {e}"))
+
+    def run_daemon(self, options):
+        """
+        Stays resident, keeping the HTTP pool and Django set-up warm, and
+        refreshes each dataset on its own cadence. Stops on SIGINT/SIGTERM.
+        """
+        # Checkpoints only make sense for one-shot runs
+        self.checkpoints_enabled = False
+        self.completed_stages = set()
+
+        open_seasons = [label for label in SEASON_ID_MAP if label >= CURRENT_SEASON_LABEL]
+        closed_seasons = [label for label in SEASON_ID_MAP if label < CURRENT_SEASON_LABEL]
+
+        scheduler = Scheduler(
+            log=self.stdout.write,
+            log_error=lambda message: self.stderr.write(self.style.ERROR(message)),
+            # Drop DB connections that timed out while we were idle
+            before_job=close_old_connections,
+        )
+
+        def add_job(name, func, interval):
+            def run():
+                self.stdout.write(f"\n--- [{datetime.datetime.now():%H:%M:%S}] Running job '{name}' ---")
+                bumps_before = api_cache.bump_count
+                with self.metrics.stage(name):
+                    func()
+                if api_cache.bump_count != bumps_before:
+                    self.warm_api_cache()
+            scheduler.add_job(name, run, interval)
+
+        # Jobs due at the same time run in the order they were added,
+        # so clubs are always in place before anything that references them.
+        add_job('clubs', self.scrape_clubs, options['players_interval'])
+        add_job('closed_seasons', lambda: self.refresh_seasons(closed_seasons), None)
+        add_job('current_tables', lambda: self.scrape_league_tables(open_seasons, keep_calculated=True),
+                options['table_interval'])
+        add_job('current_results', lambda: self.refresh_seasons(open_seasons, tables=False), options['results_interval'])
+        add_job('live_fixtures', self.poll_live_fixtures, options['live_interval'])
+        add_job('fixtures', self.scrape_fixtures, options['fixtures_interval'])
+        add_job('players', self.process_players, options['players_interval'])
+        if self.all_player_stats:
+            add_job('player_stats', lambda: self.scrape_player_stats(1, open_seasons), options['players_interval'])
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: scheduler.stop())
+
+        self.stdout.write(self.style.SUCCESS("Scraper daemon started. Press Ctrl+C to stop."))
+        scheduler.run_forever()
+        self.stdout.write(self.style.WARNING("Scraper daemon stopped."))
+
+    def run_live(self, interval):
+        """Polls live fixtures every `interval` seconds until interrupted."""
+        self.checkpoints_enabled = False
+        self.completed_stages = set()
+        self.stdout.write(self.style.SUCCESS(f"Live mode: polling in-play fixtures every {interval}s. Press Ctrl+C to stop."))
+        try:
+            while True:
+                close_old_connections()
+                bumps_before = api_cache.bump_count
+                with self.metrics.stage('live_fixtures'):
+                    self.poll_live_fixtures()
+                if api_cache.bump_count != bumps_before:
+                    self.warm_api_cache()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Live mode stopped."))
+
+    def poll_live_fixtures(self):
+        """
+        Fetches only the fixtures that are in play or about to start,
+        updates their status and scores in place, and re-ranks the tables
+        of seasons where a match finished or a final score changed.
+        """
+        now = timezone.now()
+        candidates = {
+            fixture.fixture_id: fixture for fixture in Fixture.objects.filter(
+                Q(status='LIVE', kickoff_time__gte=now - LIVE_CUTOFF) |
+                Q(status='SCHEDULED', kickoff_time__gte=now - LIVE_LOOKBACK, kickoff_time__lte=now + self.live_window)
+            )
+        }
+        if not candidates:
+            self.stdout.write("No fixtures in play or about to start.")
+            return
+
+        calls = [(f"fixtures/{int(fixture_id)}", {}) for fixture_id in candidates]
+        pages = self.client.fetch_many(calls)
+
+        updated = []
+        seasons_to_rerank = set()
+        for fixture_id, fix in zip(candidates, pages):
+            if not fix or isinstance(fix, UnchangedResponse):
+                continue
+            fixture = candidates[fixture_id]
+            status = FIXTURE_STATUS_MAP.get(fix.get('status'), fixture.status)
+            try:
+                home_score = fix['teams'][0].get('score')
+                away_score = fix['teams'][1].get('score')
+            except (KeyError, IndexError, TypeError):
+                self.stderr.write(f"Skipping live fixture {fixture_id}: Malformed 'teams' data.")
+                continue
+
+            if (status, home_score, away_score) == (fixture.status, fixture.home_score, fixture.away_score):
+                continue
+            if status == 'COMPLETED':
+                seasons_to_rerank.add(fixture.season or season_for_api_fixture(fix))
+            fixture.status, fixture.home_score, fixture.away_score = status, home_score, away_score
+            updated.append(fixture)
+
+        if updated:
+            with transaction.atomic(), self.metrics.db_write('live_fixtures', len(updated)):
+                for fixture in updated:
+                    fixture.updated_at = now # bulk_update() doesn't apply auto_now
+                Fixture.objects.bulk_update(updated, ['status', 'home_score', 'away_score', 'updated_at'])
+                bump_data_version('fixtures')
+        self.commit_responses(*calls)
+        self.stdout.write(f"Polled {len(candidates)} live fixtures, {len(updated)} changed.")
+
+        seasons_to_rerank.discard(None)
+        if seasons_to_rerank:
+            management.call_command('calculate_tables', seasons=sorted(seasons_to_rerank), incremental=True,
+                                    metrics=self.metrics)
+
+    def refresh_seasons(self, season_labels, tables=True):
+        """Refreshes the given seasons' tables and results, then recalculates standings if results changed."""
+        if tables:
+            self.scrape_league_tables(season_labels, keep_calculated=True)
+        if self.scrape_results(season_labels):
+            management.call_command('calculate_tables', incremental=True, metrics=self.metrics)
+
+    # --- Checkpoints ---
+
+    def is_stage_done(self, stage):
+        """True if a resumed run already completed this stage."""
+        if stage in self.completed_stages:
+            self.stdout.write(f"Stage '{stage}' already completed. Skipping.")
+            return True
+        return False
+
+    def mark_stage_done(self, stage):
+        """Records a completed stage. Call inside the stage's transaction."""
+        if not self.checkpoints_enabled:
+            return
+        ScrapeCheckpoint.objects.update_or_create(stage=stage)
+        self.completed_stages.add(stage)
+
+    def commit_responses(self, *calls):
+        """
+        Lets the response cache keep the responses for (endpoint, params)
+        `calls` once the current transaction commits, i.e. once their data
+        is stored. Until then a re-run fetches and processes them again.
+        """
+        transaction.on_commit(lambda: self.client.commit_cache(calls))
+
+    # --- Stages ---
+
+    def scrape_clubs(self):
+        if self.is_stage_done('clubs'):
+            return
+        club_data = self.fetch_api_data("clubs", params=PARAMS_CLUBS)
+        with transaction.atomic():
+            if isinstance(club_data, UnchangedResponse):
+                self.stdout.write("Clubs unchanged since last scrape. Skipping.")
+            elif club_data:
+                self.process_clubs(club_data)
+            else:
+                return
+            self.mark_stage_done('clubs')
+            self.commit_responses(("clubs", PARAMS_CLUBS))
+
+    def scrape_league_tables(self, season_labels, keep_calculated=False):
+        """
+        Fetches and stores the API's league tables. With keep_calculated,
+        seasons whose table we already calculate from results are left
+        alone, so the daemon doesn't swap the served table (and its form)
+        back and forth between the two sources on every refresh.
+        """
+        calculated = set(
+            LeagueTableSync.objects.filter(season__in=season_labels).values_list('season', flat=True)
+        ) if keep_calculated else set()
+        # All seasons are fetched concurrently, then written one by one.
+        to_fetch = []
+        for season_label in season_labels:
+            if self.is_stage_done(f'tables:{season_label}'):
+                continue
+            if season_label in calculated:
+                self.stdout.write(f"Table for {season_label} is calculated from results. Skipping the API table.")
+                continue
+            if self.is_cached_immutable(*self.league_table_request(season_label)):
+                self.stdout.write(f"Table for {season_label} is closed and cached. Skipping.")
+            else:
+                to_fetch.append(season_label)
+        table_pages = self.client.fetch_many(
+            [self.league_table_request(season_label) for season_label in to_fetch]
+        )
+        for season_label, data in zip(to_fetch, table_pages):
+            with transaction.atomic():
+                if isinstance(data, UnchangedResponse):
+                    self.stdout.write(f"Table for {season_label} unchanged since last scrape. Skipping.")
+                elif not self.process_league_table(season_label, data):
+                    continue
+                self.mark_stage_done(f'tables:{season_label}')
+                self.commit_responses(self.league_table_request(season_label))
+
+    def scrape_fixtures(self):
+        done_pages = {
+            int(stage.rsplit(':', 1)[1]) for stage in self.completed_stages
+            if stage.startswith('fixtures:page:')
+        }
+        fixture_pages = 0
+        for page_number, fixture_data in self.client.iter_pages(
+                "fixtures", PARAMS_FIXTURES, self.prefetch_pages, skip_pages=done_pages):
+            fixture_pages += 1
+            with transaction.atomic():
+                if isinstance(fixture_data, UnchangedResponse):
+                    self.stdout.write(f"Fixture page {page_number + 1} unchanged since last scrape. Skipping.")
+                else:
+                    self.process_fixtures(fixture_data)
+                self.mark_stage_done(f'fixtures:page:{page_number}')
+                self.commit_responses(("fixtures", {**PARAMS_FIXTURES, 'page': page_number}))
+        if not fixture_pages and not done_pages:
+            self.stderr.write("No fixture data found.")
+
+    def scrape_results(self, season_labels):
+        """Fetches and upserts results. Returns the seasons whose results changed."""
+        result_seasons = []
+        backfill = self.seasons_missing_matchweeks(season_labels)
+        for season_label in season_labels:
+            if self.is_stage_done(f'results:{season_label}'):
+                continue
+            if season_label in backfill:
+                self.stdout.write(f"Results for {season_label} have no matchweeks stored. Re-processing them.")
+                result_seasons.append(season_label)
+            elif self.is_cached_immutable("fixtures", results_params(SEASON_ID_MAP[season_label])):
+                self.stdout.write(f"Results for {season_label} are closed and cached. Skipping.")
+            else:
+                result_seasons.append(season_label)
+        self.stdout.write(f"Fetching results for {len(result_seasons)} seasons concurrently...")
+
+        result_pages = self.client.fetch_many(
+            [("fixtures", results_params(SEASON_ID_MAP[season_label])) for season_label in result_seasons]
+        )
+        changed_seasons = []
+        for season_label, result_data in zip(result_seasons, result_pages):
+            with transaction.atomic():
+                if isinstance(result_data, UnchangedResponse) and season_label not in backfill:
+                    self.stdout.write(f"Results for {season_label} unchanged since last scrape. Skipping.")
+                elif result_data:
+                    # We can reuse the same process_results function
+                    self.process_results(result_data, season_label)
+                    changed_seasons.append(season_label)
+                else:
+                    continue
+                self.mark_stage_done(f'results:{season_label}')
+                self.commit_responses(("fixtures", results_params(SEASON_ID_MAP[season_label])))
+        return changed_seasons
+
+    def seasons_missing_matchweeks(self, season_labels):
+        """
+        The seasons with completed fixtures stored before Fixture.matchweek
+        existed. Their results are re-processed (from the cache when it holds
+        them) even if unchanged or closed, so ?matchweek=N works for them too.
+        """
+        return set(Fixture.objects.filter(
+            season__in=season_labels, status='COMPLETED', matchweek__isnull=True
+        ).values_list('season', flat=True).distinct())
+
+    def scrape_player_stats(self, player_count, season_labels):
+        if self.all_player_stats:
+            self.stdout.write("\n--- Fetching Player Stats (All Players) ---")
+            season_labels = [
+                season_label for season_label in season_labels
+                if not self.is_stage_done(f'player_stats:{season_label}')
+            ]
+            player_ids = list(Player.objects.values_list('player_id', flat=True))
+            self.process_all_player_stats(player_ids, season_labels)
+        elif player_count:
+            self.stdout.write("\n--- Fetching Player Stats (Example: First 5) ---")
+            # Test with a known *good* season ID ('2023-2024')
+            TEST_SEASON_LABEL = '2023-2024'
+            self.stdout.write(self.style.WARNING(f"Fetching stats for season: {TEST_SEASON_LABEL}"))
+            
+            player_ids_to_fetch = [pid for pid in Player.objects.values_list('player_id', flat=True)[:5] if pid]
+            for i, player_id in enumerate(player_ids_to_fetch):
+                player_id_int = int(player_id)
+                self.stdout.write(f"Fetching stats for player {i+1}/{len(player_ids_to_fetch)} (ID: {player_id_int})...")
+                self.process_player_stats(player_id_int, TEST_SEASON_LABEL)
+        else:
+            self.stdout.write(self.style.WARNING("No players were fetched, skipping stats example."))
+
     def process_clubs(self, data):
         """Processes club data from the 'clubs' endpoint."""
         if not data or 'content' not in data:
@@ -158,41 +685,36 @@ class Command(BaseCommand):
                 abbr=club.get('abbr', 'N/A') # FallBback to N/A
             ))
 
-        Club.objects.bulk_create(
-            club_objects,
-            update_conflicts=True,
-            unique_fields=['club_id'],
-            update_fields=['club_name', 'short_name', 'abbr']
-        )
+        with self.metrics.db_write('clubs', len(club_objects)):
+            Club.objects.bulk_create(
+                club_objects,
+                update_conflicts=True,
+                unique_fields=['club_id'],
+                update_fields=['club_name', 'short_name', 'abbr']
+            )
+        bump_data_version('clubs')
         self.stdout.write(f"Upserted {len(club_objects)} clubs.")
 
-    def process_league_table(self, season_label):
-        """Fetches and upserts the league table for a *specific season*."""
-        
-        season_id = SEASON_ID_MAP.get(season_label)
-        if not season_id:
-            self.stderr.write(f"No API ID found for season {season_label}. Skipping.")
-            return
-
-        self.stdout.write(f"Fetching table for {season_label} (API ID: {season_id})...")
-        
+    def league_table_request(self, season_label):
+        """Returns the (endpoint, params) pair for a season's league table."""
         # --- FIX: Fallback logic for current season ---
         # The 'standings/current' endpoint returns the current table.
         # The 'standings' endpoint *with* compSeasons returns historical tables.
-        
         if season_label == CURRENT_SEASON_LABEL:
             # Use the 'standings/current' endpoint for the current season
             # It doesn't need any params.
-            data = self.fetch_api_data("standings/current", params={})
-        else:
-            # Use the season-specific endpoint for all others
-            params = {'page': 0, 'compSeasons': season_id}
-            data = self.fetch_api_data("standings", params=params)
+            return "standings/current", {}
+        # Use the season-specific endpoint for all others
+        return "standings", {'page': 0, 'compSeasons': SEASON_ID_MAP[season_label]}
         # --- END FIX ---
 
+    def process_league_table(self, season_label, data):
+        """Upserts the fetched league table for a *specific season*."""
+        self.stdout.write(f"Processing table for {season_label} (API ID: {SEASON_ID_MAP[season_label]})...")
+
         if not data or 'tables' not in data or not data['tables']:
             self.stderr.write(f"No table data found for season {season_label}.")
-            return
+            return False
 
         table_entries = data['tables'][0]['entries']
         table_objects = []
@@ -216,14 +738,20 @@ class Command(BaseCommand):
                 form=entry.get('form', 'N/A')[:10]
             ))
 
-        LeagueTable.objects.bulk_create(
-            table_objects,
-            update_conflicts=True,
-            unique_fields=['club', 'season'], # Use the composite key
-            update_fields=['position', 'played', 'won', 'drawn', 'lost',
-                           'goals_for', 'goals_against', 'points', 'goal_difference', 'form']
-        )
+        with self.metrics.db_write('league_tables', len(table_objects)):
+            LeagueTable.objects.bulk_create(
+                table_objects,
+                update_conflicts=True,
+                unique_fields=['club', 'season'], # Use the composite key
+                update_fields=['position', 'played', 'won', 'drawn', 'lost',
+                               'goals_for', 'goals_against', 'points', 'goal_difference', 'form']
+            )
+            # The API's table replaces our calculated one, so the next
+            # incremental calculation must start from scratch.
+            LeagueTableSync.objects.filter(season=season_label).delete()
+        bump_data_version(f'tables:{season_label}')
         self.stdout.write(f"Upserted {len(table_objects)} league table entries for {season_label}.")
+        return True
 
     def process_fixtures(self, data):
         """Processes upcoming fixtures and saves them."""
@@ -247,16 +775,28 @@ class Command(BaseCommand):
                 home_club_id=fix['teams'][0]['team']['id'],
                 away_club_id=fix['teams'][1]['team']['id'],
                 venue=fix['ground']['name'],
-                status='SCHEDULED' # All fixtures from this endpoint are scheduled
+                # This endpoint returns upcoming ('U') and live ('L') fixtures
+                status=FIXTURE_STATUS_MAP.get(fix.get('status'), 'SCHEDULED'),
+                home_score=fix['teams'][0].get('score'),
+                away_score=fix['teams'][1].get('score'),
+                # Fetched for every season at once, so use the fixture's own compSeason
+                season=season_for_api_fixture(fix) or season_for_kickoff(kickoff_dt),
+                matchweek=matchweek_for_api_fixture(fix)
             ))
 
-        Fixture.objects.bulk_create(
-            fixture_objects,
-            update_conflicts=True,
-            unique_fields=['fixture_id'],
-            update_fields=['kickoff_time', 'home_club', 'away_club', 'venue', 'status']
-        )
-        self.stdout.write(f"Upserted {len(fixture_objects)} fixtures.")
+        fixture_fields = ['kickoff_time', 'home_club', 'away_club', 'venue', 'status', 'home_score', 'away_score', 'season', 'matchweek']
+        total = len(fixture_objects)
+        fixture_objects = self.drop_unchanged_fixtures(fixture_objects, fixture_fields)
+        with self.metrics.db_write('fixtures', len(fixture_objects)):
+            Fixture.objects.bulk_create(
+                fixture_objects,
+                update_conflicts=True,
+                unique_fields=['fixture_id'],
+                update_fields=fixture_fields + ['updated_at']
+            )
+        if fixture_objects:
+            bump_data_version('fixtures')
+        self.stdout.write(f"Upserted {len(fixture_objects)} changed fixtures ({total - len(fixture_objects)} unchanged).")
 
     def process_results(self, data, season_label=""):
         """Processes completed results and upserts them into the Fixture table."""
@@ -293,42 +833,80 @@ class Command(BaseCommand):
                 venue=res['ground']['name'],
                 status='COMPLETED', # All results from this endpoint are completed
                 home_score=home_score,
-                away_score=away_score
+                away_score=away_score,
+                # Results are fetched per compSeason, so we know the season exactly
+                season=season_label or season_for_api_fixture(res) or season_for_kickoff(kickoff_dt),
+                matchweek=matchweek_for_api_fixture(res)
             ))
 
-        Fixture.objects.bulk_create(
-            result_objects,
-            update_conflicts=True,
-            unique_fields=['fixture_id'],
-            update_fields=['kickoff_time', 'home_club', 'away_club', 'venue', 'status', 'home_score', 'away_score']
-        )
-        self.stdout.write(f"Upserted {len(result_objects)} results {('for ' + season_label) if season_label else ''}.")
+        result_fields = ['kickoff_time', 'home_club', 'away_club', 'venue', 'status', 'home_score', 'away_score', 'season', 'matchweek']
+        total = len(result_objects)
+        result_objects = self.drop_unchanged_fixtures(result_objects, result_fields)
+        with self.metrics.db_write('results', len(result_objects)):
+            Fixture.objects.bulk_create(
+                result_objects,
+                update_conflicts=True,
+                unique_fields=['fixture_id'],
+                update_fields=result_fields + ['updated_at']
+            )
+        if result_objects:
+            bump_data_version('fixtures')
+        self.stdout.write(f"Upserted {len(result_objects)} changed results ({total - len(result_objects)} unchanged) {('for ' + season_label) if season_label else ''}.")
+
+    def drop_unchanged_fixtures(self, fixture_objects, fields):
+        """
+        Drops fixtures identical to the stored rows, so that Fixture.updated_at
+        only moves (and incremental table updates only run) on real changes.
+        """
+        attnames = [Fixture._meta.get_field(field).attname for field in fields]
+        stored = {
+            row[0]: row[1:] for row in Fixture.objects.filter(
+                fixture_id__in=[fixture.fixture_id for fixture in fixture_objects]
+            ).values_list('fixture_id', *attnames)
+        }
+        return [
+            fixture for fixture in fixture_objects
+            if stored.get(fixture.fixture_id) != tuple(getattr(fixture, attname) for attname in attnames)
+        ]
 
     def process_players(self):
-        """Fetches all players using pagination and upserts them."""
+        """
+        Streams all player pages and upserts them page by page.
+        The next pages are prefetched while the current one is written.
+        Returns the number of players seen.
+        """
         known_club_ids = set(Club.objects.values_list('club_id', flat=True))
-        all_player_ids = []
-        current_page = 0
-        total_pages = 1
+        player_count = 0
+        upserted_count = 0
+        page_count = 0
+        changed_pages = 0
 
-        while current_page < total_pages:
-            self.stdout.write(f"Fetching player page {current_page + 1}/{total_pages}...")
-            
-            player_params = PARAMS_PLAYERS.copy()
-            player_params['page'] = current_page
-            
-            player_page_data = self.fetch_api_data("players", params=player_params)
-            
-            if not player_page_data or 'content' not in player_page_data:
-                self.stderr.write("No player data on this page. Stopping player fetch.")
-                break
+        done_pages = {
+            int(stage.rsplit(':', 1)[1]) for stage in self.completed_stages
+            if stage.startswith('players:page:')
+        }
+        for page_number, player_page_data in self.client.iter_pages(
+                "players", PARAMS_PLAYERS, self.prefetch_pages, skip_pages=done_pages):
+            page_count += 1
+            total_pages = player_page_data.get('pageInfo', {}).get('numPages', page_number + 1)
+            self.stdout.write(f"Processing player page {page_number + 1}/{total_pages}...")
 
             players = player_page_data['content']
+
+            if isinstance(player_page_data, UnchangedResponse):
+                # Seen, but already stored as it is
+                player_count += len(players)
+                with transaction.atomic():
+                    self.mark_stage_done(f'players:page:{page_number}')
+                    self.commit_responses(("players", {**PARAMS_PLAYERS, 'page': page_number}))
+                continue
+
+            # 'players' may be a lazy iterator (--stream-json), so each
+            # player is built as soon as it is parsed.
             player_objects = []
             
             for p in players:
                 player_id = p['id']
-                all_player_ids.append(player_id)
                 
                 nationality = p.get('nationality', {}).get('country', 'Unknown')
                 position = p.get('info', {}).get('position', 'Unknown')
@@ -348,54 +926,152 @@ class Command(BaseCommand):
                     club_id=club_id
                 ))
             
-            Player.objects.bulk_create(
-                player_objects,
-                update_conflicts=True,
-                unique_fields=['player_id'],
-                update_fields=['first_name', 'last_name', 'position', 'nationality', 'club']
-            )
-
-            page_info = player_page_data.get('pageInfo', {})
-            total_pages = page_info.get('numPages', current_page + 1)
-            current_page += 1
-            time.sleep(0.1)
-
-        self.stdout.write(f"Upserted {len(all_player_ids)} players from {total_pages} pages.")
-        return all_player_ids
+            player_count += len(player_objects)
+            upserted_count += len(player_objects)
+            changed_pages += 1
+            with transaction.atomic():
+                with self.metrics.db_write('players', len(player_objects)):
+                    Player.objects.bulk_create(
+                        player_objects,
+                        update_conflicts=True,
+                        unique_fields=['player_id'],
+                        update_fields=['first_name', 'last_name', 'position', 'nationality', 'club']
+                    )
+                self.mark_stage_done(f'players:page:{page_number}')
+                self.commit_responses(("players", {**PARAMS_PLAYERS, 'page': page_number}))
 
-    def process_player_stats(self, player_id, season_label):
-        """Fetches and upserts stats for a single player for a specific season."""
-        season_id = SEASON_ID_MAP.get(season_label)
-        if not season_id:
-            return # No season to fetch for
+        if changed_pages:
+            bump_data_version('players')
+        if done_pages:
+            # Players from pages finished by an earlier run are already stored
+            player_count = Player.objects.count()
+        if not page_count and not done_pages:
+            self.stderr.write("No player data found.")
+        self.stdout.write(
+            f"Upserted {upserted_count} players from {changed_pages} changed pages "
+            f"({page_count - changed_pages} unchanged pages skipped)."
+        )
+        return player_count
 
-        # Revert to the original stats endpoint
-        endpoint = f"stats/player/{player_id}"
-        
+    def player_stats_request(self, player_id, season_label):
+        """Returns the (endpoint, params) pair for a player's season stats."""
         # We pass the *correct* season_id now (e.g., 578 for 2023-24)
-        params = {'compSeasons': season_id, 'comps': 1} 
-        data = self.fetch_api_data(endpoint, params=params)
+        params = {'compSeasons': SEASON_ID_MAP[season_label], 'comps': 1}
+        return f"stats/player/{int(player_id)}", params
 
+    def build_player_stat(self, player_id, season_label, data):
+        """Builds an unsaved PlayerStat from a stats response, or None if there are no stats."""
         if not data or 'stats' not in data:
-            # This is expected if a player has no stats for that season
-            self.stdout.write(self.style.WARNING(f"No stats found for player {player_id} for {season_label}."))
-            return
+            return None
 
         stats = {}
         for stat in data['stats']:
             stats[stat['name']] = stat.get('value', 0)
-        
-        PlayerStat.objects.update_or_create(
+
+        return PlayerStat(
             player_id=player_id,
             season=season_label,
-            defaults={
-                'goals': stats.get('goals', 0),
-                'assists': stats.get('goal_assist', 0),
-                'clean_sheets': stats.get('clean_sheet', 0),
-                'minutes_played': stats.get('mins_played', 0),
-                'passes': stats.get('pass_acc', 0), 
-                'yellow_cards': stats.get('yellow_card', 0),
-                'red_cards': stats.get('red_card', 0)
-            }
+            **{field: stats.get(api_name, 0) for field, api_name in PLAYER_STAT_FIELDS.items()}
         )
-        self.stdout.write(f"Upserted stats for player {player_id} for {season_label}.")
\ No newline at end of file
+
+    def upsert_player_stats(self, stat_objects):
+        """Writes a batch of PlayerStat rows with a single bulk upsert."""
+        with self.metrics.db_write('player_stats', len(stat_objects)):
+            PlayerStat.objects.bulk_create(
+                stat_objects,
+                update_conflicts=True,
+                unique_fields=['player', 'season'],
+                update_fields=list(PLAYER_STAT_FIELDS.keys())
+            )
+        bump_data_version(*{f'player_stats:{stat.season}' for stat in stat_objects})
+
+    def process_player_stats(self, player_id, season_label):
+        """Fetches and upserts stats for a single player for a specific season."""
+        if season_label not in SEASON_ID_MAP:
+            return # No season to fetch for
+
+        request = self.player_stats_request(player_id, season_label)
+        data = self.fetch_api_data(*request)
+        if isinstance(data, UnchangedResponse):
+            # Already stored by an earlier scrape
+            self.stdout.write(f"Stats for player {player_id} for {season_label} unchanged since last scrape.")
+            self.commit_responses(request)
+            return
+        stat_object = self.build_player_stat(player_id, season_label, data)
+
+        if stat_object is None:
+            # This is expected if a player has no stats for that season
+            self.stdout.write(self.style.WARNING(f"No stats found for player {player_id} for {season_label}."))
+            self.commit_responses(request)
+            return
+
+        with transaction.atomic():
+            self.upsert_player_stats([stat_object])
+            self.commit_responses(request)
+        self.stdout.write(f"Upserted stats for player {player_id} for {season_label}.")
+
+    def process_all_player_stats(self, player_ids, season_labels):
+        """
+        Fetches stats for every player in every season on the worker pool
+        and writes them in batches of `stats_batch_size`. Each batch commits
+        on its own, and each season is checkpointed once all its stats are in.
+        """
+        jobs = [
+            (player_id, season_label) for season_label in season_labels for player_id in player_ids
+            if not self.is_cached_immutable(*self.player_stats_request(player_id, season_label))
+        ]
+        skipped = len(player_ids) * len(season_labels) - len(jobs)
+        if skipped:
+            self.stdout.write(f"Skipping {skipped} player stat lines from closed, cached seasons.")
+        total = len(jobs)
+        if not total:
+            self.stdout.write(self.style.WARNING("No player stats to fetch."))
+            return
+
+        self.stdout.write(f"Fetching stats for {len(player_ids)} players x {len(season_labels)} seasons ({total} requests)...")
+        calls = (self.player_stats_request(player_id, season_label) for player_id, season_label in jobs)
+        report_every = max(1, total // 20) # Report progress roughly every 5%
+
+        batch = []
+        batch_calls = [] # Every response since the last flush, stats or not
+        upserted = 0
+        current_season = None
+        for done, (job, (call, data)) in enumerate(zip(jobs, self.client.fetch_iter(calls)), start=1):
+            if job[1] != current_season:
+                # Jobs are ordered by season, so the previous season is finished
+                if current_season is not None:
+                    upserted += self.flush_player_stats(batch, batch_calls, finished_season=current_season)
+                    batch, batch_calls = [], []
+                current_season = job[1]
+            batch_calls.append(call)
+
+            if isinstance(data, UnchangedResponse):
+                stat_object = None # Already stored by an earlier scrape
+            else:
+                stat_object = self.build_player_stat(job[0], job[1], data)
+            if stat_object is not None:
+                batch.append(stat_object)
+
+            if len(batch) >= self.stats_batch_size:
+                upserted += self.flush_player_stats(batch, batch_calls)
+                batch, batch_calls = [], []
+
+            if done % report_every == 0 or done == total:
+                self.stdout.write(f"  {done}/{total} requests done ({done * 100 // total}%), {upserted + len(batch)} stat lines found.")
+
+        upserted += self.flush_player_stats(batch, batch_calls, finished_season=current_season)
+
+        self.stdout.write(f"Upserted {upserted} player stat lines.")
+
+    def flush_player_stats(self, batch, calls, finished_season=None):
+        """
+        Writes one batch of stats in its own transaction, then lets the
+        response cache keep the `calls` it came from. Returns the number of rows.
+        """
+        with transaction.atomic():
+            if batch:
+                self.upsert_player_stats(batch)
+            self.commit_responses(*calls)
+            if finished_season is not None:
+                self.mark_stage_done(f'player_stats:{finished_season}')
+        return len(batch)
\ No newline at end of file
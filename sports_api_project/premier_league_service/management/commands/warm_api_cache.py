@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.http import Http404
+
+from premier_league_service import api_cache
+from premier_league_service.response_blobs import store_blob
+from premier_league_service.services import LEADERBOARD_STATS
+from premier_league_service.standings import SPLIT_VIEWS
+from premier_league_service.views import (
+    PLAYER_STAT_TYPES, fixtures_payload, leaderboard_payload, league_table_payload, player_stats_payload
+)
+# We import the season map from the scraper to know which seasons to warm
+from premier_league_service.management.commands.run_scraper import SEASON_ID_MAP
+
+
+class Command(BaseCommand):
+    help = ('Pre-renders the stored, precompressed response blobs (every season, table view, stat type, '
+            'leaderboard and first page of fixtures) and fills the shared API cache.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season', action='append', dest='seasons', metavar='YYYY-YYYY',
+            help='Only warm this season (repeatable). Defaults to every season.'
+        )
+
+    def handle(self, *args, **options):
+        shared = api_cache.shared_cache() is not None
+        rendered = current = cached = 0
+        for season in options.get('seasons') or SEASON_ID_MAP.keys():
+            payloads = [league_table_payload(season, view) for view in ('overall',) + SPLIT_VIEWS]
+            payloads += [player_stats_payload(season, stat) for stat in PLAYER_STAT_TYPES]
+            payloads += [leaderboard_payload(season, stat) for stat in LEADERBOARD_STATS]
+            payloads.append(fixtures_payload(season))
+            for payload in payloads:
+                if shared:
+                    try:
+                        payload.get()
+                        cached += 1
+                    except Http404:
+                        pass # No data for this season yet
+                # Blobs for unchanged data are kept as they are, and
+                # seasons with no data yet have theirs removed
+                if store_blob(payload):
+                    rendered += 1
+                else:
+                    current += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {rendered} response blobs ({current} were current or had no data)."
+        ))
+        if shared:
+            self.stdout.write(self.style.SUCCESS(f"Warmed {cached} responses in the shared API cache."))
@@ -0,0 +1,197 @@
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+def endpoint_label(endpoint):
+    """Collapses IDs in an endpoint so e.g. 'stats/player/123' becomes 'stats/player/{id}'."""
+    return re.sub(r'/\d+(\.\d+)?(?=/|$)', '/{id}', endpoint)
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.requests = defaultdict(int)  # Keyed by outcome, e.g. 'ok', 'not_modified'
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.response_bytes = 0
+        self.decode_seconds = 0.0
+        self.decode_count = 0
+
+    def to_dict(self):
+        return {
+            'requests': dict(self.requests),
+            'latency_seconds': {
+                'count': self.latency_count,
+                'sum': round(self.latency_sum, 6),
+                'mean': round(self.latency_sum / self.latency_count, 6) if self.latency_count else 0.0,
+                'buckets': {
+                    ('+Inf' if bound == float('inf') else str(bound)): count
+                    for bound, count in zip(LATENCY_BUCKETS, self.bucket_counts)
+                },
+            },
+            'response_bytes': self.response_bytes,
+            'json_decode_seconds': round(self.decode_seconds, 6),
+            'json_decodes': self.decode_count,
+        }
+
+
+class StageMetrics:
+    def __init__(self):
+        self.duration_seconds = 0.0
+        self.rows_upserted = 0
+        self.db_write_seconds = 0.0
+        self.db_writes = 0
+
+    def to_dict(self):
+        return {
+            'duration_seconds': round(self.duration_seconds, 6),
+            'rows_upserted': self.rows_upserted,
+            'db_write_seconds': round(self.db_write_seconds, 6),
+            'db_writes': self.db_writes,
+        }
+
+
+class ScrapeMetrics:
+    """
+    Collects per-endpoint and per-stage metrics for run_scraper and
+    calculate_tables. Safe to update from the fetch worker threads.
+
+    Per endpoint: request count by outcome, a latency histogram, response
+    bytes and JSON decode time. Per stage: wall time, rows upserted and DB
+    write time. Reported with to_json() or to_prometheus().
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.endpoints = defaultdict(EndpointMetrics)
+        self.stages = defaultdict(StageMetrics)
+
+    def record_request(self, endpoint, outcome, latency=None, response_bytes=0):
+        """Records one request. `latency` is None when no network call was made."""
+        with self.lock:
+            metrics = self.endpoints[endpoint_label(endpoint)]
+            metrics.requests[outcome] += 1
+            metrics.response_bytes += response_bytes
+            if latency is not None:
+                metrics.latency_sum += latency
+                metrics.latency_count += 1
+                for i, bound in enumerate(LATENCY_BUCKETS):
+                    if latency <= bound:
+                        metrics.bucket_counts[i] += 1
+                        break
+
+    def record_decode(self, endpoint, seconds):
+        with self.lock:
+            metrics = self.endpoints[endpoint_label(endpoint)]
+            metrics.decode_seconds += seconds
+            metrics.decode_count += 1
+
+    @contextmanager
+    def stage(self, name):
+        """Times a whole stage (fetching and writing)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.stages[name].duration_seconds += elapsed
+
+    @contextmanager
+    def db_write(self, stage, rows):
+        """Times a database write of `rows` rows belonging to `stage`."""
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            metrics = self.stages[stage]
+            metrics.db_write_seconds += elapsed
+            metrics.db_writes += 1
+            metrics.rows_upserted += rows
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'started_at': self.started_at,
+                'duration_seconds': round(time.time() - self.started_at, 6),
+                'endpoints': {name: m.to_dict() for name, m in sorted(self.endpoints.items())},
+                'stages': {name: m.to_dict() for name, m in self.stages.items()},
+            }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self):
+        """Renders the metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        with self.lock:
+            endpoints = sorted(self.endpoints.items())
+            stages = list(self.stages.items())
+
+            metric('scraper_http_requests_total', 'counter', 'API requests by endpoint and outcome.', [
+                ({'endpoint': name, 'outcome': outcome}, count)
+                for name, m in endpoints for outcome, count in sorted(m.requests.items())
+            ])
+
+            histogram = []
+            for name, m in endpoints:
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, m.bucket_counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else str(bound)
+                    histogram.append(({'endpoint': name, 'le': le}, cumulative))
+            lines.append("# HELP scraper_http_request_duration_seconds API request latency.")
+            lines.append("# TYPE scraper_http_request_duration_seconds histogram")
+            for labels, value in histogram:
+                lines.append(f'scraper_http_request_duration_seconds_bucket{{endpoint="{labels["endpoint"]}",le="{labels["le"]}"}} {value}')
+            for name, m in endpoints:
+                lines.append(f'scraper_http_request_duration_seconds_sum{{endpoint="{name}"}} {m.latency_sum:.6f}')
+                lines.append(f'scraper_http_request_duration_seconds_count{{endpoint="{name}"}} {m.latency_count}')
+
+            metric('scraper_http_response_bytes_total', 'counter', 'Response bytes received per endpoint.', [
+                ({'endpoint': name}, m.response_bytes) for name, m in endpoints
+            ])
+            metric('scraper_json_decode_seconds_total', 'counter', 'Time spent decoding JSON per endpoint.', [
+                ({'endpoint': name}, f"{m.decode_seconds:.6f}") for name, m in endpoints
+            ])
+            metric('scraper_stage_duration_seconds', 'gauge', 'Wall time of each stage.', [
+                ({'stage': name}, f"{m.duration_seconds:.6f}") for name, m in stages
+            ])
+            metric('scraper_rows_upserted_total', 'counter', 'Rows upserted per stage.', [
+                ({'stage': name}, m.rows_upserted) for name, m in stages
+            ])
+            metric('scraper_db_write_seconds_total', 'counter', 'Time spent writing to the database per stage.', [
+                ({'stage': name}, f"{m.db_write_seconds:.6f}") for name, m in stages
+            ])
+
+        return '\n'.join(lines) + '\n'
+
+    def write_reports(self, json_path=None, prometheus_path=None, stdout=None):
+        """
+        Writes the JSON report to `json_path` (or to `stdout` if no path is
+        given) and, optionally, the Prometheus exposition to `prometheus_path`.
+        """
+        if json_path:
+            with open(json_path, 'w') as f:
+                f.write(self.to_json())
+        elif stdout is not None:
+            stdout.write(self.to_json())
+        if prometheus_path:
+            with open(prometheus_path, 'w') as f:
+                f.write(self.to_prometheus())
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premier_league_service', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=100, unique=True)),
+                ('completed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
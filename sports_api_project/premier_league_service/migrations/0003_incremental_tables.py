@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premier_league_service', '0002_scrapecheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeagueTableSync',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=10, unique=True)),
+                ('synced_through', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='fixture',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='LeagueTableContribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=10)),
+                ('home_score', models.IntegerField()),
+                ('away_score', models.IntegerField()),
+                ('away_club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='premier_league_service.club')),
+                ('fixture', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='premier_league_service.fixture')),
+                ('home_club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='premier_league_service.club')),
+            ],
+            options={
+                'unique_together': {('season', 'fixture')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:16
+
+import datetime
+
+from django.db import migrations, models
+
+# Seasons run August to May (2019-2020 finished in late July 2020), so
+# anything kicking off from August onwards belongs to the next season.
+SEASON_START_MONTH = 8
+
+
+def populate_fixture_seasons(apps, schema_editor):
+    """Derives the season of existing fixtures from their kickoff time."""
+    Fixture = apps.get_model('premier_league_service', 'Fixture')
+    kickoffs = Fixture.objects.exclude(kickoff_time=None).aggregate(
+        first=models.Min('kickoff_time'), last=models.Max('kickoff_time')
+    )
+    if kickoffs['first'] is None:
+        return
+
+    for year in range(kickoffs['first'].year - 1, kickoffs['last'].year + 1):
+        start = datetime.datetime(year, SEASON_START_MONTH, 1, tzinfo=datetime.timezone.utc)
+        end = datetime.datetime(year + 1, SEASON_START_MONTH, 1, tzinfo=datetime.timezone.utc)
+        Fixture.objects.filter(kickoff_time__gte=start, kickoff_time__lt=end).update(season=f"{year}-{year + 1}")
+
+    # The incremental ledgers were built from the old overlapping year
+    # windows; drop them so the next run recalculates every season.
+    apps.get_model('premier_league_service', 'LeagueTableContribution').objects.all().delete()
+    apps.get_model('premier_league_service', 'LeagueTableSync').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premier_league_service', '0003_incremental_tables'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fixture',
+            name='season',
+            field=models.CharField(blank=True, max_length=10, null=True),
+        ),
+        migrations.RunPython(populate_fixture_seasons, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='fixture',
+            index=models.Index(fields=['season', 'status'], name='fixture_season_status_idx'),
+        ),
+    ]
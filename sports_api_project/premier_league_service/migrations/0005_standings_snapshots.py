@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premier_league_service', '0004_fixture_season'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fixture',
+            name='matchweek',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='StandingsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=10)),
+                ('axis', models.CharField(choices=[('date', 'Date'), ('matchweek', 'Matchweek')], max_length=10)),
+                ('keys', models.BinaryField()),
+                ('club_ids', models.BinaryField()),
+                ('tables', models.BinaryField()),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('season', 'axis')},
+            },
+        ),
+    ]
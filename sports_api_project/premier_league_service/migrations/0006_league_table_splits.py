@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premier_league_service', '0005_standings_snapshots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeagueTableSplit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=10)),
+                ('view', models.CharField(choices=[('home', 'Home'), ('away', 'Away'), ('last6', 'Last 6 games')], max_length=10)),
+                ('position', models.IntegerField(default=0)),
+                ('played', models.IntegerField(default=0)),
+                ('won', models.IntegerField(default=0)),
+                ('drawn', models.IntegerField(default=0)),
+                ('lost', models.IntegerField(default=0)),
+                ('goals_for', models.IntegerField(default=0)),
+                ('goals_against', models.IntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('goal_difference', models.IntegerField(default=0)),
+                ('form', models.CharField(blank=True, max_length=10, null=True)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='premier_league_service.club')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['season', 'view', 'position'], name='split_season_view_pos_idx')],
+                'unique_together': {('club', 'season', 'view')},
+            },
+        ),
+    ]
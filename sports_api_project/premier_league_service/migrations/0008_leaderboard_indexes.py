@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premier_league_service', '0007_data_versions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='playerstat',
+            index=models.Index(fields=['season', '-goals', 'player'], name='pstat_goals_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerstat',
+            index=models.Index(fields=['season', '-assists', 'player'], name='pstat_assists_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerstat',
+            index=models.Index(fields=['season', '-clean_sheets', 'player'], name='pstat_clean_sheets_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerstat',
+            index=models.Index(fields=['season', '-minutes_played', 'player'], name='pstat_minutes_played_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerstat',
+            index=models.Index(fields=['season', '-passes', 'player'], name='pstat_passes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerstat',
+            index=models.Index(fields=['season', '-yellow_cards', 'player'], name='pstat_yellow_cards_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerstat',
+            index=models.Index(fields=['season', '-red_cards', 'player'], name='pstat_red_cards_idx'),
+        ),
+    ]
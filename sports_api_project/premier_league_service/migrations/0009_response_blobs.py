@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premier_league_service', '0008_leaderboard_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponseBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('etag', models.CharField(max_length=70)),
+                ('json', models.BinaryField()),
+                ('gzip', models.BinaryField()),
+                ('brotli', models.BinaryField(blank=True, null=True)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premier_league_service', '0009_response_blobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fixture',
+            index=models.Index(fields=['kickoff_time', 'fixture_id'], name='fixture_kickoff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fixture',
+            index=models.Index(fields=['season', 'kickoff_time', 'fixture_id'], name='fixture_season_kickoff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fixture',
+            index=models.Index(fields=['home_club', 'kickoff_time', 'fixture_id'], name='fixture_home_kickoff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fixture',
+            index=models.Index(fields=['away_club', 'kickoff_time', 'fixture_id'], name='fixture_away_kickoff_idx'),
+        ),
+    ]
@@ -75,6 +75,29 @@ class Fixture(models.Model):
     home_score = models.IntegerField(null=True, blank=True)
     away_score = models.IntegerField(null=True, blank=True)
 
+    # Bumped whenever the scraper changes this fixture; calculate_tables
+    # --incremental uses it to find the fixtures changed since its last run.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # The season this fixture belongs to, e.g. "2024-2025". Set from the
+    # compSeason it was fetched with, so per-season queries are exact.
+    season = models.CharField(max_length=10, null=True, blank=True)
+    # The API's gameweek (round) number, 1-38
+    matchweek = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # calculate_tables reads one season's completed fixtures at a time
+            models.Index(fields=['season', 'status'], name='fixture_season_status_idx'),
+            # The fixtures endpoint pages in (kickoff_time, fixture_id) order;
+            # each filter it offers has an index in that order, so a page
+            # is one short index range scan however deep the cursor is.
+            models.Index(fields=['kickoff_time', 'fixture_id'], name='fixture_kickoff_idx'),
+            models.Index(fields=['season', 'kickoff_time', 'fixture_id'], name='fixture_season_kickoff_idx'),
+            models.Index(fields=['home_club', 'kickoff_time', 'fixture_id'], name='fixture_home_kickoff_idx'),
+            models.Index(fields=['away_club', 'kickoff_time', 'fixture_id'], name='fixture_away_kickoff_idx'),
+        ]
+
     def __str__(self):
         return f"{self.home_club.abbr} vs {self.away_club.abbr} ({self.kickoff_time.date()})"
 
@@ -95,6 +118,145 @@ class PlayerStat(models.Model):
 
     class Meta:
         unique_together = ('player', 'season') # One stat line per player per season
+        indexes = [
+            # Leaderboards read one season ordered by a stat (then player, for keyset paging)
+            models.Index(fields=['season', f'-{stat}', 'player'], name=f'pstat_{stat}_idx')
+            for stat in ('goals', 'assists', 'clean_sheets', 'minutes_played', 'passes', 'yellow_cards', 'red_cards')
+        ]
+
+    def __str__(self):
+        return f"Stats for {self.player} ({self.season})"
+
+
+class LeagueTableContribution(models.Model):
+    """
+    Records the result a completed fixture currently contributes to a
+    season's LeagueTable, so an incremental update can subtract it again
+    if the fixture's score or status later changes.
+    """
+    season = models.CharField(max_length=10)
+    fixture = models.ForeignKey(Fixture, on_delete=models.CASCADE)
+    home_club = models.ForeignKey(Club, related_name='+', on_delete=models.CASCADE)
+    away_club = models.ForeignKey(Club, related_name='+', on_delete=models.CASCADE)
+    home_score = models.IntegerField()
+    away_score = models.IntegerField()
+
+    class Meta:
+        unique_together = ('season', 'fixture')
+
+    def __str__(self):
+        return f"{self.season} - fixture {self.fixture_id}"
+
+
+class LeagueTableSync(models.Model):
+    """
+    Tracks up to which Fixture.updated_at a season's LeagueTable has been
+    calculated. A missing row means the season needs a full recalculation.
+    """
+    season = models.CharField(max_length=10, unique=True)
+    synced_through = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.season} synced through {self.synced_through}"
+
+
+class LeagueTableSplit(models.Model):
+    """
+    A club's row in one of a season's split tables: home games only,
+    away games only, or its last six games. Rebuilt by calculate_tables
+    alongside LeagueTable.
+    """
+    VIEW_CHOICES = [('home', 'Home'), ('away', 'Away'), ('last6', 'Last 6 games')]
+
+    club = models.ForeignKey(Club, on_delete=models.CASCADE)
+    season = models.CharField(max_length=10)
+    view = models.CharField(max_length=10, choices=VIEW_CHOICES)
+
+    position = models.IntegerField(default=0)
+    played = models.IntegerField(default=0)
+    won = models.IntegerField(default=0)
+    drawn = models.IntegerField(default=0)
+    lost = models.IntegerField(default=0)
+    goals_for = models.IntegerField(default=0)
+    goals_against = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+    goal_difference = models.IntegerField(default=0)
+    form = models.CharField(max_length=10, null=True, blank=True)
+
+    class Meta:
+        unique_together = ('club', 'season', 'view')
+        indexes = [
+            # LeagueTableView reads one season's split in position order
+            models.Index(fields=['season', 'view', 'position'], name='split_season_view_pos_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.season} {self.view} - {self.club.club_name} (Pos: {self.position})"
+
+
+class StandingsSnapshot(models.Model):
+    """
+    A season's cumulative league table after every matchday ('date' axis)
+    or every matchweek ('matchweek' axis), packed into flat int32 arrays
+    (see snapshots.py) so any point in the season is a single slice.
+    Rebuilt by calculate_tables.
+    """
+    AXIS_CHOICES = [('date', 'Date'), ('matchweek', 'Matchweek')]
+
+    season = models.CharField(max_length=10)
+    axis = models.CharField(max_length=10, choices=AXIS_CHOICES)
+    keys = models.BinaryField() # array('i'): date ordinals or matchweek numbers, ascending
+    club_ids = models.BinaryField() # array('d'): the clubs, in the order each table lists them
+    tables = models.BinaryField() # array('i'): keys x clubs x SNAPSHOT_FIELDS
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('season', 'axis')
+
+    def __str__(self):
+        return f"{self.season} standings by {self.axis}"
+
+
+class DataVersion(models.Model):
+    """
+    A counter bumped whenever the data behind a set of API responses
+    changes, e.g. "tables:2024-2025", "player_stats:2024-2025", "clubs"
+    or "players". Cached API responses are keyed by the versions they
+    were built from (see api_cache.py), so a bump invalidates them.
+    """
+    scope = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.scope} v{self.version}"
+
+
+class ResponseBlob(models.Model):
+    """
+    A fully rendered API response, stored once as JSON bytes plus gzip and
+    brotli variants, so the view can send it without querying, serializing
+    or compressing anything. Valid only while `etag` still matches the
+    current data versions (see response_blobs.py).
+    """
+    key = models.CharField(max_length=255, unique=True) # e.g. "table:season=2024-2025&view=home"
+    etag = models.CharField(max_length=70)
+    json = models.BinaryField()
+    gzip = models.BinaryField()
+    brotli = models.BinaryField(null=True, blank=True) # Only if brotli was installed when rendered
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key} ({len(self.json)} bytes)"
+
+
+class ScrapeCheckpoint(models.Model):
+    """
+    Records a completed stage of run_scraper (e.g. "clubs", "tables:2023-2024"
+    or "players:page:3"), so an interrupted run can be resumed with --resume.
+    """
+    stage = models.CharField(max_length=100, unique=True)
+    completed_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"Stats for {self.player} ({self.season})"
\ No newline at end of file
+        return f"{self.stage} ({self.completed_at})"
@@ -0,0 +1,64 @@
+import gzip
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from .response_cache import cache_key, content_hash
+
+
+class ResponseStore:
+    """
+    A content-addressed directory of recorded API responses.
+
+    Layout:
+        objects/<hash[:2]>/<hash>.json.gz   gzip-compressed response bodies,
+                                            named by the SHA-256 of the body
+        requests/<key>.json                 maps one endpoint + params pair
+                                            to the object holding its body
+
+    Identical bodies (e.g. empty stat pages) are stored once. Every file is
+    written atomically, so concurrent fetch threads can record safely and a
+    directory can be replayed on any machine.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def _object_path(self, digest):
+        return self.directory / 'objects' / digest[:2] / f"{digest}.json.gz"
+
+    def _request_path(self, endpoint, params):
+        return self.directory / 'requests' / f"{cache_key(endpoint, params)}.json"
+
+    def record(self, endpoint, params, body):
+        """Stores a response body for this request."""
+        digest = content_hash(body)
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            self._atomic_write(object_path, gzip.compress(body))
+        self._atomic_write(self._request_path(endpoint, params), json.dumps({
+            'endpoint': endpoint,
+            'params': {str(k): str(v) for k, v in (params or {}).items()},
+            'object': digest,
+        }, sort_keys=True).encode('utf-8'))
+
+    def load(self, endpoint, params):
+        """Returns the recorded body for this request, or None if it was never recorded."""
+        try:
+            digest = json.loads(self._request_path(endpoint, params).read_text())['object']
+            return gzip.decompress(self._object_path(digest).read_bytes())
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _atomic_write(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
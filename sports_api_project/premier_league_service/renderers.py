@@ -0,0 +1,34 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# orjson is optional; without it we render with DRF's own JSONRenderer.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# U+2028 and U+2029 in UTF-8, which DRF's JSONRenderer writes as \u escapes
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renders JSON with orjson, which writes bytes straight from dicts and
+    lists far faster than the standard library. The output matches DRF's
+    compact, UTF-8 JSONRenderer for the data our views return, including
+    its escaping of U+2028 / U+2029 (valid JSON, but line breaks to
+    JavaScript). Types orjson doesn't know are handed to DRF's encoder,
+    and browsable API requests (with 'indent') go through the normal
+    renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        body = orjson.dumps(data, default=JSONEncoder().default)
+        if b'\xe2\x80' in body: # Both characters' UTF-8 starts with these bytes
+            body = body.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return body
@@ -0,0 +1,133 @@
+import gzip
+
+from django.http import Http404
+from django.utils.http import parse_etags
+
+from .models import ResponseBlob
+from .renderers import ORJSONRenderer
+
+# Brotli is optional; without it we store and serve gzip only.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11 # Compressed once per data change, so use the best ratio
+
+# The ETag suffix of each compressed variant. A strong ETag names one exact
+# body, so the gzip and brotli bodies can't share the identity body's.
+ETAG_SUFFIXES = {'gzip': '-gzip', 'br': '-br'}
+
+# The ResponseBlob column holding each content coding's body
+ENCODING_COLUMNS = {'br': 'brotli', 'gzip': 'gzip'}
+
+
+def blob_key(payload):
+    return f"{payload.namespace}:" + '&'.join(
+        f"{name}={value}" for name, value in sorted(payload.params.items()) if value is not None
+    )
+
+
+def encoding_qualities(accept_encoding):
+    """Maps each content coding in an Accept-Encoding header to its q-value."""
+    qualities = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            qualities[coding.strip().lower()] = q
+    return qualities
+
+
+def negotiate_encodings(request):
+    """
+    The stored content codings ('br', 'gzip') this request accepts, best
+    first; empty for identity only. A coding given q=0 is refused even
+    when '*' would allow it.
+    """
+    qualities = encoding_qualities(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    available = ('br', 'gzip') if brotli is not None else ('gzip',)
+    return tuple(coding for coding in available if qualities.get(coding, qualities.get('*', 0)) > 0)
+
+
+def encoded_etag(etag, encoding):
+    """The ETag of `etag`'s body in a content coding ('br', 'gzip' or None for identity)."""
+    suffix = ETAG_SUFFIXES.get(encoding)
+    return f'{etag[:-1]}{suffix}"' if suffix else etag
+
+
+def request_etag(request, etag):
+    """
+    The variant of `etag` (see encoded_etag()) the request's If-None-Match
+    holds, else `etag`. Every variant is the same data, so any of them
+    earns a 304: pass this to get_conditional_response().
+    """
+    variants = {encoded_etag(etag, encoding) for encoding in (None, *ETAG_SUFFIXES)}
+    for tag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        tag = tag.removeprefix('W/')
+        if tag in variants:
+            return tag
+    return etag
+
+
+def store_blob(payload):
+    """
+    Renders `payload` and stores it with its compressed variants, unless
+    a blob for the same data versions already exists. Returns True if a
+    blob was (re)built. Payloads with no data (Http404) drop their blob.
+    """
+    key = blob_key(payload)
+    etag = payload.etag
+    if ResponseBlob.objects.filter(key=key, etag=etag).exists():
+        return False
+
+    try:
+        body = ORJSONRenderer().render(payload.get())
+    except Http404:
+        ResponseBlob.objects.filter(key=key).delete()
+        return False
+
+    ResponseBlob.objects.update_or_create(key=key, defaults={
+        'etag': etag,
+        'json': body,
+        'gzip': gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0),
+        'brotli': brotli.compress(body, quality=BROTLI_QUALITY) if brotli is not None else None,
+    })
+    return True
+
+
+def load_blob(payload, encodings):
+    """
+    Returns (body, encoding) from the stored blob if it matches the
+    payload's current data versions, else None. The body is the first of
+    `encodings` (see negotiate_encodings()) the blob has, falling back to
+    identity (encoding None). Only the variants needed are read.
+    """
+    return _blob_body(_blob_query(payload, encodings).first(), encodings)
+
+
+async def aload_blob(payload, encodings):
+    """load_blob() for async views, using the async ORM."""
+    return _blob_body(await _blob_query(payload, encodings).afirst(), encodings)
+
+
+def _blob_query(payload, encodings):
+    columns = [ENCODING_COLUMNS[encoding] for encoding in encodings] + ['json']
+    return ResponseBlob.objects.filter(key=blob_key(payload), etag=payload.etag).values_list(*columns)
+
+
+def _blob_body(row, encodings):
+    if row is None:
+        return None
+    # brotli is None in blobs rendered without the brotli package
+    for body, encoding in zip(row, (*encodings, None)):
+        if body is not None:
+            return bytes(body), encoding
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+
+def cache_key(endpoint, params):
+    """Builds a stable key for an endpoint + params pair."""
+    canonical = json.dumps([endpoint, {str(k): str(v) for k, v in (params or {}).items()}], sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def content_hash(body):
+    return hashlib.sha256(body).hexdigest()
+
+
+class CacheEntry:
+    """A cached API response plus the validators needed to revalidate it."""
+
+    def __init__(self, body, etag=None, last_modified=None, content_hash=None,
+                 immutable=False, fetched_at=None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.immutable = immutable
+        self.fetched_at = fetched_at
+
+    def conditional_headers(self):
+        """Headers for a conditional GET against this entry."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    A persistent on-disk cache of API responses.
+
+    Each entry is stored as two files named after its key: `<key>.body` holds
+    the raw response bytes and `<key>.meta.json` holds the ETag, Last-Modified,
+    content hash and immutable flag. Writes go through a temp file and
+    os.replace() so concurrent fetch threads never see a half-written entry.
+    The meta is written last and names its body by content hash, so a body
+    without its meta (a crash, or a reader, between the two writes) is
+    treated as not cached rather than paired with the old ETag.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, key):
+        return self.directory / f"{key}.body", self.directory / f"{key}.meta.json"
+
+    def get(self, endpoint, params):
+        """Returns the CacheEntry for this request, or None if not cached."""
+        body_path, meta_path = self._paths(cache_key(endpoint, params))
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.get('content_hash') != content_hash(body):
+            return None # The body was replaced but its meta wasn't (yet)
+        return CacheEntry(body=body, **meta)
+
+    def is_immutable(self, endpoint, params):
+        """True if this request is cached and will never change upstream."""
+        _, meta_path = self._paths(cache_key(endpoint, params))
+        try:
+            return json.loads(meta_path.read_text()).get('immutable', False)
+        except (OSError, ValueError):
+            return False
+
+    def put(self, endpoint, params, body, etag=None, last_modified=None, immutable=False):
+        """Stores a response. Returns the new CacheEntry."""
+        entry = CacheEntry(
+            body=body,
+            etag=etag,
+            last_modified=last_modified,
+            content_hash=content_hash(body),
+            immutable=immutable,
+            fetched_at=time.time(),
+        )
+        body_path, meta_path = self._paths(cache_key(endpoint, params))
+        self._atomic_write(body_path, body)
+        # Last: until this lands, get() sees the old meta's hash mismatch
+        self._atomic_write(meta_path, json.dumps({
+            'etag': entry.etag,
+            'last_modified': entry.last_modified,
+            'content_hash': entry.content_hash,
+            'immutable': entry.immutable,
+            'fetched_at': entry.fetched_at,
+        }).encode('utf-8'))
+        return entry
+
+    def _atomic_write(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
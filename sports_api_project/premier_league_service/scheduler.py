@@ -0,0 +1,72 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class Job:
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval  # Seconds between runs, or None to run once
+        self.runs = 0
+        self.failures = 0
+        self.last_duration = None
+
+
+class Scheduler:
+    """
+    A single-threaded scheduler that runs jobs on their own cadences.
+
+    Jobs are kept in a heap ordered by their next due time. A job with
+    interval=None runs once at start-up and is never rescheduled. A job
+    that raises is logged and rescheduled as normal, so one failing dataset
+    never stops the others. stop() (e.g. from a signal handler) wakes the
+    loop immediately.
+    """
+
+    def __init__(self, log=None, log_error=None, before_job=None):
+        self.log = log or (lambda message: None)
+        self.log_error = log_error or (lambda message: None)
+        self.before_job = before_job
+        self.queue = []
+        self.counter = itertools.count()  # Tie-breaker for jobs due at the same time
+        self.stop_event = threading.Event()
+
+    def add_job(self, name, func, interval, delay=0):
+        job = Job(name, func, interval)
+        heapq.heappush(self.queue, (time.monotonic() + delay, next(self.counter), job))
+        return job
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run_forever(self):
+        while self.queue and not self.stop_event.is_set():
+            due_at, _, job = self.queue[0]
+            wait = due_at - time.monotonic()
+            if wait > 0:
+                # Sleep until the next job is due, or until stop() is called
+                self.stop_event.wait(wait)
+                continue
+
+            heapq.heappop(self.queue)
+            self.run_job(job)
+            if job.interval is not None:
+                # Schedule from the planned time so cadences don't drift,
+                # but never schedule into the past after a slow run.
+                next_due = max(due_at + job.interval, time.monotonic())
+                heapq.heappush(self.queue, (next_due, next(self.counter), job))
+
+    def run_job(self, job):
+        if self.before_job is not None:
+            self.before_job()
+        start = time.monotonic()
+        try:
+            job.func()
+            job.runs += 1
+        except Exception as e:
+            job.failures += 1
+            self.log_error(f"Job '{job.name}' failed: {e}")
+        job.last_duration = time.monotonic() - start
+        self.log(f"Job '{job.name}' finished in {job.last_duration:.2f}s (runs: {job.runs}, failures: {job.failures}).")
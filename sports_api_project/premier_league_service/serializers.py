@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from rest_framework import serializers
 from .models import LeagueTable, PlayerStat, Club, Player
 
@@ -31,4 +33,49 @@ class PlayerStatSerializer(serializers.Serializer):
     name = serializers.CharField(max_length=200)
     club = serializers.CharField(max_length=100)
     nationality = serializers.CharField(max_length=100, allow_blank=True, allow_null=True)
-    stat = serializers.IntegerField()
\ No newline at end of file
+    stat = serializers.IntegerField()
+
+
+class LeaderboardEntrySerializer(serializers.Serializer):
+    """
+    Serializes one row of a stat leaderboard.
+    """
+    player_id = serializers.FloatField()
+    name = serializers.CharField(max_length=200)
+    club = serializers.CharField(max_length=100)
+    position = serializers.CharField(max_length=50, allow_blank=True, allow_null=True)
+    nationality = serializers.CharField(max_length=100, allow_blank=True, allow_null=True)
+    stat = serializers.IntegerField()
+
+
+class FixtureSerializer(serializers.Serializer):
+    """
+    Serializes one fixture or result.
+    """
+    fixture_id = serializers.FloatField()
+    season = serializers.CharField(max_length=10, allow_null=True)
+    matchweek = serializers.IntegerField(allow_null=True)
+    kickoff_time = serializers.DateTimeField()
+    status = serializers.CharField(max_length=20)
+    home_club = serializers.CharField(max_length=100)
+    away_club = serializers.CharField(max_length=100)
+    home_score = serializers.IntegerField(allow_null=True)
+    away_score = serializers.IntegerField(allow_null=True)
+    venue = serializers.CharField(max_length=100, allow_blank=True, allow_null=True)
+
+
+@lru_cache(maxsize=None)
+def _field_names(serializer_class):
+    return tuple(serializer_class().fields)
+
+
+def fast_serialize(serializer_class, rows):
+    """
+    The fast path for the read endpoints. services.py already formats
+    each row with the serializer's keys and value types, so this only lays
+    the rows out in `serializer_class`'s field order, skipping DRF's
+    per-field to_representation() calls. The output is identical to
+    `serializer_class(rows, many=True).data`.
+    """
+    names = _field_names(serializer_class)
+    return [{name: row[name] for name in names} for row in rows]
@@ -1,43 +1,127 @@
+import datetime
+import heapq
+
 from django.http import Http404
-from .models import LeagueTable, PlayerStat, Player
-from django.db.models import F, Value, CharField
-from django.db.models.functions import Concat
+from django.utils import timezone
+from .models import Club, Fixture, LeagueTable, LeagueTableSplit, PlayerStat, Player
+from . import snapshots
+from django.db.models import F, Q, Value, CharField, Window
+from django.db.models.functions import Concat, RowNumber
+
+# A league table row's output keys, and the columns they're read from.
+# Rows are fetched as plain tuples: no model instances are built.
+TABLE_ENTRY_COLUMNS = (
+    ('position', 'position'),
+    ('team', 'club__club_name'), # Get name from related club
+    ('played', 'played'),
+    ('wins', 'won'),
+    ('draws', 'drawn'),
+    ('losses', 'lost'),
+    ('goals_for', 'goals_for'),
+    ('goals_against', 'goals_against'),
+    ('points', 'points'),
+    ('goal_difference', 'goal_difference'),
+    ('form', 'form'),
+)
+
+
+def _table_rows(queryset):
+    """Formats LeagueTable / LeagueTableSplit rows for the serializer, reading only the needed columns."""
+    keys = [key for key, _ in TABLE_ENTRY_COLUMNS]
+    return [dict(zip(keys, row)) for row in queryset.values_list(*[column for _, column in TABLE_ENTRY_COLUMNS])]
+
+
+def _player_name(first_name, last_name):
+    return f"{first_name or ''} {last_name or ''}".strip()
+
 
 def get_league_table_data(season: str):
     """
     Fetches the league table from our database for a specific season.
     """
     # --- CHANGED ---
-    # We now filter by the provided season and select related club info
-    table_data = LeagueTable.objects.filter(season=season).select_related('club').order_by('position')
+    # We now filter by the provided season and read the club's name with a join
+    formatted_table = _table_rows(LeagueTable.objects.filter(season=season).order_by('position'))
 
-    if not table_data:
+    if not formatted_table:
         raise Http404(f"No league table data found for season: {season}")
 
-    # Format the data for the serializer
-    formatted_table = []
-    for entry in table_data:
-        formatted_table.append({
-            'position': entry.position,
-            'team': entry.club.club_name, # Get name from related club
-            'played': entry.played,
-            'wins': entry.won,
-            'draws': entry.drawn,
-            'losses': entry.lost,
-            'goals_for': entry.goals_for,
-            'goals_against': entry.goals_against,
-            'points': entry.points,
-            'goal_difference': entry.goal_difference,
-            'form': entry.form
-        })
-    
     return formatted_table
 
 
-def get_player_stats_data(season: str, stat_type: str):
+def get_league_tables_data(seasons):
+    """
+    Fetches several seasons' league tables with one query.
+    Returns {season: rows} shaped like get_league_table_data()'s; seasons
+    with no table are left out.
+    """
+    tables = {season: [] for season in seasons}
+    queryset = LeagueTable.objects.filter(season__in=tables).order_by('season', 'position')
+    keys = [key for key, _ in TABLE_ENTRY_COLUMNS]
+    for season, *row in queryset.values_list('season', *[column for _, column in TABLE_ENTRY_COLUMNS]):
+        tables[season].append(dict(zip(keys, row)))
+    return {season: rows for season, rows in tables.items() if rows}
+
+
+def get_league_table_split_data(season: str, view: str):
+    """
+    Fetches one of a season's precomputed split tables
+    ('home', 'away' or 'last6').
+    """
+    # Same shape as get_league_table_data()
+    formatted_table = _table_rows(LeagueTableSplit.objects.filter(season=season, view=view).order_by('position'))
+
+    if not formatted_table:
+        raise Http404(f"No {view} league table data found for season: {season}")
+
+    return formatted_table
+
+
+def get_league_table_snapshot_data(season: str, as_of=None, matchweek=None):
+    """
+    Fetches the league table as it stood on a date (`as_of`, a datetime.date)
+    or after a matchweek, from the precomputed standings snapshots.
+    """
+    if as_of is not None:
+        rows = snapshots.table_at(season, 'date', as_of.toordinal())
+        when = f"on {as_of.isoformat()}"
+    else:
+        rows = snapshots.table_at(season, 'matchweek', matchweek)
+        when = f"after matchweek {matchweek}"
+
+    if not rows:
+        raise Http404(f"No league table data found for season {season} {when}")
+
+    club_names = dict(Club.objects.filter(club_id__in=[row['club_id'] for row in rows]).values_list('club_id', 'club_name'))
+
+    # Same shape as get_league_table_data()
+    return [
+        {
+            'position': row['position'],
+            'team': club_names.get(row['club_id'], 'Unknown'),
+            'played': row['played'],
+            'wins': row['won'],
+            'draws': row['drawn'],
+            'losses': row['lost'],
+            'goals_for': row['goals_for'],
+            'goals_against': row['goals_against'],
+            'points': row['points'],
+            'goal_difference': row['goal_difference'],
+            'form': None # Not tracked per snapshot
+        }
+        for row in rows
+    ]
+
+
+# The PlayerStat columns a leaderboard can be ranked by
+LEADERBOARD_STATS = ('goals', 'assists', 'clean_sheets', 'minutes_played', 'passes', 'yellow_cards', 'red_cards')
+MAX_LEADERBOARD_PAGE = 100
+
+
+def get_player_stats_data(season: str, stat_type: str, team: str = None):
     """
     Fetches player stats (goals or assists) from our database
-    for a specific season.
+    for a specific season, optionally only for one team's players.
     """
     # Determine which database field to sort by
     if stat_type == 'goals':
@@ -54,19 +138,206 @@ def get_player_stats_data(season: str, stat_type: str):
     player_stats = PlayerStat.objects.filter(
         season=season,
         **{f'{stat_field}__gt': 0} # Only get players with stat > 0
-    ).select_related('player', 'player__club').order_by(sort_key)[:20] # Get top 20
+    )
+    if team:
+        # Filter before taking the top 20, so we get that team's top 20
+        player_stats = player_stats.filter(player__club__club_name__iexact=team)
+    player_stats = player_stats.order_by(sort_key, 'player_id').values_list(
+        'player__first_name', 'player__last_name', 'player__club__club_name', 'player__nationality',
+        stat_field # Get the specific stat value (goals or assists)
+    )[:20] # Get top 20
+
+    # Format the data for the serializer
+    formatted_stats = [
+        {
+            'name': _player_name(first_name, last_name),
+            'club': 'Unknown' if club_name is None else club_name,
+            'nationality': nationality,
+            'stat': value
+        }
+        for first_name, last_name, club_name, nationality, value in player_stats
+    ]
 
-    if not player_stats:
+    # A team with no players on the list is an empty list, like before
+    # the filter moved into SQL; only a season with no stats is a 404
+    if not formatted_stats and not (team and _has_player_stats(season, stat_field)):
         raise Http404(f"No player stats found for {stat_type} in season {season}")
 
-    # Format the data for the serializer
-    formatted_stats = []
-    for stat_line in player_stats:
-        formatted_stats.append({
-            'name': f"{stat_line.player.first_name or ''} {stat_line.player.last_name or ''}".strip(),
-            'club': stat_line.player.club.club_name if stat_line.player.club else 'Unknown',
-            'nationality': stat_line.player.nationality,
-            'stat': getattr(stat_line, stat_field) # Get the specific stat value (goals or assists)
+    return formatted_stats
+
+
+def _has_player_stats(season, stat_field):
+    return PlayerStat.objects.filter(season=season, **{f'{stat_field}__gt': 0}).exists()
+
+
+def get_player_stats_by_season(seasons, stat_type: str):
+    """
+    Fetches the top 20 players for a stat in several seasons with one query:
+    a window function ranks each season's players and only the top 20 per
+    season are returned. Returns {season: rows} shaped like
+    get_player_stats_data()'s; seasons with no stats are left out.
+    """
+    if stat_type not in ('goals', 'assists'):
+        raise Http404("Invalid stat type. Use 'goals' or 'assists'.")
+
+    ranked = PlayerStat.objects.filter(season__in=seasons, **{f'{stat_type}__gt': 0}).annotate(
+        rank=Window(RowNumber(), partition_by=F('season'), order_by=[F(stat_type).desc(), F('player_id').asc()])
+    ).filter(rank__lte=20).order_by('season', 'rank').values_list(
+        'season', 'player__first_name', 'player__last_name', 'player__club__club_name', 'player__nationality',
+        stat_type
+    )
+
+    stats = {}
+    for season, first_name, last_name, club_name, nationality, value in ranked:
+        stats.setdefault(season, []).append({
+            'name': _player_name(first_name, last_name),
+            'club': 'Unknown' if club_name is None else club_name,
+            'nationality': nationality,
+            'stat': value
         })
-            
-    return formatted_stats
\ No newline at end of file
+    return stats
+
+
+def get_leaderboard_data(season: str, stat: str, team: str = None, position: str = None,
+                         limit: int = 20, after=None):
+    """
+    Fetches one page of a season's leaderboard for any PlayerStat column.
+
+    Filtering and ordering (stat descending, then player id) happen in SQL.
+    Pages are keyset-paginated: `after` is the (value, player_id) of the
+    last row of the previous page. Returns (rows, next_after), where
+    next_after is None on the last page.
+    """
+    if stat not in LEADERBOARD_STATS:
+        raise Http404(f"Invalid stat. Use one of: {', '.join(LEADERBOARD_STATS)}.")
+
+    queryset = PlayerStat.objects.filter(season=season, **{f'{stat}__gt': 0})
+    if team:
+        queryset = queryset.filter(player__club__club_name__iexact=team)
+    if position:
+        queryset = queryset.filter(player__position__iexact=position)
+    if after is not None:
+        value, player_id = after
+        queryset = queryset.filter(Q(**{f'{stat}__lt': value}) | Q(**{stat: value, 'player_id__gt': player_id}))
+
+    # One extra row tells us whether there is another page
+    page = list(
+        queryset.order_by(f'-{stat}', 'player_id').values_list(
+            'player_id', 'player__first_name', 'player__last_name', 'player__club__club_name',
+            'player__position', 'player__nationality', stat
+        )[:limit + 1]
+    )
+    # Filters that match nobody give an empty page, as on /player-stats/
+    if not page and after is None and not ((team or position) and _has_player_stats(season, stat)):
+        raise Http404(f"No player stats found for {stat} in season {season}")
+
+    next_after = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_after = (page[-1][-1], page[-1][0])
+
+    rows = [
+        {
+            'player_id': player_id,
+            'name': _player_name(first_name, last_name),
+            'club': 'Unknown' if club_name is None else club_name,
+            'position': position,
+            'nationality': nationality,
+            'stat': value
+        }
+        for player_id, first_name, last_name, club_name, position, nationality, value in page
+    ]
+    return rows, next_after
+
+
+MAX_FIXTURES_PAGE = 100
+
+# A fixture row's output keys, and the columns they're read from
+FIXTURE_COLUMNS = (
+    ('fixture_id', 'fixture_id'),
+    ('season', 'season'),
+    ('matchweek', 'matchweek'),
+    ('kickoff_time', 'kickoff_time'),
+    ('status', 'status'),
+    ('home_club', 'home_club__club_name'),
+    ('away_club', 'away_club__club_name'),
+    ('home_score', 'home_score'),
+    ('away_score', 'away_score'),
+    ('venue', 'venue'),
+)
+
+
+def _iso_datetime(value):
+    # Formatted like DRF's DateTimeField, so fast_serialize() matches the serializer
+    value = timezone.localtime(value).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def get_fixtures_data(season: str = None, club: str = None, status: str = None, date_from=None, date_to=None,
+                      limit: int = 50, after=None):
+    """
+    Fetches one page of fixtures and results, in kickoff order.
+
+    Filters (all optional): season, club name (home or away), status and
+    a range of kickoff dates (datetime.date, both inclusive). Fixtures
+    without a kickoff time yet aren't listed.
+
+    Pages are keyset-paginated on (kickoff_time, fixture_id): `after` is
+    the key of the last row of the previous page, and every filter has a
+    matching index (see Fixture.Meta), so each page costs the same
+    however deep it is. Returns (rows, next_after), where next_after is
+    None on the last page.
+    """
+    queryset = Fixture.objects.exclude(kickoff_time=None)
+    if season:
+        queryset = queryset.filter(season=season)
+    if status:
+        queryset = queryset.filter(status=status)
+    if date_from:
+        queryset = queryset.filter(kickoff_time__gte=_day_start(date_from))
+    if date_to:
+        queryset = queryset.filter(kickoff_time__lt=_day_start(date_to + datetime.timedelta(days=1)))
+    if after is not None:
+        kickoff_time, fixture_id = after
+        # The plain >= bound lets the index scan start at the cursor
+        queryset = queryset.filter(kickoff_time__gte=kickoff_time).filter(
+            Q(kickoff_time__gt=kickoff_time) | Q(fixture_id__gt=fixture_id)
+        )
+
+    def page_of(queryset):
+        # One extra row tells us whether there is another page
+        return queryset.order_by('kickoff_time', 'fixture_id').values_list(
+            *[column for _, column in FIXTURE_COLUMNS]
+        )[:limit + 1]
+
+    if club:
+        club_id = Club.objects.filter(club_name__iexact=club).values_list('club_id', flat=True).first()
+        if club_id is None:
+            raise Http404(f"No club found named {club}")
+        # An OR across home and away can't walk one index in order, so read
+        # a page from each of the two indexes and merge them
+        page = list(heapq.merge(
+            page_of(queryset.filter(home_club_id=club_id)),
+            page_of(queryset.filter(away_club_id=club_id)),
+            key=lambda row: (row[3], row[0])
+        ))[:limit + 1]
+    else:
+        page = list(page_of(queryset))
+
+    if not page and after is None:
+        raise Http404("No fixtures found matching the filters")
+
+    next_after = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_after = (page[-1][3], page[-1][0])
+
+    keys = [key for key, _ in FIXTURE_COLUMNS]
+    rows = [dict(zip(keys, row)) for row in page]
+    for row in rows:
+        row['kickoff_time'] = _iso_datetime(row['kickoff_time'])
+    return rows, next_after
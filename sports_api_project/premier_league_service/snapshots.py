@@ -0,0 +1,129 @@
+"""
+Point-in-time league tables.
+
+For each season calculate_tables stores the cumulative table after every
+matchday and after every matchweek as one StandingsSnapshot per axis.
+Each snapshot is three flat arrays:
+
+    keys       array('i')  date ordinals (or matchweek numbers), ascending
+    club_ids   array('d')  every club that played in the season
+    tables     array('i')  len(keys) x len(club_ids) x len(SNAPSHOT_FIELDS)
+
+so "the table on Boxing Day" is a bisect over `keys` and one slice of
+`tables`; no fixtures are read at request time.
+"""
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import groupby
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Fixture, StandingsSnapshot
+from .standings import TABLE_FIELDS, apply_result, new_table, rank_table
+
+SNAPSHOT_FIELDS = ('position',) + TABLE_FIELDS
+
+
+def _to_bytes(values):
+    # Stored little-endian so snapshots are portable between machines
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode, data):
+    values = array(typecode)
+    values.frombytes(bytes(data))
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def _cumulative_tables(fixtures, club_ids, key_func):
+    """
+    Applies `fixtures` (in kickoff order) grouped by `key_func` and
+    returns (keys, tables): the table after each group, ranked.
+    """
+    keys = array('i')
+    tables = array('i')
+    table = new_table()
+    for club_id in club_ids:
+        table[club_id] # Every club is listed from the first snapshot on
+
+    for key, group in groupby(fixtures, key=key_func):
+        for fixture in group:
+            apply_result(table, fixture.home_club_id, fixture.away_club_id,
+                         fixture.home_score or 0, fixture.away_score or 0)
+        positions = {club_id: position for position, club_id, _ in rank_table(table)}
+        keys.append(key)
+        for club_id in club_ids:
+            tables.append(positions[club_id])
+            tables.extend(table[club_id][field] for field in TABLE_FIELDS)
+    return keys, tables
+
+
+def completed_fixtures(season):
+    """A season's completed fixtures in kickoff order."""
+    return list(
+        Fixture.objects.filter(season=season, status='COMPLETED').exclude(kickoff_time=None)
+        .order_by('kickoff_time', 'fixture_id')
+    )
+
+
+def build_snapshots(season, fixtures):
+    """Rebuilds both of a season's snapshots from its completed_fixtures()."""
+    if not fixtures:
+        StandingsSnapshot.objects.filter(season=season).delete()
+        return 0
+
+    club_ids = sorted({f.home_club_id for f in fixtures} | {f.away_club_id for f in fixtures})
+    by_date = _cumulative_tables(fixtures, club_ids, lambda f: timezone.localdate(f.kickoff_time).toordinal())
+
+    # A matchweek's table counts every fixture of that round or earlier,
+    # wherever a postponed match ended up in the calendar.
+    by_round = sorted((f for f in fixtures if f.matchweek is not None), key=lambda f: f.matchweek)
+    by_matchweek = _cumulative_tables(by_round, club_ids, lambda f: f.matchweek)
+
+    with transaction.atomic():
+        for axis, (keys, tables) in (('date', by_date), ('matchweek', by_matchweek)):
+            if not keys:
+                StandingsSnapshot.objects.filter(season=season, axis=axis).delete()
+                continue
+            StandingsSnapshot.objects.update_or_create(season=season, axis=axis, defaults={
+                'keys': _to_bytes(keys),
+                'club_ids': _to_bytes(array('d', club_ids)),
+                'tables': _to_bytes(tables),
+            })
+    return len(by_date[0])
+
+
+def table_at(season, axis, key):
+    """
+    Returns the season's table at `key` (a date ordinal or matchweek number)
+    as a list of {'club_id', 'key', *SNAPSHOT_FIELDS} dicts in position
+    order. Uses the latest snapshot at or before `key`. Returns None if the
+    season has no snapshot or nothing had been played by then.
+    """
+    snapshot = StandingsSnapshot.objects.filter(season=season, axis=axis).first()
+    if snapshot is None:
+        return None
+
+    keys = _from_bytes('i', snapshot.keys)
+    index = bisect_right(keys, key) - 1
+    if index < 0:
+        return None
+
+    club_ids = _from_bytes('d', snapshot.club_ids)
+    width = len(SNAPSHOT_FIELDS)
+    # Only decode the one table we need
+    row_bytes = len(club_ids) * width * array('i').itemsize
+    tables = _from_bytes('i', memoryview(snapshot.tables)[index * row_bytes:(index + 1) * row_bytes])
+
+    rows = [
+        dict(zip(SNAPSHOT_FIELDS, tables[i * width:(i + 1) * width]), club_id=club_id, key=keys[index])
+        for i, club_id in enumerate(club_ids)
+    ]
+    rows.sort(key=lambda row: row['position'])
+    return rows
@@ -0,0 +1,299 @@
+"""
+League table arithmetic shared by the calculate_tables engines.
+"""
+from collections import defaultdict, deque
+
+from django.db import connection
+
+from .models import Fixture
+
+# Only needed by the 'numpy' engine
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The aggregate columns of a LeagueTable row
+TABLE_FIELDS = ('played', 'won', 'drawn', 'lost', 'goals_for', 'goals_against', 'points', 'goal_difference')
+
+# How many recent results the 'form' string shows (oldest first)
+FORM_LENGTH = 5
+
+# The split tables (see split_tables) and how many games 'lastN' covers
+SPLIT_VIEWS = ('home', 'away', 'last6')
+LAST_N_GAMES = 6
+
+
+def new_table():
+    """Returns an empty table: club_id -> {field: value}, created on first use."""
+    return defaultdict(lambda: dict.fromkeys(TABLE_FIELDS, 0))
+
+
+def add_result(stats, goals_for, goals_against, sign=1):
+    """Adds one club's side of a result to its stats row (or removes it with sign=-1)."""
+    stats['played'] += sign
+    stats['goals_for'] += sign * goals_for
+    stats['goals_against'] += sign * goals_against
+    stats['goal_difference'] += sign * (goals_for - goals_against)
+
+    if goals_for > goals_against:
+        stats['won'] += sign
+        stats['points'] += sign * 3
+    elif goals_for < goals_against:
+        stats['lost'] += sign
+    else:
+        stats['drawn'] += sign
+        stats['points'] += sign
+
+
+def apply_result(table, home_id, away_id, home_goals, away_goals, sign=1):
+    """
+    Adds one result to `table`, or removes it again with sign=-1
+    (used when a fixture that was already counted changes).
+    """
+    add_result(table[home_id], home_goals, away_goals, sign)
+    add_result(table[away_id], away_goals, home_goals, sign)
+
+
+def ranking_key(stats):
+    """Sort key for positions: points, then GD, then GF (use with reverse=True)."""
+    return (stats['points'], stats['goal_difference'], stats['goals_for'])
+
+
+def rank_table(table):
+    """Returns [(position, club_id, stats), ...] for a table, ties broken by club id like the SQL engine."""
+    ranked = sorted(table.items(), key=lambda item: tuple(-v for v in ranking_key(item[1])) + (item[0],))
+    return [(position, club_id, stats) for position, (club_id, stats) in enumerate(ranked, start=1)]
+
+
+def form_string(results):
+    """'WDL...' for the last FORM_LENGTH (goals_for, goals_against) pairs, oldest first."""
+    return ''.join(
+        'W' if goals_for > goals_against else 'L' if goals_for < goals_against else 'D'
+        for goals_for, goals_against in list(results)[-FORM_LENGTH:]
+    )
+
+
+def season_forms(fixtures):
+    """Each club's form from a season's completed fixtures (in kickoff order): {club_id: 'WDLWW'}."""
+    recent = defaultdict(lambda: deque(maxlen=FORM_LENGTH))
+    for fixture in fixtures:
+        home_goals, away_goals = fixture.home_score or 0, fixture.away_score or 0
+        recent[fixture.home_club_id].append((home_goals, away_goals))
+        recent[fixture.away_club_id].append((away_goals, home_goals))
+    return {club_id: form_string(results) for club_id, results in recent.items()}
+
+
+def split_tables(fixtures):
+    """
+    Builds every split table in one pass over a season's completed
+    fixtures (in kickoff order): home games only, away games only, and
+    each club's last LAST_N_GAMES games.
+
+    Returns {view: [(position, club_id, stats, form), ...]}.
+    """
+    home, away = new_table(), new_table()
+    recent = {view: defaultdict(lambda: deque(maxlen=LAST_N_GAMES)) for view in SPLIT_VIEWS}
+
+    for fixture in fixtures:
+        home_goals, away_goals = fixture.home_score or 0, fixture.away_score or 0
+        add_result(home[fixture.home_club_id], home_goals, away_goals)
+        add_result(away[fixture.away_club_id], away_goals, home_goals)
+        recent['home'][fixture.home_club_id].append((home_goals, away_goals))
+        recent['away'][fixture.away_club_id].append((away_goals, home_goals))
+        recent['last6'][fixture.home_club_id].append((home_goals, away_goals))
+        recent['last6'][fixture.away_club_id].append((away_goals, home_goals))
+
+    # The last-N table only needs the games still in each club's window
+    last_n = new_table()
+    for club_id, results in recent['last6'].items():
+        for goals_for, goals_against in results:
+            add_result(last_n[club_id], goals_for, goals_against)
+
+    return {
+        view: [
+            (position, club_id, stats, form_string(recent[view][club_id]))
+            for position, club_id, stats in rank_table(table)
+        ]
+        for view, table in (('home', home), ('away', away), ('last6', last_n))
+    }
+
+
+# Every completed fixture becomes two rows (one per club, from that club's
+# point of view), which are then summed per club with conditional
+# aggregation and ranked with a window function - all in the database.
+SEASON_TABLE_SQL = """
+    WITH results AS (
+        SELECT home_club_id AS club_id, COALESCE(home_score, 0) AS gf, COALESCE(away_score, 0) AS ga
+        FROM {fixture}
+        WHERE season = %(season)s AND status = %(status)s
+        UNION ALL
+        SELECT away_club_id, COALESCE(away_score, 0), COALESCE(home_score, 0)
+        FROM {fixture}
+        WHERE season = %(season)s AND status = %(status)s
+    ),
+    totals AS (
+        SELECT
+            club_id,
+            COUNT(*) AS played,
+            SUM(CASE WHEN gf > ga THEN 1 ELSE 0 END) AS won,
+            SUM(CASE WHEN gf = ga THEN 1 ELSE 0 END) AS drawn,
+            SUM(CASE WHEN gf < ga THEN 1 ELSE 0 END) AS lost,
+            SUM(gf) AS goals_for,
+            SUM(ga) AS goals_against,
+            SUM(CASE WHEN gf > ga THEN 3 WHEN gf = ga THEN 1 ELSE 0 END) AS points
+        FROM results
+        GROUP BY club_id
+    )
+    SELECT
+        club_id,
+        ROW_NUMBER() OVER (
+            ORDER BY points DESC, goals_for - goals_against DESC, goals_for DESC, club_id
+        ) AS position,
+        played, won, drawn, lost, goals_for, goals_against, points,
+        goals_for - goals_against AS goal_difference
+    FROM totals
+    ORDER BY position
+"""
+
+
+def season_table_from_db(season):
+    """
+    Computes a season's whole table in one SQL statement.
+    Returns one dict per club (club_id, position and TABLE_FIELDS), in position order.
+    """
+    sql = SEASON_TABLE_SQL.format(fixture=connection.ops.quote_name(Fixture._meta.db_table))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {'season': season, 'status': 'COMPLETED'})
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def numpy_available():
+    return np is not None
+
+
+class FixtureArrays:
+    """
+    Completed fixtures as parallel integer arrays, in kickoff order.
+    Seasons and clubs are stored as indexes into `seasons` / `club_ids`.
+    """
+
+    def __init__(self, seasons, club_ids, season, home, away, home_goals, away_goals):
+        self.seasons = seasons
+        self.club_ids = club_ids
+        self.season = season
+        self.home = home
+        self.away = away
+        self.home_goals = home_goals
+        self.away_goals = away_goals
+
+    def __len__(self):
+        return len(self.season)
+
+
+def load_fixture_arrays(seasons=None):
+    """Loads every completed fixture (optionally only `seasons`) with one query."""
+    queryset = Fixture.objects.filter(status='COMPLETED').exclude(season=None)
+    if seasons:
+        queryset = queryset.filter(season__in=seasons)
+    rows = list(queryset.order_by('kickoff_time', 'fixture_id').values_list(
+        'season', 'home_club_id', 'away_club_id', 'home_score', 'away_score'
+    ))
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return FixtureArrays([], np.zeros(0), empty, empty, empty, empty, empty)
+
+    season_labels, home_ids, away_ids, home_goals, away_goals = zip(*rows)
+    seasons, season = np.unique(np.array(season_labels), return_inverse=True)
+    club_ids, clubs = np.unique(np.concatenate([home_ids, away_ids]), return_inverse=True)
+    return FixtureArrays(
+        seasons=[str(label) for label in seasons],
+        club_ids=club_ids,
+        season=season.astype(np.int64),
+        home=clubs[:len(rows)].astype(np.int64),
+        away=clubs[len(rows):].astype(np.int64),
+        home_goals=np.array([goals or 0 for goals in home_goals], dtype=np.int64),
+        away_goals=np.array([goals or 0 for goals in away_goals], dtype=np.int64),
+    )
+
+
+def season_tables_numpy(fixtures):
+    """
+    Computes every season's table from a FixtureArrays in one vectorised pass.
+    Returns {season: [row, ...]} with rows shaped like season_table_from_db()'s,
+    plus each club's form over its last FORM_LENGTH results.
+    """
+    clubs = len(fixtures.club_ids)
+    size = len(fixtures.seasons) * clubs
+    if not size:
+        return {}
+
+    # Unroll each fixture into one row per club: (season, club) key,
+    # goals for/against and the result (1 win, 0 draw, -1 loss).
+    key = np.concatenate([
+        fixtures.season * clubs + fixtures.home,
+        fixtures.season * clubs + fixtures.away,
+    ])
+    goals_for = np.concatenate([fixtures.home_goals, fixtures.away_goals])
+    goals_against = np.concatenate([fixtures.away_goals, fixtures.home_goals])
+    result = np.sign(goals_for - goals_against)
+
+    def total(weights=None):
+        return np.bincount(key, weights=weights, minlength=size).astype(np.int64)
+
+    table = {
+        'played': total(),
+        'won': total(result == 1),
+        'drawn': total(result == 0),
+        'lost': total(result == -1),
+        'goals_for': total(goals_for),
+        'goals_against': total(goals_against),
+    }
+    table['points'] = 3 * table['won'] + table['drawn']
+    table['goal_difference'] = table['goals_for'] - table['goals_against']
+
+    # Rank within each season: points, GD, GF (all descending), then club id
+    entries = np.flatnonzero(table['played'])
+    order = np.lexsort((
+        fixtures.club_ids[entries % clubs],
+        -table['goals_for'][entries],
+        -table['goal_difference'][entries],
+        -table['points'][entries],
+        entries // clubs,
+    ))
+    ranked = entries[order]
+    ranked_season = ranked // clubs
+    position = np.arange(len(ranked)) - np.searchsorted(ranked_season, ranked_season) + 1
+
+    form = _form_strings(key, result, size)
+
+    tables = {}
+    for i, entry in enumerate(ranked.tolist()):
+        row = {'club_id': float(fixtures.club_ids[entry % clubs]), 'position': int(position[i])}
+        row.update({field: int(table[field][entry]) for field in TABLE_FIELDS})
+        row['form'] = form[entry]
+        tables.setdefault(fixtures.seasons[entry // clubs], []).append(row)
+    return tables
+
+
+def _form_strings(key, result, size):
+    """
+    Builds each (season, club) key's last FORM_LENGTH results as e.g. 'WDLWW',
+    oldest first. Rows of `key` / `result` are in kickoff order per half.
+    """
+    # Sort each key's results chronologically (home and away rows were
+    # concatenated, so the fixture index is the time order).
+    played_at = np.tile(np.arange(len(key) // 2), 2)
+    order = np.lexsort((played_at, key))
+    sorted_key = key[order]
+    group_start = np.searchsorted(sorted_key, sorted_key, side='left')
+    group_end = np.searchsorted(sorted_key, sorted_key, side='right')
+    from_end = group_end - 1 - np.arange(len(sorted_key))  # 0 = most recent
+    recent = from_end < FORM_LENGTH
+    column = np.minimum(group_end - group_start, FORM_LENGTH) - 1 - from_end
+
+    chars = np.zeros((size, FORM_LENGTH), dtype='S1')
+    codes = np.array([b'L', b'D', b'W'])
+    chars[sorted_key[recent], column[recent]] = codes[result[order][recent] + 1]
+    return [form.decode() for form in chars.view(f'S{FORM_LENGTH}').ravel()]
@@ -1,3 +1,1167 @@
-from django.test import TestCase
+import csv
+import datetime
+import hashlib
+import heapq
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import redirect_stderr, redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qsl, urlsplit
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from urllib3.util.retry import Retry
+
+from . import api_cache, api_client, exports
+from .api_client import ApiClient, TokenBucket, UnchangedResponse
+from .exports import export_columns
+from .json_decoding import DECODE_ERRORS, stream_page, streaming_available
+from .management.commands import calculate_tables, run_scraper
+from .management.commands.run_scraper import CURRENT_SEASON_LABEL, SEASON_ID_MAP
+from .metrics import ScrapeMetrics
+from .models import (
+    Club, DataVersion, Fixture, LeagueTable, LeagueTableSync, Player, PlayerStat, ResponseBlob, ScrapeCheckpoint
+)
+from .renderers import ORJSONRenderer
+from .response_blobs import store_blob
+from .response_cache import ResponseCache, cache_key
+from .scheduler import Scheduler
+from .standings import numpy_available
+from .views import league_table_payload
+
+SEASON = '2024-2025'
+KICKOFF = datetime.datetime(2024, 8, 17, 15, tzinfo=datetime.timezone.utc)
+
+
+def create_clubs(count):
+    return [
+        Club.objects.create(club_id=i, club_name=f'Club {i}', short_name=f'Club {i}', abbr=f'C{i}')
+        for i in range(1, count + 1)
+    ]
+
+
+def create_fixture(fixture_id, home, away, score=None, day=0, matchweek=None):
+    """A fixture `day` days into the season: completed if `score` is given."""
+    return Fixture.objects.create(
+        fixture_id=fixture_id, season=SEASON, home_club_id=home, away_club_id=away,
+        kickoff_time=KICKOFF + datetime.timedelta(days=day),
+        status='COMPLETED' if score else 'SCHEDULED',
+        home_score=score[0] if score else None, away_score=score[1] if score else None,
+        matchweek=matchweek,
+    )
+
+
+def api_fixture(fixture_id, home, away, score=None, season_id=1064, gameweek=1, day=0):
+    """A fixture as the API returns it: completed if `score` is given."""
+    return {
+        'id': float(fixture_id),
+        'kickoff': {'millis': (KICKOFF + datetime.timedelta(days=day)).timestamp() * 1000},
+        'teams': [
+            {'team': {'id': float(home)}, 'score': score[0] if score else None},
+            {'team': {'id': float(away)}, 'score': score[1] if score else None},
+        ],
+        'ground': {'name': f'Ground {home}'},
+        'status': 'C' if score else 'U',
+        'gameweek': {'gameweek': gameweek, 'compSeason': {'id': float(season_id)}},
+    }
+
+
+class FakeFootballApi:
+    """
+    A local stand-in for the football API, served from a background thread.
+    Tests edit its attributes to change what it returns. It sends ETags and
+    answers If-None-Match with a 304, like the real API.
+    """
+
+    def __init__(self):
+        self.clubs = [{'id': float(i), 'name': f'Club {i}', 'shortName': f'C{i}', 'abbr': f'C{i}'} for i in range(1, 5)]
+        self.results = {} # compSeasons id -> completed fixtures
+        self.fixtures = [] # Upcoming and live fixtures
+        self.players = [self.player(player_id) for player_id in range(1, 151)]
+        self.stats = {'goals': 3, 'goal_assist': 1}
+        self.table_points = 0 # Points the API's standings give every club
+        self.requests = Counter() # path -> requests received
+        self.failures = Counter() # path -> 503s still to send
+
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                api.handle(self)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/football'
+
+    @staticmethod
+    def player(player_id, club_id=1):
+        return {
+            'id': float(player_id), 'name': {'first': 'Player', 'last': str(player_id)},
+            'nationality': {'country': 'England'}, 'info': {'position': 'M'},
+            'currentTeam': {'id': float(club_id)},
+        }
+
+    @staticmethod
+    def page(items, params):
+        page, size = int(params.get('page', 0)), int(params.get('pageSize', 100))
+        return {'content': items[page * size:(page + 1) * size], 'pageInfo': {'page': page, 'numPages': max(1, -(-len(items) // size))}}
+
+    def respond(self, path, params):
+        """The body for a request, or None for a 404."""
+        if path == 'clubs':
+            return self.page(self.clubs, params)
+        if path.startswith('standings'):
+            entries = [{'team': club, 'position': i, 'points': self.table_points} for i, club in enumerate(self.clubs, start=1)]
+            return {'tables': [{'entries': entries}]}
+        if path == 'fixtures':
+            if 'compSeasons' in params:
+                return self.page(self.results.get(int(float(params['compSeasons'])), []), params)
+            return self.page(self.fixtures, params)
+        if path.startswith('fixtures/'):
+            return next((fix for fix in self.fixtures if fix['id'] == float(path.split('/')[1])), None)
+        if path == 'players':
+            return self.page(self.players, params)
+        if path.startswith('stats/player/'):
+            return {'stats': [{'name': name, 'value': value} for name, value in self.stats.items()]}
+        return None
+
+    def handle(self, request):
+        url = urlsplit(request.path)
+        path = url.path.removeprefix('/football/')
+        self.requests[path] += 1
+        if self.failures[path]:
+            self.failures[path] -= 1
+            return self.send(request, 503)
+
+        data = self.respond(path, dict(parse_qsl(url.query)))
+        if data is None:
+            return self.send(request, 404)
+        body = json.dumps(data).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if request.headers.get('If-None-Match') == etag:
+            return self.send(request, 304, etag=etag)
+        self.send(request, 200, body, etag)
+
+    def send(self, request, status, body=b'', etag=None):
+        request.send_response(status)
+        if etag:
+            request.send_header('ETag', etag)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def serve_fake_api(test):
+    """Starts a FakeFootballApi that every ApiClient talks to until `test` ends."""
+    api = FakeFootballApi()
+    test.addCleanup(api.close)
+    patcher = mock.patch.object(api_client, 'API_BASE_URL', api.url)
+    patcher.start()
+    test.addCleanup(patcher.stop)
+    return api
+
+
+def temp_dir(test):
+    """A temporary directory, removed when `test` ends."""
+    directory = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directory, True)
+    return directory
+
+
+class RendererTests(SimpleTestCase):
+
+    def test_orjson_output_matches_drf(self):
+        data = {'name': 'Line\u2028Para\u2029 \u2014 Café', 'values': [1, 2.5, None, True], 'nested': {'a': []}}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class TokenBucketTests(SimpleTestCase):
+
+    def test_rate_limits_after_burst(self):
+        bucket = TokenBucket(rate=50, capacity=2)
+        start = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        # Two tokens in the bucket, then one every 20ms
+        self.assertGreaterEqual(time.monotonic() - start, 0.035)
+
+    def test_zero_rate_never_waits(self):
+        bucket = TokenBucket(rate=0)
+        with mock.patch('time.sleep') as sleep:
+            for _ in range(100):
+                bucket.acquire()
+        sleep.assert_not_called()
+
+
+class ApiClientTests(SimpleTestCase):
+
+    def setUp(self):
+        self.api = serve_fake_api(self)
+        self.errors = []
+        self.client = ApiClient(concurrency=4, rate=0, log_error=self.errors.append)
+        self.addCleanup(self.client.close)
+
+    def test_pool_is_sized_to_concurrency(self):
+        adapter = self.client.session.get_adapter(self.api.url)
+        self.assertEqual(adapter.poolmanager.connection_pool_kw['maxsize'], 4)
+
+    def test_fetch_many_keeps_call_order(self):
+        self.api.fixtures = [api_fixture(fixture_id, 1, 2) for fixture_id in range(1, 11)]
+        results = self.client.fetch_many([(f'fixtures/{fixture_id}', {}) for fixture_id in range(10, 0, -1)])
+        self.assertEqual([fix['id'] for fix in results], list(range(10, 0, -1)))
+
+    def test_retries_server_errors(self):
+        self.api.failures['clubs'] = 1
+        self.assertEqual(len(self.client.fetch('clubs')['content']), 4)
+        self.assertEqual(self.api.requests['clubs'], 2)
+        self.assertEqual(self.errors, [])
+
+    def test_gives_up_after_three_retries(self):
+        self.api.failures['clubs'] = 10
+        with mock.patch.object(Retry, 'sleep'):
+            self.assertIsNone(self.client.fetch('clubs'))
+        self.assertEqual(self.api.requests['clubs'], 4)
+        self.assertEqual(len(self.errors), 1)
+
+    def test_missing_endpoint_is_none(self):
+        self.assertIsNone(self.client.fetch('fixtures/404'))
+        self.assertEqual(self.api.requests['fixtures/404'], 1) # 404 isn't retried
+
+
+class PaginationTests(SimpleTestCase):
+
+    def setUp(self):
+        self.api = serve_fake_api(self)
+        self.api.players = [self.api.player(player_id) for player_id in range(1, 251)]
+        self.client = ApiClient(concurrency=4, rate=0)
+        self.addCleanup(self.client.close)
+
+    def test_iter_pages_yields_every_page_in_order(self):
+        pages = list(self.client.iter_pages('players', {'pageSize': 100}, prefetch=2))
+        self.assertEqual([page_number for page_number, _ in pages], [0, 1, 2])
+        self.assertEqual(
+            [player['id'] for _, page in pages for player in page['content']],
+            list(range(1, 251))
+        )
+
+    def test_iter_pages_skips_done_pages(self):
+        pages = list(self.client.iter_pages('players', {'pageSize': 100}, skip_pages={0, 1}))
+        self.assertEqual([page_number for page_number, _ in pages], [2])
+        self.assertEqual(self.api.requests['players'], 2) # Page 0 is still read for numPages
+
+    def test_fetch_iter_bounds_calls_in_flight(self):
+        pulled = []
+
+        def calls():
+            for fixture_id in range(1, 21):
+                pulled.append(fixture_id)
+                yield f'fixtures/{fixture_id}', {}
+
+        results = self.client.fetch_iter(calls(), window=3)
+        next(results)
+        self.assertEqual(len(pulled), 3)
+        self.assertEqual(len(list(results)), 19)
+
+
+class ScrapeMetricsTests(SimpleTestCase):
+
+    def setUp(self):
+        self.metrics = ScrapeMetrics()
+        self.metrics.record_request('stats/player/123', 'ok', 0.07, response_bytes=100)
+        self.metrics.record_request('stats/player/45.0', 'ok', 3.0, response_bytes=50)
+        self.metrics.record_request('stats/player/6', 'cached')
+        with self.metrics.db_write('player_stats', 3):
+            pass
+
+    def test_json_report(self):
+        report = json.loads(self.metrics.to_json())
+        stats = report['endpoints']['stats/player/{id}'] # IDs share one label
+        self.assertEqual(stats['requests'], {'ok': 2, 'cached': 1})
+        self.assertEqual(stats['response_bytes'], 150)
+        self.assertEqual(stats['latency_seconds']['count'], 2) # No latency for cached requests
+        self.assertEqual(stats['latency_seconds']['buckets']['0.1'], 1)
+        self.assertEqual(stats['latency_seconds']['buckets']['5.0'], 1)
+        self.assertEqual(report['stages']['player_stats']['rows_upserted'], 3)
+
+    def test_prometheus_report(self):
+        lines = self.metrics.to_prometheus().splitlines()
+        self.assertIn('# TYPE scraper_http_requests_total counter', lines)
+        self.assertIn('scraper_http_requests_total{endpoint="stats/player/{id}",outcome="ok"} 2', lines)
+        # Histogram buckets are cumulative
+        self.assertIn('scraper_http_request_duration_seconds_bucket{endpoint="stats/player/{id}",le="0.05"} 0', lines)
+        self.assertIn('scraper_http_request_duration_seconds_bucket{endpoint="stats/player/{id}",le="0.1"} 1', lines)
+        self.assertIn('scraper_http_request_duration_seconds_bucket{endpoint="stats/player/{id}",le="+Inf"} 2', lines)
+        self.assertIn('scraper_http_request_duration_seconds_count{endpoint="stats/player/{id}"} 2', lines)
+        self.assertIn('scraper_rows_upserted_total{stage="player_stats"} 3', lines)
+
+
+class StreamPageTests(SimpleTestCase):
+
+    def setUp(self):
+        if not streaming_available():
+            self.skipTest('ijson is not installed')
+
+    def test_array_is_iterated_lazily(self):
+        page = stream_page(b'{"pageInfo": {"numPages": 2}, "content": [{"id": 1.0}, {"id": 2.5}], "extra": [1]}')
+        self.assertEqual(dict.__getitem__(page, 'pageInfo'), {'numPages': 2})
+        self.assertNotIsInstance(dict.__getitem__(page, 'content'), list)
+        self.assertEqual(list(page['content']), [{'id': 1.0}, {'id': 2.5}])
+        self.assertEqual(page['extra'], [1])
+
+    def test_keys_after_the_array_are_decoded_on_lookup(self):
+        decode_times = []
+        page = stream_page(b'{"content": [{"id": 1}], "pageInfo": {"numPages": 3}}', on_item_decoded=decode_times.append)
+        self.assertEqual(page.get('pageInfo', {}).get('numPages'), 3)
+        self.assertIn('pageInfo', page)
+        self.assertEqual(list(page['content']), [{'id': 1}])
+        self.assertEqual(len(decode_times), 1)
+
+    def test_page_without_the_array(self):
+        page = stream_page(b'{"stats": [{"name": "goals", "value": 2}]}')
+        self.assertEqual(page, {'stats': [{'name': 'goals', 'value': 2}]})
+
+    def test_malformed_item_raises_while_iterating(self):
+        page = stream_page(b'{"content": [{"id": 1}, {"id": ]}')
+        with self.assertRaises(DECODE_ERRORS):
+            list(page['content'])
+
+
+class SchedulerTests(SimpleTestCase):
+
+    def test_jobs_run_on_their_own_cadences(self):
+        runs, errors, before = [], [], []
+        scheduler = Scheduler(log_error=errors.append, before_job=lambda: before.append(1))
+
+        def fail():
+            raise RuntimeError('boom')
+
+        def stop_after_three():
+            if runs.count('often') >= 3:
+                scheduler.stop()
+
+        once = scheduler.add_job('once', lambda: runs.append('once'), None)
+        often = scheduler.add_job('often', lambda: runs.append('often'), 0.01)
+        failing = scheduler.add_job('failing', fail, 0.01)
+        scheduler.add_job('stopper', stop_after_three, 0.01)
+        scheduler.run_forever()
+
+        self.assertEqual(runs[:2], ['once', 'often']) # Due together: in the order added
+        self.assertEqual((once.runs, often.runs), (1, 3))
+        # A failing job is logged and keeps its schedule
+        self.assertGreaterEqual(failing.failures, 3)
+        self.assertEqual(failing.runs, 0)
+        self.assertIn("Job 'failing' failed: boom", errors)
+        self.assertEqual(len(before), once.runs + often.runs + failing.failures + 3)
+
+    def test_stop_wakes_a_waiting_scheduler(self):
+        scheduler = Scheduler()
+        scheduler.add_job('hourly', lambda: None, 3600, delay=3600)
+        thread = threading.Thread(target=scheduler.run_forever)
+        thread.start()
+        scheduler.stop()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+
+
+class ResponseCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache(temp_dir(self))
+
+    def test_body_without_its_meta_is_not_cached(self):
+        self.cache.put('clubs', {'page': 0}, b'{"content": []}', etag='"old"')
+        # A crash after the new body's write, before its meta's
+        body_path, _ = self.cache._paths(cache_key('clubs', {'page': 0}))
+        body_path.write_bytes(b'{"content": [1]}')
+
+        self.assertIsNone(self.cache.get('clubs', {'page': 0}))
+        entry = self.cache.put('clubs', {'page': 0}, b'{"content": [1]}', etag='"new"')
+        self.assertEqual(self.cache.get('clubs', {'page': 0}).etag, entry.etag)
+
+
+class ConditionalFetchTests(SimpleTestCase):
+
+    def setUp(self):
+        self.api = serve_fake_api(self)
+        self.cache = ResponseCache(temp_dir(self))
+
+    def client_for(self, **kwargs):
+        client = ApiClient(rate=0, cache=self.cache, **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def test_committed_response_revalidates_with_304(self):
+        client = self.client_for()
+        first = client.fetch('clubs')
+        self.assertNotIsInstance(first, UnchangedResponse)
+        client.commit_cache([('clubs', None)])
+        self.assertIsNotNone(self.cache.get('clubs', None).etag)
+
+        second = client.fetch('clubs')
+        self.assertIsInstance(second, UnchangedResponse)
+        self.assertEqual(second, first)
+        self.assertEqual(self.api.requests['clubs'], 2)
+
+        self.api.clubs.pop()
+        self.assertNotIsInstance(client.fetch('clubs'), UnchangedResponse)
+
+    def test_uncommitted_response_is_fetched_again(self):
+        client = self.client_for()
+        client.fetch('clubs')
+        self.assertIsNone(self.cache.get('clubs', None))
+        self.assertNotIsInstance(client.fetch('clubs'), UnchangedResponse)
+
+    def test_immutable_entry_is_never_requested_again(self):
+        client = self.client_for(is_immutable=lambda endpoint, params: params.get('compSeasons') == 12)
+        params = {'compSeasons': 12}
+        client.fetch('fixtures', params)
+        client.commit_cache([('fixtures', params)])
+        self.assertTrue(self.cache.is_immutable('fixtures', params))
+
+        self.assertIsInstance(client.fetch('fixtures', params), UnchangedResponse)
+        self.assertEqual(self.api.requests['fixtures'], 1)
+
+    def test_unchanged_reported_as_new_without_report_unchanged(self):
+        client = self.client_for(report_unchanged=False)
+        client.fetch('clubs')
+        client.commit_cache([('clubs', None)])
+        self.assertNotIsInstance(client.fetch('clubs'), UnchangedResponse)
+        self.assertEqual(self.api.requests['clubs'], 2)
+
+
+class ApiCacheTestCase(TestCase):
+    """Clears the per-process response cache, whose keys repeat across tests (versions restart at 0)."""
+
+    def setUp(self):
+        api_cache.local_cache.clear()
+
+
+class ConditionalTableTests(ApiCacheTestCase):
+    url = '/api/premier-league/table/'
+
+    def setUp(self):
+        super().setUp()
+        club = Club.objects.create(club_id=1, club_name='Arsenal', short_name='Arsenal', abbr='ARS')
+        LeagueTable.objects.create(club=club, season=SEASON, position=1, played=1, won=1, points=3)
+        api_cache.bump_data_version(f'tables:{SEASON}')
+        # Make the first version an hour old, so a bump is always a later second
+        DataVersion.objects.update(updated_at=timezone.now() - datetime.timedelta(hours=1))
+
+    def get(self, url=None, **headers):
+        return self.client.get(url or self.url, {'season': SEASON}, headers={'accept': 'application/json', **headers})
+
+    def test_etag_revalidates_with_304(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get(if_none_match=response['ETag']).status_code, 304)
+
+    def test_bump_changes_etag(self):
+        etag = self.get()['ETag']
+        LeagueTable.objects.update(points=4)
+        api_cache.bump_data_version(f'tables:{SEASON}')
+
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['points'], 4)
+
+    def test_bump_moves_last_modified(self):
+        response = self.get()
+        last_modified = response['Last-Modified']
+        self.assertEqual(self.get(if_modified_since=last_modified).status_code, 304)
+
+        LeagueTable.objects.update(points=4)
+        api_cache.bump_data_version(f'tables:{SEASON}')
+
+        response = self.get(if_modified_since=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['points'], 4)
+        self.assertGreater(
+            datetime.datetime.strptime(response['Last-Modified'], '%a, %d %b %Y %H:%M:%S GMT'),
+            datetime.datetime.strptime(last_modified, '%a, %d %b %Y %H:%M:%S GMT'),
+        )
+
+    def test_compressed_blob_has_its_own_etag(self):
+        store_blob(league_table_payload(SEASON))
+        for url in (self.url, '/api/premier-league/async/table/'):
+            with self.subTest(url=url):
+                identity = self.get(url)
+                compressed = self.get(url, accept_encoding='gzip')
+                self.assertEqual(compressed['Content-Encoding'], 'gzip')
+                self.assertNotEqual(compressed['ETag'], identity['ETag'])
+
+                # Either variant revalidates, whichever encoding is asked for now
+                self.assertEqual(self.get(url, accept_encoding='gzip', if_none_match=compressed['ETag']).status_code, 304)
+                self.assertEqual(self.get(url, if_none_match=compressed['ETag']).status_code, 304)
+                self.assertEqual(self.get(url, if_none_match=f'W/{identity["ETag"]}').status_code, 304)
+
+    def test_browsable_api_has_its_own_etag(self):
+        store_blob(league_table_payload(SEASON))
+        json_response = self.get()
+        html_response = self.get(accept='text/html')
+        self.assertEqual(html_response['Content-Type'], 'text/html; charset=utf-8')
+        self.assertNotEqual(html_response['ETag'], json_response['ETag'])
+        for response in (json_response, html_response):
+            self.assertIn('Accept', [header.strip() for header in response['Vary'].split(',')])
+
+        self.assertEqual(self.get(accept='text/html', if_none_match=json_response['ETag']).status_code, 200)
+        self.assertEqual(self.get(if_none_match=html_response['ETag']).status_code, 200)
+        self.assertEqual(self.get(accept='text/html', if_none_match=html_response['ETag']).status_code, 304)
+
+    def test_blob_encoding_follows_accept_encoding(self):
+        store_blob(league_table_payload(SEASON))
+        ResponseBlob.objects.update(brotli=None) # Rendered without the brotli package
+        for accept_encoding, expected in [
+            ('br', None), # Not gzip, which this client never asked for
+            ('br, gzip', 'gzip'),
+            ('*;q=1, gzip;q=0', None),
+            ('gzip;q=0.5, *', 'gzip'),
+            ('identity', None),
+        ]:
+            for url in (self.url, '/api/premier-league/async/table/'):
+                with self.subTest(url=url, accept_encoding=accept_encoding):
+                    response = self.get(url, accept_encoding=accept_encoding)
+                    self.assertEqual(response.get('Content-Encoding'), expected)
+                    if expected is None:
+                        self.assertEqual(response.json()[0]['points'], 3)
+
+
+class PlayerStatsTests(ApiCacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        arsenal = Club.objects.create(club_id=1, club_name='Arsenal', short_name='Arsenal', abbr='ARS')
+        Club.objects.create(club_id=2, club_name='Chelsea', short_name='Chelsea', abbr='CHE')
+        player = Player.objects.create(player_id=10, club=arsenal, first_name='Bukayo', last_name='Saka')
+        PlayerStat.objects.create(player=player, season=SEASON, goals=12)
+
+    def get(self, url, **params):
+        return self.client.get(url, {'season': SEASON, **params}, headers={'accept': 'application/json'})
+
+    def test_team_without_scorers_is_empty(self):
+        for team in ('Chelsea', 'Nobody FC'):
+            with self.subTest(team=team):
+                response = self.get('/api/premier-league/player-stats/', team=team)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), [])
+
+                response = self.get('/api/premier-league/leaderboard/', team=team)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['results'], [])
+
+    def test_season_without_stats_is_404(self):
+        for url in ('/api/premier-league/player-stats/', '/api/premier-league/leaderboard/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.get(url, season='2017-2018', team='Arsenal').status_code, 404)
+                self.assertEqual(self.get(url, season='2017-2018').status_code, 404)
+
+    def test_team_filter(self):
+        response = self.get('/api/premier-league/player-stats/', team='arsenal')
+        self.assertEqual(response.json(), [
+            {'name': 'Bukayo Saka', 'club': 'Arsenal', 'nationality': None, 'stat': 12}
+        ])
+
+
+class CalculateTablesTests(TestCase):
+
+    def setUp(self):
+        create_clubs(4)
+        create_fixture(1, 1, 2, (1, 1))
+        self.changed = create_fixture(2, 3, 4, (0, 1))
+        self.scheduled = create_fixture(3, 1, 3, day=7)
+
+    def calculate(self, *args):
+        call_command('calculate_tables', '--season', SEASON, *args, stdout=io.StringIO(), stderr=io.StringIO())
+        return list(LeagueTable.objects.filter(season=SEASON).order_by('position').values_list(
+            'club_id', 'position', 'played', 'won', 'drawn', 'lost', 'goals_for', 'goals_against', 'points',
+            'goal_difference', 'form'
+        ))
+
+    def change_fixtures(self):
+        # Club 4's win becomes a draw and the scheduled game is played, which
+        # leaves clubs 1 and 3, and clubs 2 and 4, level on every count
+        self.changed.home_score = 1
+        self.changed.save()
+        self.scheduled.status, self.scheduled.home_score, self.scheduled.away_score = 'COMPLETED', 2, 2
+        self.scheduled.save()
+
+    def test_incremental_matches_full_calculation(self):
+        self.calculate()
+        self.change_fixtures()
+        incremental = self.calculate('--incremental')
+        full = self.calculate()
+
+        self.assertEqual(incremental, full)
+        self.assertEqual([row[0] for row in full], [1, 3, 2, 4]) # Ties broken by club id
+        self.assertEqual([row[-1] for row in full], ['DD', 'DD', 'D', 'D'])
+
+    def test_incremental_sees_late_commit_with_earlier_timestamp(self):
+        self.calculate()
+        synced_through = LeagueTableSync.objects.get(season=SEASON).synced_through
+        # Stamped before the mark was taken, but only committed after it
+        self.change_fixtures()
+        Fixture.objects.filter(pk__in=[self.changed.pk, self.scheduled.pk]).update(
+            updated_at=synced_through - datetime.timedelta(seconds=1)
+        )
+        incremental = self.calculate('--incremental')
+        self.assertEqual(incremental, self.calculate())
+
+    def test_incremental_rereads_without_changes(self):
+        self.calculate()
+        versions = dict(DataVersion.objects.values_list('scope', 'version'))
+        # Fixtures inside the overlap window are read again, but already counted
+        self.assertEqual(self.calculate('--incremental'), self.calculate('--incremental'))
+        self.assertEqual(dict(DataVersion.objects.values_list('scope', 'version')), versions)
+
+    def test_numpy_engine_writes_its_own_form(self):
+        if not numpy_available():
+            self.skipTest('NumPy is not installed')
+        self.change_fixtures()
+        with mock.patch.object(calculate_tables.Command, 'write_forms') as write_forms:
+            table = self.calculate('--engine', 'numpy')
+        write_forms.assert_not_called()
+        self.assertEqual([row[-1] for row in table], ['DD', 'DD', 'D', 'D'])
+
+    def test_engines_agree(self):
+        self.change_fixtures()
+        engines = ['sql', 'python'] + (['numpy'] if numpy_available() else [])
+        tables = {engine: self.calculate('--engine', engine) for engine in engines}
+        for engine in engines:
+            self.assertEqual(tables[engine], tables['sql'], engine)
+
+
+
+class SeasonTableTestCase(ApiCacheTestCase):
+    """Two calculated matchweeks of a four-club season."""
+    url = '/api/premier-league/table/'
+
+    def setUp(self):
+        super().setUp()
+        create_clubs(4)
+        create_fixture(1, 1, 2, (2, 0), day=0, matchweek=1)
+        create_fixture(2, 3, 4, (1, 1), day=0, matchweek=1)
+        create_fixture(3, 2, 3, (0, 1), day=7, matchweek=2)
+        create_fixture(4, 4, 1, (2, 2), day=7, matchweek=2)
+        call_command('calculate_tables', '--season', SEASON, stdout=io.StringIO(), stderr=io.StringIO())
+
+    def get(self, **params):
+        return self.client.get(self.url, {'season': SEASON, **params}, headers={'accept': 'application/json'})
+
+    def points(self, **params):
+        response = self.get(**params)
+        self.assertEqual(response.status_code, 200)
+        return [(row['team'], row['points']) for row in response.json()]
+
+
+class TableHistoryTests(SeasonTableTestCase):
+
+    def test_table_after_matchweek(self):
+        after_first = [('Club 1', 3), ('Club 3', 1), ('Club 4', 1), ('Club 2', 0)]
+        self.assertEqual(self.points(matchweek=1), after_first)
+        self.assertEqual(self.points(matchweek=2), self.points())
+        self.assertEqual(self.points(matchweek=2), [('Club 1', 4), ('Club 3', 4), ('Club 4', 2), ('Club 2', 0)])
+
+    def test_table_as_of_date(self):
+        first_day = KICKOFF.date()
+        self.assertEqual(self.points(as_of=(first_day + datetime.timedelta(days=3)).isoformat()), self.points(matchweek=1))
+        self.assertEqual(self.points(as_of=(first_day + datetime.timedelta(days=30)).isoformat()), self.points())
+        self.assertEqual(self.get(as_of=(first_day - datetime.timedelta(days=1)).isoformat()).status_code, 404)
+
+    def test_bad_parameters(self):
+        for params in [{'matchweek': 0}, {'matchweek': 'one'}, {'as_of': '17/08/2024'},
+                       {'as_of': '2024-08-20', 'matchweek': 1}, {'view': 'home', 'matchweek': 1}]:
+            with self.subTest(**params):
+                response = self.get(**params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+
+class SplitTableTests(SeasonTableTestCase):
+
+    def test_home_and_away_tables(self):
+        self.assertEqual(self.points(view='home'), [('Club 1', 3), ('Club 4', 1), ('Club 3', 1), ('Club 2', 0)])
+        self.assertEqual(self.points(view='away'), [('Club 3', 3), ('Club 1', 1), ('Club 4', 1), ('Club 2', 0)])
+        self.assertEqual([row['form'] for row in self.get(view='away').json()], ['W', 'D', 'D', 'L'])
+
+    def test_last6_matches_overall_early_in_season(self):
+        self.assertEqual(self.points(view='last6'), self.points())
+
+    def test_recalculation_updates_splits(self):
+        Fixture.objects.filter(fixture_id=3).update(home_score=3, updated_at=timezone.now())
+        call_command('calculate_tables', '--season', SEASON, '--incremental', stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(self.points(view='home')[0], ('Club 2', 3))
+
+    def test_unknown_view(self):
+        self.assertEqual(self.get(view='neutral').status_code, 400)
+
+
+class BatchTests(SeasonTableTestCase):
+    batch_url = '/api/premier-league/batch/'
+
+    def setUp(self):
+        super().setUp()
+        player = Player.objects.create(player_id=10, club_id=1, first_name='Bukayo', last_name='Saka')
+        PlayerStat.objects.create(player=player, season=SEASON, goals=2)
+
+    def batch(self, queries):
+        return self.client.post(self.batch_url, queries, content_type='application/json', headers={'accept': 'application/json'})
+
+    def test_results_match_single_endpoints(self):
+        queries = [
+            {'table': SEASON},
+            {'table': SEASON, 'view': 'home'},
+            {'table': SEASON, 'matchweek': 1},
+            {'stat': 'goals', 'season': SEASON},
+            {'table': '2017-2018'},
+            {'stat': 'saves', 'season': SEASON},
+            {'season': SEASON},
+        ]
+        response = self.batch(queries)
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([result['query'] for result in results], queries)
+        self.assertEqual([result['status'] for result in results], [200, 200, 200, 200, 404, 400, 400])
+
+        for result, params in zip(results[:3], [{}, {'view': 'home'}, {'matchweek': 1}]):
+            self.assertEqual(result['data'], self.get(**params).json())
+        single = self.client.get('/api/premier-league/player-stats/', {'season': SEASON, 'stat': 'goals'},
+                                 headers={'accept': 'application/json'})
+        self.assertEqual(results[3]['data'], single.json())
+        self.assertIn('error', results[6])
+
+    def test_cached_batch_only_reads_data_versions(self):
+        queries = [{'table': SEASON}, {'stat': 'goals', 'season': SEASON}]
+        first = self.batch(queries).json()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.batch(queries).json(), first)
+
+    def test_bad_batches(self):
+        for body in [{'table': SEASON}, [], [{'table': SEASON}] * 21]:
+            with self.subTest(body=body):
+                self.assertEqual(self.batch(body).status_code, 400)
+
+
+class ExportTests(TestCase):
+    url = '/api/premier-league/export/fixtures/'
+
+    def setUp(self):
+        create_clubs(2)
+        create_fixture(1, 1, 2, (2, 0))
+        create_fixture(2, 2, 1, day=7)
+        Fixture.objects.create(fixture_id=3, season='2023-2024', home_club_id=1, away_club_id=2, status='COMPLETED',
+                               home_score=0, away_score=0, kickoff_time=KICKOFF - datetime.timedelta(days=365))
+
+    def export(self, url=None, **params):
+        response = self.client.get(url or self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson_export(self):
+        response, body = self.export(season=SEASON)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="fixtures-{SEASON}.ndjson"')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['fixture_id'] for row in rows], [1, 2])
+        self.assertEqual(rows[0]['home_club_id'], 1)
+        self.assertEqual((rows[0]['home_score'], rows[1]['home_score']), (2, None))
+        self.assertEqual(rows[0]['kickoff_time'], KICKOFF.isoformat())
+
+    def test_csv_export_matches_ndjson(self):
+        _, body = self.export(format='csv')
+        header, *rows = csv.reader(io.StringIO(body))
+        self.assertEqual(header, export_columns('fixtures'))
+        _, ndjson = self.export()
+        expected = [json.loads(line) for line in ndjson.splitlines()]
+        self.assertEqual(
+            rows, [['' if value is None else str(value) for value in row.values()] for row in expected]
+        )
+
+    def test_export_is_streamed_in_chunks(self):
+        with mock.patch.object(exports, 'EXPORT_CHUNK_SIZE', 2):
+            response = self.client.get(self.url, {'format': 'csv'})
+            chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 3) # The header, then two chunks of rows
+        self.assertEqual(chunks[1].decode().count('\n'), 2)
+
+    def test_command_writes_the_same_export(self):
+        stdout = io.StringIO()
+        call_command('export_data', 'fixtures', '--season', SEASON, stdout=stdout)
+        self.assertEqual(stdout.getvalue(), self.export(season=SEASON)[1])
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get('/api/premier-league/export/goals/').status_code, 404)
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
+        response = self.client.get('/api/premier-league/export/clubs/', {'season': SEASON})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+
+class CursorPagingTestCase(ApiCacheTestCase):
+    """Walks an endpoint's keyset-paginated results."""
+
+    def walk(self, url, **params):
+        """Follows next_cursor from the first page to the last, returning every row."""
+        rows = []
+        cursor = None
+        while True:
+            query = {**params, **({'cursor': cursor} if cursor else {})}
+            response = self.client.get(url, query, headers={'accept': 'application/json'})
+            self.assertEqual(response.status_code, 200)
+            rows.extend(response.json()['results'])
+            cursor = response.json()['next_cursor']
+            if cursor is None:
+                return rows
+
+
+class LeaderboardTests(CursorPagingTestCase):
+
+    def test_leaderboard_pages_cover_every_player_once(self):
+        club, = create_clubs(1)
+        for player_id, goals in enumerate([5, 3, 5, 1, 3, 5, 2], start=1):
+            player = Player.objects.create(player_id=player_id, club=club, first_name='P', last_name=str(player_id))
+            PlayerStat.objects.create(player=player, season=SEASON, goals=goals)
+
+        expected = list(
+            PlayerStat.objects.order_by('-goals', 'player_id').values_list('player_id', 'goals')
+        )
+        for limit in (1, 2, 3, 7):
+            with self.subTest(limit=limit):
+                rows = self.walk('/api/premier-league/leaderboard/', season=SEASON, stat='goals', limit=limit)
+                self.assertEqual([(row['player_id'], row['stat']) for row in rows], expected)
+
+
+class FixturesApiTests(CursorPagingTestCase):
+
+    def test_fixture_pages_cover_every_fixture_once(self):
+        create_clubs(4)
+        # Two kickoffs share each day, so pages split ties on kickoff time
+        pairs = [(home, away) for home in range(1, 5) for away in range(1, 5) if home != away]
+        for fixture_id, (home, away) in enumerate(pairs, start=1):
+            create_fixture(fixture_id, home, away, day=(fixture_id - 1) // 2)
+
+        expected = list(Fixture.objects.order_by('kickoff_time', 'fixture_id').values_list('fixture_id', flat=True))
+        for limit in (1, 3, 5, 12):
+            with self.subTest(limit=limit):
+                rows = self.walk('/api/premier-league/fixtures/', season=SEASON, limit=limit)
+                self.assertEqual([row['fixture_id'] for row in rows], expected)
+
+        club_expected = list(
+            Fixture.objects.filter(home_club_id=2).union(Fixture.objects.filter(away_club_id=2))
+            .order_by('kickoff_time', 'fixture_id').values_list('fixture_id', flat=True)
+        )
+        rows = self.walk('/api/premier-league/fixtures/', club='club 2', limit=2)
+        self.assertEqual([row['fixture_id'] for row in rows], club_expected)
+
+
+class ScraperTestCase(TransactionTestCase):
+    """
+    Runs run_scraper against a FakeFootballApi with an empty response cache.
+    Transactional, because the scraper only caches a response once the rows
+    built from it are committed.
+    """
+
+    def setUp(self):
+        api_cache.local_cache.clear()
+        self.api = serve_fake_api(self)
+        self.cache_dir = temp_dir(self)
+
+    def scrape(self, *args):
+        """Runs the scraper and returns what it (and the commands it calls) wrote to stdout."""
+        stdout = io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(io.StringIO()):
+            call_command('run_scraper', '--cache-dir', self.cache_dir, '--rate', '0', *args)
+        return stdout.getvalue()
+
+    def run_daemon(self, *args):
+        """Runs --daemon with each job run once, in the order they were added, instead of forever."""
+        def run_once(scheduler):
+            while scheduler.queue:
+                scheduler.run_job(heapq.heappop(scheduler.queue)[2])
+
+        with mock.patch.object(Scheduler, 'run_forever', autospec=True, side_effect=run_once), mock.patch('signal.signal'):
+            return self.scrape('--daemon', *args)
+
+    def versions(self):
+        return dict(DataVersion.objects.values_list('scope', 'version'))
+
+
+class DataVersionScrapeTests(ScraperTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.api.results[1064] = [api_fixture(1, 1, 2, (2, 0)), api_fixture(2, 3, 4, (1, 1))]
+
+    def test_unchanged_scrape_bumps_nothing(self):
+        self.scrape()
+        versions = self.versions()
+        output = self.scrape()
+
+        self.assertEqual(self.versions(), versions)
+        self.assertIn('Upserted 0 players from 0 changed pages (2 unchanged pages skipped).', output)
+
+    def test_changed_page_bumps_players(self):
+        self.scrape()
+        versions = self.versions()
+        self.api.players[120] = self.api.player(121, club_id=2)
+        output = self.scrape()
+
+        self.assertEqual(self.versions()['players'], versions['players'] + 1)
+        self.assertIn('Upserted 50 players from 1 changed pages (1 unchanged pages skipped).', output)
+        self.assertEqual(Player.objects.get(player_id=121).club_id, 2)
+
+
+class DaemonTests(ScraperTestCase):
+
+    def test_daemon_keeps_calculated_table(self):
+        self.api.results[1064] = [api_fixture(1, 1, 2, (2, 0))]
+        self.scrape()
+        calculated = list(LeagueTable.objects.filter(season=SEASON).order_by('position').values_list('club_id', 'points'))
+        self.assertEqual(calculated[0], (1, 3))
+
+        self.api.table_points = 99
+        versions = self.versions()
+        self.run_daemon()
+
+        self.assertEqual(
+            list(LeagueTable.objects.filter(season=SEASON).order_by('position').values_list('club_id', 'points')),
+            calculated
+        )
+        self.assertTrue(LeagueTableSync.objects.filter(season=SEASON).exists())
+        self.assertEqual(self.versions()[f'tables:{SEASON}'], versions[f'tables:{SEASON}'])
+        # Seasons we don't calculate still take the API's table
+        self.assertEqual(LeagueTable.objects.get(season='2025-2026', club_id=1).points, 99)
+
+
+class LiveModeTests(ScraperTestCase):
+
+    def run_live(self):
+        """Runs --live for a single poll."""
+        with mock.patch('time.sleep', side_effect=KeyboardInterrupt):
+            return self.scrape('--live')
+
+    def test_poll_updates_in_play_fixtures_and_table(self):
+        create_clubs(4)
+        now = timezone.now()
+        for fixture_id, status, kickoff in [
+            (1, 'SCHEDULED', now - datetime.timedelta(hours=2)), # The API now has it finished
+            (2, 'LIVE', now - datetime.timedelta(minutes=30)),
+            (3, 'SCHEDULED', now + datetime.timedelta(days=3)), # Not about to start
+        ]:
+            Fixture.objects.create(
+                fixture_id=fixture_id, season=SEASON, home_club_id=fixture_id, away_club_id=4,
+                kickoff_time=kickoff, status=status, home_score=0 if status == 'LIVE' else None,
+                away_score=0 if status == 'LIVE' else None,
+            )
+        self.api.fixtures = [api_fixture(1, 1, 4, (2, 1)), dict(api_fixture(2, 2, 4, (1, 0)), status='L')]
+        versions = self.versions()
+
+        output = self.run_live()
+        self.assertIn('Polled 2 live fixtures, 2 changed.', output)
+        self.assertEqual(self.api.requests['fixtures/3'], 0)
+        self.assertEqual(
+            list(Fixture.objects.order_by('fixture_id').values_list('status', 'home_score', 'away_score')),
+            [('COMPLETED', 2, 1), ('LIVE', 1, 0), ('SCHEDULED', None, None)]
+        )
+        self.assertGreater(self.versions()['fixtures'], versions.get('fixtures', 0))
+        # Only the finished match counts towards the table
+        self.assertEqual(
+            list(LeagueTable.objects.filter(season=SEASON).order_by('position').values_list('club_id', 'points')),
+            [(1, 3), (4, 0)]
+        )
+
+    def test_stale_live_fixture_is_not_polled(self):
+        create_clubs(4)
+        now = timezone.now()
+        for fixture_id, kickoff in [(1, now - datetime.timedelta(hours=1)), (2, now - datetime.timedelta(days=2))]:
+            Fixture.objects.create(
+                fixture_id=fixture_id, season=SEASON, home_club_id=fixture_id, away_club_id=fixture_id + 2,
+                kickoff_time=kickoff, status='LIVE', home_score=0, away_score=0,
+            )
+            self.api.fixtures.append(api_fixture(fixture_id, fixture_id, fixture_id + 2, (0, 0)))
+        self.api.fixtures[0]['status'] = 'L'
+        self.api.fixtures[1]['status'] = 'P' # Postponed: a status we don't map
+
+        self.run_live()
+        self.assertEqual(self.api.requests['fixtures/1'], 1)
+        self.assertEqual(self.api.requests['fixtures/2'], 0)
+
+
+class AllPlayerStatsTests(ScraperTestCase):
+
+    def test_every_player_and_season_in_batches(self):
+        self.api.players = self.api.players[:10]
+        self.scrape('--all-player-stats', '--stats-batch-size', '4')
+        self.assertEqual(PlayerStat.objects.count(), 10 * len(SEASON_ID_MAP))
+        self.assertEqual(set(PlayerStat.objects.values_list('goals', 'assists')), {(3, 1)})
+        for season in SEASON_ID_MAP:
+            self.assertIn(f'player_stats:{season}', self.versions())
+
+        # Closed seasons are never fetched again; open ones pick up changes
+        self.api.stats['goals'] = 5
+        output = self.scrape('--all-player-stats', '--stats-batch-size', '4')
+        closed = [season for season in SEASON_ID_MAP if season < CURRENT_SEASON_LABEL]
+        self.assertIn(f'Skipping {10 * len(closed)} player stat lines from closed, cached seasons.', output)
+        self.assertEqual(
+            dict(PlayerStat.objects.values_list('season', 'goals').distinct()),
+            {season: 3 if season in closed else 5 for season in SEASON_ID_MAP}
+        )
+
+
+class RecordReplayTests(ScraperTestCase):
+
+    def snapshot(self):
+        return {
+            model.__name__: sorted(model.objects.values_list(*fields))
+            for model, fields in [
+                (Club, ('club_id', 'club_name')),
+                (Fixture, ('fixture_id', 'season', 'status', 'home_score', 'away_score', 'matchweek')),
+                (Player, ('player_id', 'club_id', 'last_name')),
+                (PlayerStat, ('player_id', 'season', 'goals')),
+                (LeagueTable, ('season', 'club_id', 'position', 'points')),
+            ]
+        }
+
+    def test_replay_rebuilds_what_was_recorded(self):
+        self.api.results[12] = [api_fixture(1, 1, 2, (1, 0), season_id=12)]
+        self.api.results[1064] = [api_fixture(2, 3, 4, (2, 2))]
+        self.api.fixtures = [api_fixture(3, 1, 3, season_id=1184, day=365)]
+        self.scrape() # Fills the response cache first, closed seasons included
+        recording = temp_dir(self)
+        self.scrape('--record', recording)
+        recorded = self.snapshot()
+        self.assertEqual(len(recorded['Fixture']), 3)
+
+        self.api.close() # Nothing below may reach the network
+        for model in (PlayerStat, Player, LeagueTable, Fixture, Club):
+            model.objects.all().delete()
+        self.scrape('--replay', recording)
+        self.assertEqual(self.snapshot(), recorded)
+
+
+class ResumeTests(ScraperTestCase):
+
+    def test_resume_skips_completed_stages(self):
+        self.api.results[1064] = [api_fixture(1, 1, 2, (2, 0)), api_fixture(2, 3, 4, (1, 1))]
+        with mock.patch.object(run_scraper.Command, 'scrape_player_stats', side_effect=RuntimeError('crashed')):
+            with self.assertRaises(RuntimeError):
+                self.scrape()
+        stages = set(ScrapeCheckpoint.objects.values_list('stage', flat=True))
+        self.assertTrue({'clubs', 'fixtures:page:0', f'results:{SEASON}', 'players:page:0', 'players:page:1'} <= stages)
+        self.assertEqual(Player.objects.count(), 150)
+
+        # The results are cached as unchanged, but a stage without its
+        # checkpoint is processed again, so lost rows come back
+        ScrapeCheckpoint.objects.filter(stage=f'results:{SEASON}').delete()
+        Fixture.objects.all().delete()
+        requests = self.api.requests.copy()
+        self.scrape('--resume')
+
+        self.assertEqual(self.api.requests['clubs'], requests['clubs'])
+        self.assertEqual(self.api.requests['players'], requests['players'] + 1) # Page 0, for numPages
+        self.assertEqual(Fixture.objects.filter(season=SEASON, status='COMPLETED').count(), 2)
+        self.assertEqual(PlayerStat.objects.count(), 5)
+        self.assertEqual(LeagueTable.objects.get(season=SEASON, club_id=1).points, 3)
+        self.assertFalse(ScrapeCheckpoint.objects.exists())
+
+
+class ScrapeMetricsReportTests(ScraperTestCase):
+
+    def test_scrape_writes_reports(self):
+        directory = temp_dir(self)
+        json_path, prom_path = f'{directory}/metrics.json', f'{directory}/metrics.prom'
+        self.scrape('--metrics-json', json_path, '--metrics-prom', prom_path)
+
+        with open(json_path) as f:
+            report = json.load(f)
+        self.assertEqual(report['endpoints']['clubs']['requests'], {'ok': 1})
+        self.assertEqual(report['stages']['clubs']['rows_upserted'], 4)
+        self.assertEqual(report['stages']['players']['rows_upserted'], 150)
+        with open(prom_path) as f:
+            lines = f.read().splitlines()
+        self.assertIn('scraper_http_requests_total{endpoint="clubs",outcome="ok"} 1', lines)
+        self.assertIn('scraper_rows_upserted_total{stage="players"} 150', lines)
+
+
+class StreamedScrapeTests(ScraperTestCase):
+
+    def test_streamed_pages_store_the_same_rows(self):
+        if not streaming_available():
+            self.skipTest('ijson is not installed')
+        self.api.results[1064] = [api_fixture(1, 1, 2, (2, 0)), api_fixture(2, 3, 4, (1, 1))]
+        self.api.fixtures = [api_fixture(3, 1, 3, season_id=1184, day=365)]
+
+        def rows():
+            return (
+                list(Player.objects.order_by('player_id').values_list('player_id', 'club_id', 'first_name', 'position')),
+                list(Fixture.objects.order_by('fixture_id').values_list('fixture_id', 'status', 'home_score', 'matchweek')),
+            )
+
+        self.scrape('--no-cache')
+        expected = rows()
+        Player.objects.all().delete()
+        Fixture.objects.all().delete()
+        self.scrape('--no-cache', '--stream-json')
+        self.assertEqual(rows(), expected)
+        self.assertEqual(len(expected[0]), 150)
+
+
+class FixtureSeasonMigrationTests(TransactionTestCase):
+    before = [('premier_league_service', '0003_incremental_tables')]
+    after = [('premier_league_service', '0004_fixture_season')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        self.addCleanup(lambda: MigrationExecutor(connection).migrate(executor.loader.graph.leaf_nodes()))
+        apps = executor.loader.project_state(self.before).apps
+
+        Club = apps.get_model('premier_league_service', 'Club')
+        Fixture = apps.get_model('premier_league_service', 'Fixture')
+        for club_id in (1, 2):
+            Club.objects.create(club_id=club_id, club_name=f'Club {club_id}', short_name=f'Club {club_id}', abbr=f'C{club_id}')
+        for fixture_id, kickoff in [
+            (1, datetime.datetime(2019, 8, 9, 19, tzinfo=datetime.timezone.utc)),
+            (2, datetime.datetime(2020, 7, 26, 15, tzinfo=datetime.timezone.utc)), # 2019-2020 ended late
+            (3, datetime.datetime(2020, 9, 12, 11, 30, tzinfo=datetime.timezone.utc)),
+            (4, None),
+        ]:
+            fixture = Fixture.objects.create(
+                fixture_id=fixture_id, kickoff_time=kickoff, home_club_id=1, away_club_id=2,
+                status='COMPLETED', home_score=1, away_score=0,
+            )
+            apps.get_model('premier_league_service', 'LeagueTableContribution').objects.create(
+                season='2019-2020', fixture=fixture, home_club_id=1, away_club_id=2, home_score=1, away_score=0
+            )
+        apps.get_model('premier_league_service', 'LeagueTableSync').objects.create(
+            season='2019-2020', synced_through=timezone.now()
+        )
+
+    def test_backfills_seasons_and_drops_ledgers(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        apps = executor.loader.project_state(self.after).apps
+
+        Fixture = apps.get_model('premier_league_service', 'Fixture')
+        self.assertEqual(
+            list(Fixture.objects.order_by('fixture_id').values_list('fixture_id', 'season')),
+            [(1, '2019-2020'), (2, '2019-2020'), (3, '2020-2021'), (4, None)]
+        )
+        self.assertFalse(apps.get_model('premier_league_service', 'LeagueTableContribution').objects.exists())
+        self.assertFalse(apps.get_model('premier_league_service', 'LeagueTableSync').objects.exists())
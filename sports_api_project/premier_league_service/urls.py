@@ -1,8 +1,18 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 # These URLs are all prefixed with 'api/premier-league/' (from the project's urls.py)
 urlpatterns = [
     path('table/', views.LeagueTableView.as_view(), name='league-table'),
     path('player-stats/', views.PlayerStatsView.as_view(), name='player-stats'),
+    path('leaderboard/', views.LeaderboardView.as_view(), name='leaderboard'),
+    path('fixtures/', views.FixturesView.as_view(), name='fixtures'),
+    path('batch/', views.BatchView.as_view(), name='batch'),
+    path('export/<str:dataset>/', views.export_view, name='export'),
+
+    # The same read endpoints as async views, for ASGI servers
+    path('async/table/', async_views.league_table, name='async-league-table'),
+    path('async/player-stats/', async_views.player_stats, name='async-player-stats'),
+    path('async/leaderboard/', async_views.leaderboard, name='async-leaderboard'),
+    path('async/fixtures/', async_views.fixtures, name='async-fixtures'),
 ]
\ No newline at end of file
@@ -1,10 +1,356 @@
+import base64
+import datetime
+import json
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import Http404
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
 
+from . import api_cache
 from . import services
 from . import serializers
+from .exports import EXPORT_FORMATS, EXPORT_MODELS, export_chunks
+from .response_blobs import encoded_etag, load_blob, negotiate_encodings, request_etag
+from .standings import SPLIT_VIEWS
+
+# The stat types PlayerStatsView serves (and the cache warms)
+PLAYER_STAT_TYPES = ('goals', 'assists')
+
+# The Fixture.status values FixturesView filters on
+FIXTURE_STATUSES = ('SCHEDULED', 'LIVE', 'COMPLETED')
+
+# How many sub-queries one BatchView request may hold
+MAX_BATCH_QUERIES = 20
+
+
+def league_table_payload(season, view='overall', as_of=None, matchweek=None):
+    """
+    Returns the league table as a CachedPayload: .get() serves it from the
+    response cache when the season's data hasn't changed since it was
+    built (or raises Http404).
+    """
+    def build():
+        # 1. Call the service layer to get the data
+        if view != 'overall':
+            table_data = services.get_league_table_split_data(season, view)
+        elif as_of or matchweek:
+            table_data = services.get_league_table_snapshot_data(season, as_of=as_of, matchweek=matchweek)
+        else:
+            table_data = services.get_league_table_data(season)
+
+        # 2. Serialize the data
+        return serializers.fast_serialize(serializers.LeagueTableEntrySerializer, table_data)
+
+    params = {'season': season, 'view': view, 'as_of': as_of.isoformat() if as_of else None, 'matchweek': matchweek}
+    return api_cache.CachedPayload('table', params, [f'tables:{season}', 'clubs'], build)
+
+
+def player_stats_payload(season, stat_type, team_filter=None):
+    """
+    Returns the top players for a stat as a CachedPayload: .get() serves
+    them from the response cache when the season's data hasn't changed
+    since they were built (or raises Http404).
+    """
+    def build():
+        # 1. Call the service layer (the team filter is applied in SQL)
+        player_data = services.get_player_stats_data(season, stat_type, team_filter)
+
+        # 2. Serialize the data
+        return serializers.fast_serialize(serializers.PlayerStatSerializer, player_data)
+
+    params = {'season': season, 'stat': stat_type, 'team': team_filter.lower() if team_filter else None}
+    return api_cache.CachedPayload('player-stats', params, [f'player_stats:{season}', 'players', 'clubs'], build)
+
+
+def encode_cursor(after):
+    """Turns a leaderboard keyset position into an opaque cursor string."""
+    return base64.urlsafe_b64encode(json.dumps(list(after)).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, types=(int, float)):
+    """
+    The inverse of encode_cursor(), converting each part with `types`
+    (a leaderboard's (value, player_id) by default). Raises ValueError
+    for a malformed cursor.
+    """
+    try:
+        after = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if len(after) != len(types):
+            raise ValueError
+        return tuple(convert(value) for convert, value in zip(types, after))
+    except (TypeError, ValueError) as e: # binascii.Error and JSONDecodeError are ValueErrors
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def parse_cursor_datetime(value):
+    value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        raise ValueError("Cursor datetimes are always aware")
+    return value
+
+
+def leaderboard_payload(season, stat, team=None, position=None, limit=20, cursor=None):
+    """
+    Returns one leaderboard page as a CachedPayload: .get() serves it from
+    the response cache when the season's data hasn't changed since it was
+    built (or raises Http404). Raises ValueError for a malformed cursor.
+    """
+    after = decode_cursor(cursor) if cursor else None
+
+    def build():
+        rows, next_after = services.get_leaderboard_data(season, stat, team, position, limit, after)
+        return {
+            'results': serializers.fast_serialize(serializers.LeaderboardEntrySerializer, rows),
+            'next_cursor': encode_cursor(next_after) if next_after else None,
+        }
+
+    params = {
+        'season': season, 'stat': stat, 'limit': limit, 'cursor': cursor,
+        'team': team.lower() if team else None, 'position': position.lower() if position else None,
+    }
+    return api_cache.CachedPayload('leaderboard', params, [f'player_stats:{season}', 'players', 'clubs'], build)
+
+
+def league_table_request(query):
+    """
+    Validates LeagueTableView's query params and returns its CachedPayload.
+    Raises ValueError with the message for a bad request.
+    """
+    # Get season from query param, default to a recent one
+    season = query.get('season', '2024-2025')
+    as_of = query.get('as_of')
+    matchweek = query.get('matchweek')
+    view = query.get('view', 'overall').lower()
+
+    if view != 'overall' and view not in SPLIT_VIEWS:
+        raise ValueError(f"Invalid 'view' parameter. Use 'overall', {', '.join(repr(v) for v in SPLIT_VIEWS)}.")
+    if view != 'overall' and (as_of or matchweek):
+        raise ValueError("The 'view' parameter can't be combined with 'as_of' or 'matchweek'.")
+    if as_of and matchweek:
+        raise ValueError("Use either 'as_of' or 'matchweek', not both.")
+    try:
+        as_of = datetime.date.fromisoformat(as_of) if as_of else None
+    except ValueError:
+        raise ValueError("Invalid 'as_of' parameter. Use YYYY-MM-DD.")
+    try:
+        matchweek = int(matchweek) if matchweek else None
+        if matchweek is not None and matchweek < 1:
+            raise ValueError
+    except ValueError:
+        raise ValueError("Invalid 'matchweek' parameter. Use a positive number.")
+
+    return league_table_payload(season, view, as_of, matchweek)
+
+
+def player_stats_request(query):
+    """
+    Validates PlayerStatsView's query params and returns its CachedPayload.
+    Raises ValueError with the message for a bad request.
+    """
+    season = query.get('season', '2024-2025')
+    stat_type = query.get('stat', 'goals').lower()
+    team_filter = query.get('team', None)
+
+    if stat_type not in PLAYER_STAT_TYPES:
+        raise ValueError("Invalid 'stat' parameter. Use 'goals' or 'assists'.")
+    return player_stats_payload(season, stat_type, team_filter)
+
+
+def leaderboard_request(query):
+    """
+    Validates LeaderboardView's query params and returns its CachedPayload.
+    Raises ValueError with the message for a bad request.
+    """
+    season = query.get('season', '2024-2025')
+    stat = query.get('stat', 'goals').lower()
+    team = query.get('team') or None
+    position = query.get('position') or None
+    cursor = query.get('cursor') or None
+
+    if stat not in services.LEADERBOARD_STATS:
+        raise ValueError(f"Invalid 'stat' parameter. Use one of: {', '.join(services.LEADERBOARD_STATS)}.")
+    try:
+        limit = int(query.get('limit', 20))
+        if not 1 <= limit <= services.MAX_LEADERBOARD_PAGE:
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"Invalid 'limit' parameter. Use a number from 1 to {services.MAX_LEADERBOARD_PAGE}.")
+
+    try:
+        return leaderboard_payload(season, stat, team, position, limit, cursor)
+    except ValueError:
+        raise ValueError("Invalid 'cursor' parameter.")
+
+
+def fixtures_payload(season=None, club=None, fixture_status=None, date_from=None, date_to=None, limit=50,
+                     cursor=None):
+    """
+    Returns one page of fixtures as a CachedPayload: .get() serves it from
+    the response cache when no fixture has changed since it was built
+    (or raises Http404). Raises ValueError for a malformed cursor.
+    """
+    after = decode_cursor(cursor, types=(parse_cursor_datetime, float)) if cursor else None
+
+    def build():
+        rows, next_after = services.get_fixtures_data(season, club, fixture_status, date_from, date_to, limit, after)
+        return {
+            'results': serializers.fast_serialize(serializers.FixtureSerializer, rows),
+            'next_cursor': encode_cursor((next_after[0].isoformat(), next_after[1])) if next_after else None,
+        }
+
+    params = {
+        'season': season, 'club': club.lower() if club else None, 'status': fixture_status,
+        'from': date_from.isoformat() if date_from else None, 'to': date_to.isoformat() if date_to else None,
+        'limit': limit, 'cursor': cursor,
+    }
+    return api_cache.CachedPayload('fixtures', params, ['fixtures', 'clubs'], build)
+
+
+def fixtures_request(query):
+    """
+    Validates FixturesView's query params and returns its CachedPayload.
+    Raises ValueError with the message for a bad request.
+    """
+    season = query.get('season') or None
+    club = query.get('club') or None
+    fixture_status = query.get('status', '').upper() or None
+    date_from = query.get('from') or None
+    date_to = query.get('to') or None
+    cursor = query.get('cursor') or None
+
+    if fixture_status is not None and fixture_status not in FIXTURE_STATUSES:
+        raise ValueError(f"Invalid 'status' parameter. Use one of: {', '.join(FIXTURE_STATUSES)}.")
+    try:
+        date_from = datetime.date.fromisoformat(date_from) if date_from else None
+        date_to = datetime.date.fromisoformat(date_to) if date_to else None
+    except ValueError:
+        raise ValueError("Invalid 'from' or 'to' parameter. Use YYYY-MM-DD.")
+    if date_from and date_to and date_from > date_to:
+        raise ValueError("'from' must not be after 'to'.")
+    try:
+        limit = int(query.get('limit', 50))
+        if not 1 <= limit <= services.MAX_FIXTURES_PAGE:
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"Invalid 'limit' parameter. Use a number from 1 to {services.MAX_FIXTURES_PAGE}.")
+
+    try:
+        return fixtures_payload(season, club, fixture_status, date_from, date_to, limit, cursor)
+    except ValueError:
+        raise ValueError("Invalid 'cursor' parameter.")
+
+
+def batch_request(sub_query):
+    """
+    Turns one BatchView sub-query into the CachedPayload of the endpoint
+    it stands for: {"table": season, ...} takes LeagueTableView's params,
+    {"stat": ..., "season": ...} PlayerStatsView's. Raises ValueError with
+    the message for a bad sub-query.
+    """
+    if not isinstance(sub_query, dict) or any(isinstance(value, (dict, list)) for value in sub_query.values()):
+        raise ValueError("Each query must be an object of plain values.")
+    query = {name: str(value) for name, value in sub_query.items() if value is not None}
+    if 'table' in query:
+        query['season'] = query.pop('table')
+        return league_table_request(query)
+    if 'stat' in query:
+        return player_stats_request(query)
+    raise ValueError("Each query needs a 'table' (season) or a 'stat' key.")
+
+
+def batch_data(payloads):
+    """
+    Resolves many payloads with as few queries as possible: one for all
+    their data versions, none for cached ones, then one per kind for the
+    plain season tables and top-20 lists that aren't cached (grouped with
+    season__in). Anything else is built on its own.
+
+    Returns a list of (data, None) or (None, Http404) in payload order.
+    """
+    api_cache.load_states(payloads)
+    data = {}
+    for index, payload in enumerate(payloads):
+        cached = payload.cached()
+        if cached is not None:
+            data[index] = cached
+
+    def group(namespace, **params):
+        return [
+            index for index, payload in enumerate(payloads)
+            if index not in data and payload.namespace == namespace
+            and all(payload.params[name] == value for name, value in params.items())
+        ]
+
+    def fill(indexes, rows_by_season, serializer_class):
+        for index in indexes:
+            rows = rows_by_season.get(payloads[index].params['season'])
+            if rows: # Missing seasons are built on their own below, for their 404
+                data[index] = serializers.fast_serialize(serializer_class, rows)
+                payloads[index].store(data[index])
+
+    tables = group('table', view='overall', as_of=None, matchweek=None)
+    if tables:
+        seasons = {payloads[index].params['season'] for index in tables}
+        fill(tables, services.get_league_tables_data(seasons), serializers.LeagueTableEntrySerializer)
+    for stat_type in PLAYER_STAT_TYPES:
+        stats = group('player-stats', stat=stat_type, team=None)
+        if stats:
+            seasons = {payloads[index].params['season'] for index in stats}
+            fill(stats, services.get_player_stats_by_season(seasons, stat_type), serializers.PlayerStatSerializer)
+
+    results = []
+    for index, payload in enumerate(payloads):
+        try:
+            results.append((data[index] if index in data else payload.get(), None))
+        except Http404 as e:
+            results.append((None, e))
+    return results
+
+
+def conditional_response(request, payload):
+    """
+    Answers If-None-Match / If-Modified-Since with a 304 straight from the
+    data versions, without building (or even fetching) the body. Otherwise
+    returns the payload with its ETag and Last-Modified: as the stored,
+    already compressed blob when warm_api_cache has rendered one for the
+    current data versions, or built (or fetched from the cache) as usual.
+    Compressed bodies get their own ETag (see response_blobs.encoded_etag()).
+    """
+    # HTTP dates have whole-second precision
+    last_modified = int(payload.last_modified.timestamp()) if payload.last_modified else None
+    # The browsable API's HTML is a different body from the JSON, so it gets its own ETag
+    renderer_format = getattr(getattr(request, 'accepted_renderer', None), 'format', None)
+    etag = payload.etag if renderer_format == 'json' else f'{payload.etag[:-1]}-{renderer_format}"'
+    not_modified = get_conditional_response(
+        request, etag=request_etag(request, etag), last_modified=last_modified
+    )
+    if not_modified is not None:
+        return not_modified
+
+    # Blobs are stored JSON, so the browsable API always renders
+    blob = None
+    encoding = None
+    if renderer_format == 'json':
+        blob = load_blob(payload, negotiate_encodings(request))
+    if blob is not None:
+        body, encoding = blob
+        response = HttpResponse(body, content_type='application/json', status=status.HTTP_200_OK)
+        if encoding:
+            response['Content-Encoding'] = encoding
+    else:
+        response = Response(payload.get(), status=status.HTTP_200_OK)
+    response['ETag'] = encoded_etag(etag, encoding)
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Clients may keep the body but must revalidate it before reuse
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+    return response
+
 
 class LeagueTableView(APIView):
     """
@@ -12,21 +358,19 @@ class LeagueTableView(APIView):
     
     Query Params:
     - ?season=YYYY-YYYY (e.g., 2023-2024)
+    - ?as_of=YYYY-MM-DD (optional) the table as it stood on that date
+    - ?matchweek=N (optional) the table after matchweek N
+    - ?view=home|away|last6 (optional) a split table instead of the full one
     """
     
     def get(self, request):
-        # Get season from query param, default to a recent one
-        season = request.GET.get('season', '2024-2025')
-        
         try:
-            # 1. Call the service layer to get the data
-            table_data = services.get_league_table_data(season)
-            
-            # 2. Serialize the data
-            serializer = serializers.LeagueTableEntrySerializer(table_data, many=True)
-            
-            # 3. Return the response
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            payload = league_table_request(request.GET)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            return conditional_response(request, payload)
             
         except Http404 as e:
             return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
@@ -45,33 +389,142 @@ class PlayerStatsView(APIView):
     """
     
     def get(self, request):
-        season = request.GET.get('season', '2024-2025')
-        stat_type = request.GET.get('stat', 'goals').lower()
-        team_filter = request.GET.get('team', None)
-        
         try:
-            # 1. Validate stat_type
-            if stat_type not in ['goals', 'assists']:
-                return Response({"error": "Invalid 'stat' parameter. Use 'goals' or 'assists'."}, status=status.HTTP_400_BAD_REQUEST)
-                
-            # 2. Call the service layer
-            player_data = services.get_player_stats_data(season, stat_type)
-            
-            # 3. (Optional) Filter the data by team
-            if team_filter:
-                team_filter_lower = team_filter.lower()
-                player_data = [
-                    player for player in player_data
-                    if player.get('club', '').lower() == team_filter_lower
-                ]
-            
-            # 4. Serialize the data
-            serializer = serializers.PlayerStatSerializer(player_data, many=True)
-            
-            # 5. Return the response
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            payload = player_stats_request(request.GET)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            # Build (or fetch the cached) response, or answer 304
+            return conditional_response(request, payload)
+
+        except Http404 as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class LeaderboardView(APIView):
+    """
+    API View to rank players by any stat.
+
+    Query Params:
+    - ?season=YYYY-YYYY (e.g., 2023-2024)
+    - ?stat=goals (default), assists, clean_sheets, minutes_played, passes, yellow_cards or red_cards
+    - ?team=Arsenal (optional team name)
+    - ?position=Forward (optional)
+    - ?limit=N (optional, default 20, at most 100)
+    - ?cursor=... (optional) the 'next_cursor' of the previous page
+    """
+
+    def get(self, request):
+        try:
+            payload = leaderboard_request(request.GET)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            return conditional_response(request, payload)
+        except Http404 as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class FixturesView(APIView):
+    """
+    API View to list fixtures and results, in kickoff order.
+
+    Query Params (all optional):
+    - ?season=YYYY-YYYY (e.g., 2023-2024)
+    - ?club=Arsenal (home or away)
+    - ?status=SCHEDULED, LIVE or COMPLETED
+    - ?from=YYYY-MM-DD and/or ?to=YYYY-MM-DD (kickoff dates, inclusive)
+    - ?limit=N (optional, default 50, at most 100)
+    - ?cursor=... (optional) the 'next_cursor' of the previous page
+    """
 
+    def get(self, request):
+        try:
+            payload = fixtures_request(request.GET)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            return conditional_response(request, payload)
         except Http404 as e:
             return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
-            return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class BatchView(APIView):
+    """
+    API View to run several table / player-stats queries in one request.
+
+    POST a JSON list of sub-queries (at most MAX_BATCH_QUERIES), e.g.
+    [{"table": "2023-2024"}, {"table": "2024-2025", "view": "home"},
+     {"stat": "goals", "season": "2024-2025", "team": "Arsenal"}]
+    Each takes the same params as LeagueTableView / PlayerStatsView.
+
+    Returns {"results": [...]}, one entry per sub-query in order, with
+    the sub-query, its status code and either its 'data' (what the single
+    endpoint returns) or an 'error'.
+    """
+
+    def post(self, request):
+        sub_queries = request.data
+        if not isinstance(sub_queries, list) or not sub_queries:
+            return Response({"error": "Send a JSON list of queries."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(sub_queries) > MAX_BATCH_QUERIES:
+            return Response({"error": f"Send at most {MAX_BATCH_QUERIES} queries."}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = [{"query": sub_query} for sub_query in sub_queries]
+        payloads = {}
+        for index, sub_query in enumerate(sub_queries):
+            try:
+                payloads[index] = batch_request(sub_query)
+            except ValueError as e:
+                results[index].update(status=status.HTTP_400_BAD_REQUEST, error=str(e))
+
+        try:
+            resolved = batch_data(list(payloads.values())) if payloads else []
+        except Exception as e:
+            return Response({"error": f"An unexpected error occurred: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        for index, (data, error) in zip(payloads, resolved):
+            if error is None:
+                results[index].update(status=status.HTTP_200_OK, data=data)
+            else:
+                results[index].update(status=status.HTTP_404_NOT_FOUND, error=str(error))
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+@require_safe
+def export_view(request, dataset):
+    """
+    Streams every row of a dataset (clubs, fixtures, tables, players or
+    player-stats) for bulk downloads. A plain Django view, since DRF
+    would treat ?format= as a renderer choice and buffer the response.
+
+    Query Params:
+    - ?format=ndjson (default) or csv
+    - ?season=YYYY-YYYY (optional, not for clubs or players)
+    """
+    export_format = request.GET.get('format', 'ndjson').lower()
+    season = request.GET.get('season') or None
+
+    if dataset not in EXPORT_MODELS:
+        return JsonResponse({"error": f"Unknown dataset. Use one of: {', '.join(EXPORT_MODELS)}."}, status=status.HTTP_404_NOT_FOUND)
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({"error": f"Invalid 'format' parameter. Use one of: {', '.join(EXPORT_FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        chunks = export_chunks(dataset, export_format, season)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    content_type, extension = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    filename = f"{dataset}-{season}" if season else dataset
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return response
@@ -145,5 +145,30 @@ CSRF_COOKIE_HTTPONLY = env('CSRF_COOKIE_HTTPONLY', default=True)
 # --- API Settings ---
 FPL_API_URL = env('FPL_API_URL', default='https://fantasy.premierleague.com/api/bootstrap-static/')
 
+# --- Scraper Settings ---
+# Where run_scraper keeps its on-disk API response cache
+SCRAPER_CACHE_DIR = env('SCRAPER_CACHE_DIR', default=str(BASE_DIR / '.scraper_cache'))
+
+# --- Django REST Framework ---
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'premier_league_service.renderers.ORJSONRenderer', # Same output as JSONRenderer, faster
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# --- API Response Cache ---
+# Responses are kept in an in-process LRU of this many entries, and also in
+# the shared cache at API_CACHE_URL (e.g. redis://redis:6379/1) if one is set,
+# so every worker benefits from the cache warmed after each scrape.
+API_CACHE_MAX_ENTRIES = env.int('API_CACHE_MAX_ENTRIES', default=256)
+API_CACHE_TIMEOUT = env.int('API_CACHE_TIMEOUT', default=24 * 60 * 60)
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+if env('API_CACHE_URL', default=''):
+    CACHES['api'] = env.cache_url('API_CACHE_URL')
+API_CACHE_ALIAS = 'api' if 'api' in CACHES else None
+
 # --- Admin URL (customizable for security) ---
 ADMIN_URL = env('ADMIN_URL', default='admin/')
\ No newline at end of file